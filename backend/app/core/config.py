@@ -1,12 +1,79 @@
+from pydantic import Field
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import Dict, List, Optional
 
 class Settings(BaseSettings):
-    MONGO_URL: str
+    MONGO_URL: Optional[str] = None
     DB_NAME: str = "financetracker"
-    JWT_SECRET: str
-    JWT_ALGORITHM: str = "HS256"
-    JWT_EXPIRATION_HOURS: int = 24 * 30  # 30 days
+    DATABASE_BACKEND: str = "mongo"  # mongo, or memory for offline tests and benchmarks
+    INDEX_BOOTSTRAP_ON_STARTUP: bool = True
+
+    # Motor connection pool
+    MONGO_MAX_POOL_SIZE: int = 100
+    MONGO_MIN_POOL_SIZE: int = 0
+    MONGO_MAX_IDLE_TIME_MS: Optional[int] = None
+    MONGO_WAIT_QUEUE_TIMEOUT_MS: Optional[int] = None
+    MONGO_SERVER_SELECTION_TIMEOUT_MS: int = 30000
+    MONGO_CONNECT_TIMEOUT_MS: int = 20000
+    MONGO_COMPRESSORS: Optional[str] = None  # e.g. "zstd,snappy,zlib"
+    MONGO_POOL_METRICS_LOG_SECONDS: float = 0  # periodic pool stats in the log, 0 disables
+    METRICS_ENABLED: bool = True  # Prometheus /metrics and the instrumentation feeding it
+    ADMIN_TOKEN: Optional[str] = None  # X-Admin-Token for /api/admin/* and /metrics, which are hidden while unset
+    BATCH_MAX_REQUESTS: int = 20  # sub-requests per POST /api/batch
+
+    # Response compression (br needs the brotli package, else gzip); turn off
+    # when a proxy in front already compresses
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MIN_SIZE: int = 1024  # bytes; smaller one-piece bodies go out as they are
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 4  # 0-11; higher levels cost too much CPU per request
+
+    # On-demand request profiling (X-Profile: <ADMIN_TOKEN>, or sampled)
+    PROFILING_ENABLED: bool = False  # when off the middleware is not even installed
+    PROFILE_SAMPLE_RATE: float = 0.0  # share of requests profiled at random
+    PROFILE_SAMPLE_INTERVAL_MS: float = 1.0
+    PROFILE_RETENTION_HOURS: int = 72
+
+    # Slow-query log: commands over the threshold land in the capped slow_queries collection
+    SLOW_QUERY_THRESHOLD_MS: float = 100  # 0 disables the log
+    SLOW_QUERY_EXPLAIN_SAMPLE_RATE: float = 0.0  # share of slow queries re-run under explain
+    SLOW_QUERY_LOG_BYTES: int = 16 * 1024 * 1024  # capped collection size
+
+    # Read preference per route for reads that tolerate staleness (JSON in env);
+    # routes not listed read from the primary
+    READ_PREFERENCES: Dict[str, str] = {"stats": "secondaryPreferred", "advice": "secondaryPreferred"}
+    READ_MAX_STALENESS_SECONDS: int = 90  # MongoDB minimum is 90
+
+    # Server-side time budget (maxTimeMS) for the database work of one request,
+    # per route (JSON in env); also the per-query limit outside requests
+    DB_TIME_BUDGET_MS: int = 2000
+    DB_ROUTE_TIME_BUDGETS_MS: Dict[str, int] = {"stats": 5000, "dashboard": 5000, "batch": 5000, "advice": 3000}
+
+    JWT_SECRET: Optional[str] = None  # required for HS256 only
+    JWT_ALGORITHM: str = "HS256"  # HS256, EdDSA or RS256
+    JWT_PRIVATE_KEYS_DIR: Optional[str] = None  # signing nodes only (EdDSA/RS256)
+    JWT_KEY_ROTATION_HOURS: int = 24 * 7  # 0 disables rotation
+    JWT_KEYS_REFRESH_SECONDS: float = 60.0
+    JWT_KEYS_MIN_RELOAD_SECONDS: float = 5.0
+    ACCESS_TOKEN_EXPIRATION_MINUTES: int = 15
+    REFRESH_TOKEN_EXPIRATION_DAYS: int = 30
+    REVOCATION_SYNC_SECONDS: float = 10.0
+    REVOCATION_FULL_SYNC_SECONDS: float = 3600.0
+    TOKEN_CACHE_SIZE: int = 10000  # verified JWTs kept in memory, 0 disables
+    BCRYPT_ROUNDS: int = 12  # existing hashes are upgraded on next login when this changes
+    BCRYPT_MAX_WORKERS: int = 4
+
+    DEFAULT_CURRENCY: str = "EUR"  # ISO 4217, two decimals; the only currency requests accept
+
+    # Failed-login throttling
+    LOGIN_THROTTLE_ENABLED: bool = True
+    LOGIN_THROTTLE_BACKEND: str = "memory"  # memory, or mongo to share counters across nodes
+    LOGIN_THROTTLE_WINDOW_SECONDS: float = 900.0
+    LOGIN_MAX_ATTEMPTS_PER_EMAIL: int = 5
+    LOGIN_MAX_ATTEMPTS_PER_IP: int = 50
+    # Proxies (IPs or CIDRs, JSON in env) whose X-Forwarded-For is believed
+    # for the per-IP limit; otherwise the peer address is the client
+    TRUSTED_PROXIES: List[str] = []
     
     # AWS / Prod Settings
     ENVIRONMENT: str = "development"
@@ -15,6 +82,45 @@ class Settings(BaseSettings):
     OPENAI_API_KEY: Optional[str] = None
     EMERGENT_LLM_KEY: Optional[str] = None
 
+    # LLM providers, tried in order (openai, litellm, stub)
+    LLM_PROVIDERS: str = "openai"
+    OPENAI_MODEL: str = "gpt-4o-mini"
+    OPENAI_TIMEOUT_SECONDS: float = 20.0
+    LITELLM_MODEL: str = "gpt-4o-mini"
+    LITELLM_TIMEOUT_SECONDS: float = 20.0
+    STUB_LLM_LATENCY_MS: int = 0
+    STUB_LLM_TIMEOUT_SECONDS: float = 5.0
+    LLM_BREAKER_FAILURE_THRESHOLD: int = 5
+    LLM_BREAKER_RESET_SECONDS: float = 30.0
+
+    ADVICE_CONTEXT_TOKEN_BUDGET: int = 1500  # input tokens for the advice prompt
+    ADVICE_REQUEST_TOKEN_LIMIT: int = 200  # cap on the user's own question
+
+    # Background advice jobs
+    ADVICE_JOB_WORKERS: int = 4
+    ADVICE_JOB_MAX_ATTEMPTS: int = 3
+    ADVICE_JOB_RETRY_DELAY_SECONDS: float = 5.0
+    ADVICE_JOB_POLL_INTERVAL_SECONDS: float = 1.0
+    ADVICE_JOB_LEASE_SECONDS: int = 120
+
+    # Nightly advice pre-generation
+    ADVICE_PRECOMPUTED_MAX_AGE_HOURS: int = 24
+    ADVICE_PREGEN_ACTIVE_DAYS: int = 30
+    ADVICE_PREGEN_BATCH_SIZE: int = 200
+    ADVICE_PREGEN_CONCURRENCY: int = 8
+    LLM_INPUT_COST_PER_MTOK: float = 0.15  # USD, gpt-4o-mini list price
+    LLM_OUTPUT_COST_PER_MTOK: float = 0.60
+
+    # Cold-history archival (python -m app.jobs.archive_transactions)
+    ARCHIVE_AFTER_DAYS: int = 730  # transactions dated earlier move to transactions_archive
+    ARCHIVE_BATCH_SIZE: int = 500
+    ARCHIVE_DUTY_CYCLE: float = Field(0.5, gt=0, le=1)  # share of wall time spent moving; the rest is sleep
+
+    # Schema migrations (python -m app.jobs.migrate)
+    MIGRATION_BATCH_SIZE: int = 500
+    MIGRATION_DUTY_CYCLE: float = Field(0.5, gt=0, le=1)  # share of wall time spent writing; the rest is sleep
+    MIGRATION_LEASE_SECONDS: int = 120
+
     class Config:
         env_file = ".env"
         case_sensitive = True
@@ -1,12 +1,56 @@
+import asyncio
+import logging
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo.read_preferences import Nearest, PrimaryPreferred, Secondary, SecondaryPreferred
 from ..core.config import settings
+from .memory_db import MemoryClient
+from .metrics import CommandMetrics
+from .pool_metrics import PoolMetrics
+from .slow_queries import slow_query_log
+
+logger = logging.getLogger(__name__)
+
+READ_PREFERENCE_MODES = {
+    "primaryPreferred": PrimaryPreferred,
+    "secondary": Secondary,
+    "secondaryPreferred": SecondaryPreferred,
+    "nearest": Nearest,
+}
 
 class Database:
     client: AsyncIOMotorClient = None
     db = None
+    pool_metrics = PoolMetrics()
+    command_metrics = CommandMetrics()
 
     def connect(self):
-        client_options = {}
+        self._readers = {}
+        if settings.DATABASE_BACKEND == "memory":
+            # Offline tests and benchmarks: same query semantics, no server
+            self.client = MemoryClient()
+            self.db = self.client[settings.DB_NAME]
+            return
+        if not settings.MONGO_URL:
+            raise RuntimeError("MONGO_URL is required unless DATABASE_BACKEND=memory")
+
+        client_options = {
+            "maxPoolSize": settings.MONGO_MAX_POOL_SIZE,
+            "minPoolSize": settings.MONGO_MIN_POOL_SIZE,
+            "serverSelectionTimeoutMS": settings.MONGO_SERVER_SELECTION_TIMEOUT_MS,
+            "connectTimeoutMS": settings.MONGO_CONNECT_TIMEOUT_MS,
+            "event_listeners": [self.pool_metrics],
+        }
+        if settings.METRICS_ENABLED:
+            client_options["event_listeners"].append(self.command_metrics)
+        if settings.SLOW_QUERY_THRESHOLD_MS > 0:
+            client_options["event_listeners"].append(slow_query_log)
+        if settings.MONGO_MAX_IDLE_TIME_MS is not None:
+            client_options["maxIdleTimeMS"] = settings.MONGO_MAX_IDLE_TIME_MS
+        if settings.MONGO_WAIT_QUEUE_TIMEOUT_MS is not None:
+            client_options["waitQueueTimeoutMS"] = settings.MONGO_WAIT_QUEUE_TIMEOUT_MS
+        if settings.MONGO_COMPRESSORS:
+            # zstd needs the zstandard package, snappy needs python-snappy; zlib is built in
+            client_options["compressors"] = settings.MONGO_COMPRESSORS
         
         # Check if we need to use the CA bundle for AWS DocumentDB
         if "docdb" in settings.MONGO_URL or "aws" in settings.MONGO_URL or settings.ENVIRONMENT == "production":
@@ -19,10 +63,38 @@ class Database:
         self.client = AsyncIOMotorClient(settings.MONGO_URL, **client_options)
         self.db = self.client[settings.DB_NAME]
 
+    def reader(self, route: str):
+        """Database handle for staleness-tolerant reads issued by ``route``.
+
+        Routes listed in READ_PREFERENCES (e.g. stats, advice) read with that
+        mode and READ_MAX_STALENESS_SECONDS; every other route, all writes and
+        read-your-writes lookups use ``self.db`` on the primary.
+        """
+        mode = settings.READ_PREFERENCES.get(route, "primary")
+        if mode == "primary" or settings.DATABASE_BACKEND == "memory":
+            return self.db
+        handle = self._readers.get(mode)
+        if handle is None:
+            read_preference = READ_PREFERENCE_MODES[mode](max_staleness=settings.READ_MAX_STALENESS_SECONDS)
+            handle = self._readers[mode] = self.client.get_database(settings.DB_NAME, read_preference=read_preference)
+        return handle
+
     def close(self):
         if self.client:
             self.client.close()
 
+    async def log_pool_metrics(self):
+        # Started from the lifespan hook when MONGO_POOL_METRICS_LOG_SECONDS > 0
+        while True:
+            await asyncio.sleep(settings.MONGO_POOL_METRICS_LOG_SECONDS)
+            stats = self.pool_metrics.snapshot()
+            checkouts = stats["checkouts"]
+            avg_wait = stats["wait_ms_sum"] / checkouts if checkouts else 0
+            logger.info(
+                f"Mongo pool: in use {stats['in_use']}, open {stats['open']}, "
+                f"{checkouts} checkouts, avg wait {avg_wait:.2f} ms, failures {stats['checkout_failures']}"
+            )
+
 db = Database()
 
 async def get_db():
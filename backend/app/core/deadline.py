@@ -0,0 +1,36 @@
+import time
+from contextvars import ContextVar
+from typing import Optional
+from .config import settings
+
+# Monotonic deadline of the current request's database work, set by
+# RequestDeadlineMiddleware. Unset outside requests (background jobs).
+_deadline: ContextVar[Optional[float]] = ContextVar("db_deadline", default=None)
+
+class DeadlineExceeded(Exception):
+    """The request's database time budget ran out before a query was sent."""
+
+def route_budget_ms(path: str) -> int:
+    # /api/<route>/... -> per-route budget, else the default
+    parts = path.strip("/").split("/")
+    route = parts[1] if len(parts) > 1 and parts[0] == "api" else ""
+    return settings.DB_ROUTE_TIME_BUDGETS_MS.get(route, settings.DB_TIME_BUDGET_MS)
+
+def start_deadline(budget_ms: int):
+    return _deadline.set(time.monotonic() + budget_ms / 1000)
+
+def reset_deadline(token):
+    _deadline.reset(token)
+
+def time_limit_ms() -> int:
+    """``maxTimeMS`` for the next operation: what is left of the request budget.
+
+    Outside a request each operation gets DB_TIME_BUDGET_MS on its own.
+    """
+    deadline = _deadline.get()
+    if deadline is None:
+        return settings.DB_TIME_BUDGET_MS
+    remaining = int((deadline - time.monotonic()) * 1000)
+    if remaining <= 0:
+        raise DeadlineExceeded()
+    return remaining
@@ -0,0 +1,215 @@
+import zlib
+import orjson
+
+try:
+    import msgpack
+except ImportError:  # not in requirements-minimal.txt
+    msgpack = None
+
+try:
+    import brotli
+except ImportError:  # not in requirements-minimal.txt
+    brotli = None
+
+MSGPACK_TYPES = ("application/msgpack", "application/x-msgpack")
+# Content types worth compressing; images, archives etc. already are
+COMPRESSIBLE = (b"text/", b"application/json", b"application/msgpack", b"application/x-msgpack")
+
+def _qualities(header: str) -> dict:
+    """``{token: q}`` from an Accept or Accept-Encoding header."""
+    qualities = {}
+    for part in header.split(","):
+        token, _, params = part.partition(";")
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if token.strip():
+            qualities[token.strip().lower()] = q
+    return qualities
+
+def _header(scope_or_message, name: bytes) -> bytes:
+    for key, value in scope_or_message["headers"]:
+        if key.lower() == name:
+            return value
+    return b""
+
+def _with_headers(headers, **changes) -> list:
+    """``headers`` with the given ones replaced (None drops them); Vary is appended to."""
+    names = {name.replace("_", "-").encode(): value for name, value in changes.items()}
+    result = []
+    vary = names.pop(b"vary", None)
+    for key, value in headers:
+        key_lower = key.lower()
+        if key_lower == b"vary" and vary is not None:
+            value, vary = value + b", " + vary, None
+        elif key_lower in names:
+            continue
+        result.append((key, value))
+    result.extend((key, value) for key, value in names.items() if value is not None)
+    if vary is not None:
+        result.append((b"vary", vary))
+    return result
+
+def wants_msgpack(accept: str) -> bool:
+    qualities = _qualities(accept)
+    msgpack_q = max(qualities.get(media_type, 0.0) for media_type in MSGPACK_TYPES)
+    return msgpack_q > 0 and msgpack_q >= qualities.get("application/json", 0.0)
+
+class MessagePackMiddleware:
+    """Send JSON responses as MessagePack to clients that ask for it.
+
+    With ``Accept: application/msgpack`` any ``application/json`` response,
+    error responses included, is re-encoded once complete. The data model is
+    the JSON one (dates stay ISO strings), so a client only swaps decoders.
+    orjson parsing is cheap next to building the JSON, which keeps routers
+    unaware of the wire format. Without the msgpack package clients get JSON.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or msgpack is None:
+            await self.app(scope, receive, send)
+            return
+
+        negotiate = wants_msgpack(_header(scope, b"accept").decode("latin-1"))
+        start = None
+        chunks = []
+
+        async def send_negotiated(message):
+            nonlocal start
+            if message["type"] == "http.response.start":
+                if not _header(message, b"content-type").startswith(b"application/json"):
+                    await send(message)
+                    return
+                start = message
+                if not negotiate:
+                    await send({**start, "headers": _with_headers(start["headers"], vary=b"Accept")})
+                    start = None
+                return
+            if start is None:
+                await send(message)
+                return
+            chunks.append(message.get("body", b""))
+            if message.get("more_body", False):
+                return
+            body = b"".join(chunks)
+            if body:
+                body = msgpack.packb(orjson.loads(body))
+            headers = _with_headers(
+                start["headers"], content_type=b"application/msgpack",
+                content_length=str(len(body)).encode(), vary=b"Accept",
+            )
+            await send({**start, "headers": headers})
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_negotiated)
+
+class _Gzip:
+    name = b"gzip"
+
+    def __init__(self, level: int):
+        self._stream = zlib.compressobj(level, zlib.DEFLATED, 31)  # 31: gzip container
+
+    def chunk(self, data: bytes) -> bytes:
+        return self._stream.compress(data) + self._stream.flush(zlib.Z_SYNC_FLUSH)
+
+    def last(self, data: bytes) -> bytes:
+        return self._stream.compress(data) + self._stream.flush()
+
+class _Brotli:
+    name = b"br"
+
+    def __init__(self, quality: int):
+        self._stream = brotli.Compressor(quality=quality)
+
+    def chunk(self, data: bytes) -> bytes:
+        return self._stream.process(data) + self._stream.flush()
+
+    def last(self, data: bytes) -> bytes:
+        return self._stream.process(data) + self._stream.finish()
+
+class CompressionMiddleware:
+    """Compress responses with brotli or gzip, following Accept-Encoding.
+
+    Bodies sent in one piece are compressed only from ``minimum_size``
+    bytes. Streamed bodies (``more_body``, e.g. the SSE advice stream) are
+    always compressed and flushed chunk by chunk, so every event still
+    reaches the client as soon as it is produced. brotli is preferred when
+    the package is installed and the client accepts it at the same q.
+    """
+
+    def __init__(self, app, minimum_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 4):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    def _encoder(self, accept_encoding: str):
+        qualities = _qualities(accept_encoding)
+        any_q = qualities.get("*", 0.0)
+        br_q = qualities.get("br", any_q)
+        gzip_q = qualities.get("gzip", any_q)
+        if brotli is not None and br_q > 0 and br_q >= gzip_q:
+            return lambda: _Brotli(self.brotli_quality)
+        if gzip_q > 0:
+            return lambda: _Gzip(self.gzip_level)
+        return None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoder = self._encoder(_header(scope, b"accept-encoding").decode("latin-1"))
+        if encoder is None:
+            await self.app(scope, receive, send)
+            return
+
+        start = None
+        stream = None
+
+        async def send_compressed(message):
+            nonlocal start, stream
+            if message["type"] == "http.response.start":
+                content_type = _header(message, b"content-type")
+                if _header(message, b"content-encoding") or not content_type.startswith(COMPRESSIBLE):
+                    await send(message)
+                    return
+                start = message  # held until we know the body size
+                return
+            if start is None:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if stream is None:
+                if not more_body and len(body) < self.minimum_size:
+                    await send({**start, "headers": _with_headers(start["headers"], vary=b"Accept-Encoding")})
+                    await send(message)
+                    start = None
+                    return
+                stream = encoder()
+                if not more_body:
+                    body = stream.last(body)
+                    headers = _with_headers(
+                        start["headers"], content_encoding=stream.name,
+                        content_length=str(len(body)).encode(), vary=b"Accept-Encoding",
+                    )
+                    await send({**start, "headers": headers})
+                    await send({"type": "http.response.body", "body": body})
+                    return
+                headers = _with_headers(
+                    start["headers"], content_encoding=stream.name, content_length=None, vary=b"Accept-Encoding",
+                )
+                await send({**start, "headers": headers})
+            body = stream.chunk(body) if more_body else stream.last(body)
+            await send({"type": "http.response.body", "body": body, "more_body": more_body})
+
+        await self.app(scope, receive, send_compressed)
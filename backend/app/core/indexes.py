@@ -0,0 +1,219 @@
+import logging
+from typing import Optional
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.errors import OperationFailure
+from .database import db
+
+logger = logging.getLogger(__name__)
+
+# Declarative index registry: collection -> indexes the application relies on.
+# Applied idempotently at startup and checked against the declared query
+# patterns in CI (python -m app.jobs.check_indexes).
+INDEXES = {
+    "users": [
+        IndexModel([("email", ASCENDING)], name="email_unique", unique=True),
+    ],
+    "transactions": [
+        IndexModel([("user_id", ASCENDING), ("date", DESCENDING)], name="user_date"),
+        IndexModel([("created_at", ASCENDING)], name="created_at"),
+        IndexModel([("date", ASCENDING)], name="date"),
+    ],
+    "transactions_archive": [
+        IndexModel([("user_id", ASCENDING), ("date", DESCENDING)], name="user_date"),
+    ],
+    "transaction_summaries": [
+        IndexModel([("user_id", ASCENDING), ("month", ASCENDING)], name="user_month_unique", unique=True),
+    ],
+    "budgets": [
+        IndexModel([("user_id", ASCENDING), ("category", ASCENDING)], name="user_category"),
+    ],
+    "goals": [
+        IndexModel([("user_id", ASCENDING)], name="user"),
+    ],
+    "advice_jobs": [
+        IndexModel([("user_id", ASCENDING)], name="user"),
+        IndexModel([("status", ASCENDING), ("available_at", ASCENDING)], name="status_available"),
+        IndexModel([("status", ASCENDING), ("lease_expires_at", ASCENDING)], name="status_lease"),
+    ],
+    "advice_cache": [
+        IndexModel([("user_id", ASCENDING)], name="user_unique", unique=True),
+    ],
+    "refresh_tokens": [
+        IndexModel([("token_hash", ASCENDING)], name="token_hash_unique", unique=True),
+        IndexModel([("family_id", ASCENDING)], name="family"),
+        IndexModel([("expires_at", ASCENDING)], name="expires_ttl", expireAfterSeconds=0),
+    ],
+    "revoked_tokens": [
+        IndexModel([("jti", ASCENDING)], name="jti_unique", unique=True),
+        IndexModel([("revoked_at", ASCENDING)], name="revoked_at"),
+        IndexModel([("expires_at", ASCENDING)], name="expires_ttl", expireAfterSeconds=0),
+    ],
+    "login_attempts": [
+        IndexModel([("key", ASCENDING), ("window", ASCENDING)], name="key_window_unique", unique=True),
+        IndexModel([("expires_at", ASCENDING)], name="expires_ttl", expireAfterSeconds=0),
+    ],
+    "request_profiles": [
+        IndexModel([("started_at", DESCENDING)], name="started_at"),
+        IndexModel([("expires_at", ASCENDING)], name="expires_ttl", expireAfterSeconds=0),
+    ],
+    "jwt_keys": [
+        IndexModel([("kid", ASCENDING)], name="kid_unique", unique=True),
+        IndexModel([("alg", ASCENDING)], name="alg"),
+    ],
+}
+
+# Query shapes issued by the application, declared with ``query_pattern`` on
+# the function that issues them. ``equality`` fields are matched exactly (or
+# with $in), ``sort`` fields are sorted on or range-filtered. Queries on
+# ``_id`` are served by the default index and are not declared. The test
+# suite records every query the in-memory engine runs and fails on one that
+# ``is_declared`` does not recognise.
+_QUERY_FUNCTIONS = []
+_RANGE_OPERATORS = {"$gt", "$gte", "$lt", "$lte"}
+_EQUALITY_OPERATORS = {"$eq", "$in"}
+
+def query_pattern(collection=None, equality: tuple = (), sort: tuple = (), scan: Optional[str] = None):
+    """Declare a query shape issued by the decorated function.
+
+    On a ``Repository`` method ``collection`` defaults to the repository's
+    own, and a method inherited by a subclass also counts for its collection.
+    Code working on several collections passes a callable returning them.
+    ``scan`` marks a deliberate unindexed read and says why it stays cheap.
+    """
+    def decorate(func):
+        func.__dict__.setdefault("query_patterns", []).append(
+            {"collection": collection, "equality": list(equality), "sort": list(sort), "scan": scan}
+        )
+        if func not in _QUERY_FUNCTIONS:
+            _QUERY_FUNCTIONS.append(func)
+        return func
+    return decorate
+
+def query_patterns() -> list:
+    """Patterns declared by every imported module, with the function as ``source``."""
+    from ..repositories.base import Repository
+    repositories = []
+    pending = list(Repository.__subclasses__())
+    while pending:
+        cls = pending.pop()
+        repositories.append(cls)
+        pending.extend(cls.__subclasses__())
+    patterns = []
+    for func in _QUERY_FUNCTIONS:
+        source = f"{func.__module__}.{func.__qualname__}"
+        owners = [cls.collection_name for cls in repositories if getattr(cls, func.__name__, None) is func]
+        for pattern in func.query_patterns:
+            if callable(pattern["collection"]):
+                collections = list(pattern["collection"]())
+            else:
+                collections = [pattern["collection"]] if pattern["collection"] else owners
+            if not collections:
+                raise ValueError(f"{source}: query_pattern needs a collection outside a Repository")
+            patterns.extend({**pattern, "collection": collection, "source": source} for collection in collections)
+    return patterns
+
+def query_shapes(query: Optional[dict]) -> list:
+    """``(equality, range)`` field sets of a filter, one pair per $or branch.
+
+    Fields under other operators ($exists, $type, $ne...) only filter the
+    documents an index found and are left out.
+    """
+    shapes = [(frozenset(), frozenset())]
+    for key, cond in (query or {}).items():
+        if key in ("$and", "$or"):
+            branches = [shape for sub in cond for shape in query_shapes(sub)]
+            if key == "$and":
+                # Every clause applies: fold them into one shape per branch
+                branches = [(frozenset().union(*(e for e, _ in branches)), frozenset().union(*(r for _, r in branches)))]
+            shapes = [(e | e2, r | r2) for e, r in shapes for e2, r2 in branches]
+        elif key.startswith("$"):
+            continue
+        elif isinstance(cond, dict) and cond and all(k.startswith("$") for k in cond):
+            if set(cond) & _EQUALITY_OPERATORS:
+                shapes = [(e | {key}, r) for e, r in shapes]
+            elif set(cond) & _RANGE_OPERATORS:
+                shapes = [(e, r | {key}) for e, r in shapes]
+        else:
+            shapes = [(e | {key}, r) for e, r in shapes]
+    return shapes
+
+def _declares(pattern: dict, equality: frozenset, ranges: frozenset, sort: list) -> bool:
+    declared = set(pattern["equality"]) | set(pattern["sort"])
+    if pattern["scan"]:
+        return declared <= equality | ranges | set(sort)
+    if not declared or not set(pattern["equality"]) <= equality:
+        return False
+    return set(pattern["sort"]) <= ranges | set(sort) and set(sort) <= declared
+
+def is_declared(collection: str, query: Optional[dict], sort: Optional[list] = None, patterns: Optional[list] = None) -> bool:
+    """Whether a query on ``collection`` matches a declared pattern.
+
+    ``sort`` is a list of field names. Lookups by ``_id`` and walks in
+    ``_id`` order use the default index and always count as declared.
+    """
+    sort = list(sort or [])
+    patterns = [p for p in (patterns if patterns is not None else query_patterns()) if p["collection"] == collection]
+    for equality, ranges in query_shapes(query):
+        if "_id" in equality or (sort == ["_id"] and not equality):
+            continue
+        if not any(_declares(pattern, equality, ranges, sort) for pattern in patterns):
+            return False
+    return True
+
+def _fields(index: IndexModel) -> list:
+    return [field for field, _ in index.document["key"].items()]
+
+def index_supports(fields: list, pattern: dict) -> bool:
+    """Whether an index on ``fields`` can serve ``pattern`` without a scan.
+
+    The index must start with at least one equality field. Sort/range fields
+    must directly follow the full set of equality fields (or lead the index
+    when the pattern has no equality fields).
+    """
+    equality = set(pattern.get("equality", []))
+    sort = pattern.get("sort", [])
+    prefix = 0
+    while prefix < len(fields) and fields[prefix] in equality:
+        prefix += 1
+    if not equality:
+        return fields[:len(sort)] == sort
+    if prefix == 0:
+        return False
+    if not sort:
+        return True
+    return prefix == len(equality) and fields[prefix:prefix + len(sort)] == sort
+
+def uncovered_query_patterns() -> list:
+    return [
+        pattern for pattern in query_patterns()
+        if not pattern["scan"]
+        and not any(index_supports(fields, pattern) for fields in [["_id"]] + [_fields(index) for index in INDEXES.get(pattern["collection"], [])])
+    ]
+
+async def ensure_indexes():
+    """Create every declared index; existing identical indexes are a no-op."""
+    for collection, indexes in INDEXES.items():
+        try:
+            await db.db[collection].create_indexes(indexes)
+        except OperationFailure as e:
+            # e.g. an index with the same name but different options already exists
+            logger.error(f"Could not create indexes on {collection}: {str(e)}")
+
+async def verify_indexes() -> dict:
+    """Compare declared indexes with the database by key specification.
+
+    Returns ``{collection: {"missing": [...], "extra": [...]}}`` for every
+    collection that differs.
+    """
+    report = {}
+    for collection, indexes in INDEXES.items():
+        declared = {tuple(index.document["key"].items()): index.document["name"] for index in indexes}
+        existing = {}
+        async for info in db.db[collection].list_indexes():
+            if info["name"] != "_id_":
+                existing[tuple(info["key"].items())] = info["name"]
+        missing = [name for key, name in declared.items() if key not in existing]
+        extra = [name for key, name in existing.items() if key not in declared]
+        if missing or extra:
+            report[collection] = {"missing": missing, "extra": extra}
+    return report
@@ -0,0 +1,180 @@
+import asyncio
+import logging
+import os
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from .config import settings
+from .database import db
+from .indexes import query_pattern
+
+logger = logging.getLogger(__name__)
+
+ASYMMETRIC_ALGORITHMS = ("EdDSA", "RS256")
+
+class KeySet:
+    """JWT signing and verification keys for asymmetric algorithms.
+
+    Signing nodes keep private keys as ``<kid>.pem`` files in
+    JWT_PRIVATE_KEYS_DIR; the newest one signs. Every public key is published
+    to the ``jwt_keys`` collection, which is all a verification-only node
+    needs: it loads the key set at startup, refreshes it every
+    JWT_KEYS_REFRESH_SECONDS and reloads early when it sees an unknown ``kid``.
+
+    With HS256 the key set is unused and JWT_SECRET signs and verifies.
+    """
+
+    def __init__(self):
+        self.signing_kid: Optional[str] = None
+        self.signing_key = None
+        self.signing_created_at: Optional[datetime] = None
+        self.public_keys = {}
+        self._last_reload = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def enabled(self) -> bool:
+        return settings.JWT_ALGORITHM in ASYMMETRIC_ALGORITHMS
+
+    def _generate(self):
+        from cryptography.hazmat.primitives.asymmetric import ed25519, rsa
+        if settings.JWT_ALGORITHM == "EdDSA":
+            return ed25519.Ed25519PrivateKey.generate()
+        return rsa.generate_private_key(public_exponent=65537, key_size=2048)
+
+    @staticmethod
+    def _public_pem(private_key) -> str:
+        from cryptography.hazmat.primitives import serialization
+        return private_key.public_key().public_bytes(
+            serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo
+        ).decode("ascii")
+
+    def _load_private_keys(self):
+        from cryptography.hazmat.primitives import serialization
+        directory = settings.JWT_PRIVATE_KEYS_DIR
+        if not directory or not os.path.isdir(directory):
+            return
+        newest = None
+        for name in os.listdir(directory):
+            if not name.endswith(".pem"):
+                continue
+            path = os.path.join(directory, name)
+            mtime = os.path.getmtime(path)
+            if newest is None or mtime > newest[0]:
+                newest = (mtime, name[:-len(".pem")], path)
+        if newest is None:
+            return
+        mtime, kid, path = newest
+        with open(path, "rb") as f:
+            self.signing_key = serialization.load_pem_private_key(f.read(), password=None)
+        self.signing_kid = kid
+        self.signing_created_at = datetime.fromtimestamp(mtime, timezone.utc)
+
+    @query_pattern("jwt_keys", equality=["kid"])
+    async def _publish(self, kid: str, private_key):
+        await db.db.jwt_keys.update_one(
+            {"kid": kid},
+            {"$setOnInsert": {
+                "kid": kid,
+                "alg": settings.JWT_ALGORITHM,
+                "public_pem": self._public_pem(private_key),
+                "created_at": datetime.now(timezone.utc),
+            }},
+            upsert=True
+        )
+
+    @query_pattern("jwt_keys", equality=["alg"])
+    async def reload(self):
+        """Refresh the verification keys from ``jwt_keys``."""
+        from cryptography.hazmat.primitives import serialization
+        # Retired keys stay verifiable until every token they signed has expired
+        cutoff = datetime.now(timezone.utc) - timedelta(minutes=settings.ACCESS_TOKEN_EXPIRATION_MINUTES)
+        public_keys = {}
+        query = {"alg": settings.JWT_ALGORITHM, "$or": [{"retired_at": None}, {"retired_at": {"$gt": cutoff}}]}
+        async for doc in db.db.jwt_keys.find(query):
+            public_keys[doc["kid"]] = serialization.load_pem_public_key(doc["public_pem"].encode("ascii"))
+        if self.signing_key is not None:
+            public_keys[self.signing_kid] = self.signing_key.public_key()
+        self.public_keys = public_keys
+        self._last_reload = time.monotonic()
+
+    async def rotate(self):
+        """Generate a new signing key, publish it and retire the previous one."""
+        directory = settings.JWT_PRIVATE_KEYS_DIR
+        from cryptography.hazmat.primitives import serialization
+        private_key = self._generate()
+        kid = uuid.uuid4().hex[:16]
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{kid}.pem")
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        with os.fdopen(fd, "wb") as f:
+            f.write(private_key.private_bytes(
+                serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+            ))
+        # Publish before signing with it so verifiers can already resolve the kid
+        await self._publish(kid, private_key)
+        previous = self.signing_kid
+        self.signing_kid, self.signing_key = kid, private_key
+        self.signing_created_at = datetime.now(timezone.utc)
+        if previous:
+            await db.db.jwt_keys.update_one({"kid": previous}, {"$set": {"retired_at": self.signing_created_at}})
+        await self.reload()
+        logger.info(f"Rotated JWT signing key to {kid}")
+
+    def _rotation_due(self) -> bool:
+        if not settings.JWT_PRIVATE_KEYS_DIR or settings.JWT_KEY_ROTATION_HOURS <= 0:
+            return False
+        if self.signing_key is None:
+            return True
+        age = datetime.now(timezone.utc) - self.signing_created_at
+        return age >= timedelta(hours=settings.JWT_KEY_ROTATION_HOURS)
+
+    async def load(self):
+        if not self.enabled:
+            if not settings.JWT_SECRET:
+                raise RuntimeError(f"JWT_SECRET is required with {settings.JWT_ALGORITHM}")
+            return
+        self._load_private_keys()
+        if self.signing_key is not None:
+            await self._publish(self.signing_kid, self.signing_key)
+        if self._rotation_due():
+            await self.rotate()
+        else:
+            await self.reload()
+        logger.info(
+            f"Loaded {len(self.public_keys)} JWT verification keys"
+            + (f", signing with {self.signing_kid}" if self.signing_key is not None else " (verification only)")
+        )
+
+    def get_public_key(self, kid: str):
+        return self.public_keys.get(kid)
+
+    def should_reload_for_unknown_kid(self) -> bool:
+        # Bounded so a flood of forged kids cannot turn into a flood of queries
+        return time.monotonic() - self._last_reload >= settings.JWT_KEYS_MIN_RELOAD_SECONDS
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(settings.JWT_KEYS_REFRESH_SECONDS)
+            try:
+                if self._rotation_due():
+                    await self.rotate()
+                else:
+                    await self.reload()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"JWT key refresh failed: {str(e)}")
+
+    def start(self):
+        if self.enabled:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+key_set = KeySet()
@@ -0,0 +1,707 @@
+import copy
+import re
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Optional
+from bson import Decimal128, Int64, ObjectId
+from pymongo import DeleteMany, DeleteOne, InsertOne, ReturnDocument, UpdateMany, UpdateOne
+from pymongo.errors import DuplicateKeyError, OperationFailure
+
+# In-memory stand-in for the subset of the Motor API this application uses.
+# Query semantics follow MongoDB where the app depends on them: datetimes come
+# back naive UTC with millisecond precision, a ``None`` equality matches missing
+# fields, array fields match any element, comparisons across types never match,
+# unique indexes are enforced and ``insert_one`` sets ``_id`` on the caller's
+# document. Documents with a ``user_id`` are bucketed by it, so the per-user
+# queries every router issues do not scan the whole collection.
+
+_MISSING = object()
+
+def _normalize(value):
+    if isinstance(value, datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        return value.replace(microsecond=value.microsecond // 1000 * 1000)
+    if isinstance(value, dict):
+        return {k: _normalize(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    return value
+
+def _get(doc: dict, path: str):
+    value = doc
+    for part in path.split("."):
+        if isinstance(value, dict) and part in value:
+            value = value[part]
+        else:
+            return _MISSING
+    return value
+
+def _set(doc: dict, path: str, value):
+    parts = path.split(".")
+    for part in parts[:-1]:
+        doc = doc.setdefault(part, {})
+    doc[parts[-1]] = value
+
+def _unset(doc: dict, path: str):
+    parts = path.split(".")
+    for part in parts[:-1]:
+        doc = doc.get(part)
+        if not isinstance(doc, dict):
+            return
+    doc.pop(parts[-1], None)
+
+def _compare(value, op: str, arg) -> bool:
+    if value is _MISSING or value is None or arg is None:
+        return False
+    try:
+        if op == "$gt":
+            return value > arg
+        if op == "$gte":
+            return value >= arg
+        if op == "$lt":
+            return value < arg
+        return value <= arg
+    except TypeError:
+        return False
+
+def _equals(value, arg) -> bool:
+    if arg is None:
+        return value is _MISSING or value is None
+    if value is _MISSING:
+        return False
+    if isinstance(value, list) and not isinstance(arg, list):
+        return arg in value
+    return value == arg
+
+_BSON_TYPES = {
+    "double": float,
+    "string": str,
+    "object": dict,
+    "array": list,
+    "objectId": ObjectId,
+    "bool": bool,
+    "date": datetime,
+    "int": int,
+    "long": int,
+    "decimal": Decimal128,
+}
+
+def _has_type(value, name) -> bool:
+    if value is _MISSING:
+        return False
+    if name == "null":
+        return value is None
+    if name == "number":
+        return isinstance(value, (int, float, Decimal128)) and not isinstance(value, bool)
+    if name in ("int", "long", "double") and isinstance(value, bool):
+        return False
+    return isinstance(value, _BSON_TYPES[name])
+
+def _type_name(value) -> str:
+    if value is _MISSING:
+        return "missing"
+    if value is None:
+        return "null"
+    if isinstance(value, bool):
+        return "bool"
+    if isinstance(value, Int64):
+        return "long"
+    for name, cls in _BSON_TYPES.items():
+        if isinstance(value, cls):
+            return name
+    raise OperationFailure(f"Unsupported BSON type in memory backend: {type(value).__name__}")
+
+def _match_condition(value, cond) -> bool:
+    if isinstance(cond, dict) and cond and all(k.startswith("$") for k in cond):
+        for op, arg in cond.items():
+            arg = _normalize(arg)
+            if op == "$eq":
+                ok = _equals(value, arg)
+            elif op == "$ne":
+                ok = not _equals(value, arg)
+            elif op == "$in":
+                ok = any(_equals(value, a) for a in arg)
+            elif op == "$nin":
+                ok = not any(_equals(value, a) for a in arg)
+            elif op in ("$gt", "$gte", "$lt", "$lte"):
+                if isinstance(value, list):
+                    ok = any(_compare(v, op, arg) for v in value)
+                else:
+                    ok = _compare(value, op, arg)
+            elif op == "$exists":
+                ok = (value is not _MISSING) == bool(arg)
+            elif op == "$regex":
+                ok = isinstance(value, str) and re.search(arg, value, re.I if "i" in cond.get("$options", "") else 0) is not None
+            elif op == "$options":
+                ok = True
+            elif op == "$type":
+                ok = any(_has_type(value, t) for t in (arg if isinstance(arg, list) else [arg]))
+            else:
+                raise OperationFailure(f"Unsupported query operator in memory backend: {op}")
+            if not ok:
+                return False
+        return True
+    return _equals(value, _normalize(cond))
+
+def matches(doc: dict, query: Optional[dict]) -> bool:
+    for key, cond in (query or {}).items():
+        if key == "$or":
+            if not any(matches(doc, q) for q in cond):
+                return False
+        elif key == "$and":
+            if not all(matches(doc, q) for q in cond):
+                return False
+        elif key == "$nor":
+            if any(matches(doc, q) for q in cond):
+                return False
+        elif not _match_condition(_get(doc, key), cond):
+            return False
+    return True
+
+def _sort_key(value):
+    # MongoDB orders missing/null before any other value
+    if value is _MISSING or value is None:
+        return (0, 0)
+    return (1, value)
+
+def sort_documents(docs: list, spec) -> list:
+    for field, direction in reversed(spec):
+        docs.sort(key=lambda d: _sort_key(_get(d, field)), reverse=direction < 0)
+    return docs
+
+def _project(doc: dict, projection) -> dict:
+    if not projection:
+        return dict(doc)
+    if isinstance(projection, (list, tuple)):
+        projection = {field: 1 for field in projection}
+    include_id = projection.get("_id", 1)
+    fields = {k: v for k, v in projection.items() if k != "_id"}
+    # Exclusion only; ``{"_id": 0}`` on its own keeps every other field
+    if all(not v for v in fields.values()) and (fields or not include_id):
+        result = dict(doc)
+        for field in fields:
+            _unset(result, field)
+    else:
+        result = {}
+        for field in fields:
+            value = _get(doc, field)
+            if value is not _MISSING:
+                _set(result, field, value)
+    if include_id and "_id" in doc:
+        result["_id"] = doc["_id"]
+    elif not include_id:
+        result.pop("_id", None)
+    return result
+
+def evaluate(doc: dict, expr):
+    """Evaluate an aggregation expression against ``doc``."""
+    if isinstance(expr, str) and expr.startswith("$"):
+        value = _get(doc, expr[1:])
+        return None if value is _MISSING else value
+    if isinstance(expr, dict):
+        if len(expr) == 1:
+            op, args = next(iter(expr.items()))
+            if op.startswith("$"):
+                return _evaluate_operator(doc, op, args)
+        return {k: evaluate(doc, v) for k, v in expr.items()}
+    if isinstance(expr, list):
+        return [evaluate(doc, v) for v in expr]
+    return _normalize(expr)
+
+def _evaluate_operator(doc: dict, op: str, args):
+    if not isinstance(args, list):
+        args = [args]
+    if op == "$cond" and len(args) == 3:
+        # Only the branch taken is evaluated, as in MongoDB
+        return evaluate(doc, args[1] if evaluate(doc, args[0]) else args[2])
+    values = [evaluate(doc, a) for a in args]
+    if op == "$slice":
+        array, n = values[0], values[1]
+        return array[:n] if n >= 0 else array[n:]
+    if op == "$add":
+        return sum(v for v in values if v is not None)
+    if op == "$subtract":
+        return values[0] - values[1]
+    if op == "$multiply":
+        result = 1
+        for v in values:
+            result *= v
+        return result
+    if op == "$divide":
+        return values[0] / values[1]
+    if op == "$eq":
+        return values[0] == values[1]
+    if op == "$ne":
+        return values[0] != values[1]
+    if op in ("$gt", "$gte", "$lt", "$lte"):
+        return _compare(values[0], op, values[1])
+    if op == "$cond":
+        if isinstance(args[0], dict) and "if" in args[0]:
+            spec = args[0]
+            return evaluate(doc, spec["then"] if evaluate(doc, spec["if"]) else spec["else"])
+        return values[1] if values[0] else values[2]
+    if op == "$ifNull":
+        return values[0] if values[0] is not None else values[1]
+    if op in ("$year", "$month"):
+        return getattr(values[0], op[1:])
+    if op == "$type":
+        value = _get(doc, args[0][1:]) if isinstance(args[0], str) and args[0].startswith("$") else values[0]
+        return _type_name(value)
+    if op == "$round":
+        return None if values[0] is None else round(values[0], values[1] if len(values) > 1 else 0)
+    if op == "$toLong":
+        return None if values[0] is None else Int64(int(values[0]))
+    if op == "$size":
+        return len(values[0])
+    raise OperationFailure(f"Unsupported aggregation operator in memory backend: {op}")
+
+def _group(docs: list, spec: dict) -> list:
+    key_expr = spec["_id"]
+    groups = {}
+    for doc in docs:
+        key = evaluate(doc, key_expr)
+        hashable = repr(key) if isinstance(key, (dict, list)) else key
+        group = groups.get(hashable)
+        if group is None:
+            group = groups[hashable] = {"_id": key, "__docs": []}
+        group["__docs"].append(doc)
+    results = []
+    for group in groups.values():
+        members = group.pop("__docs")
+        for field, accumulator in spec.items():
+            if field == "_id":
+                continue
+            (op, expr), = accumulator.items()
+            values = [evaluate(d, expr) for d in members]
+            if op == "$sum":
+                group[field] = sum(v for v in values if isinstance(v, (int, float)))
+            elif op == "$avg":
+                numbers = [v for v in values if isinstance(v, (int, float))]
+                group[field] = sum(numbers) / len(numbers) if numbers else None
+            elif op == "$push":
+                group[field] = values
+            elif op == "$addToSet":
+                group[field] = list(dict.fromkeys(values))
+            elif op == "$first":
+                group[field] = values[0] if values else None
+            elif op == "$last":
+                group[field] = values[-1] if values else None
+            elif op == "$max":
+                present = [v for v in values if v is not None]
+                group[field] = max(present) if present else None
+            elif op == "$min":
+                present = [v for v in values if v is not None]
+                group[field] = min(present) if present else None
+            else:
+                raise OperationFailure(f"Unsupported accumulator in memory backend: {op}")
+        results.append(group)
+    return results
+
+def run_pipeline(docs: list, pipeline: list) -> list:
+    for stage in pipeline:
+        (name, spec), = stage.items()
+        if name == "$match":
+            docs = [d for d in docs if matches(d, spec)]
+        elif name == "$sort":
+            docs = sort_documents(list(docs), list(spec.items()))
+        elif name == "$limit":
+            docs = docs[:spec]
+        elif name == "$skip":
+            docs = docs[spec:]
+        elif name == "$group":
+            docs = _group(docs, spec)
+        elif name == "$project":
+            projected = []
+            for doc in docs:
+                if all(v in (0, 1, True, False) for v in spec.values()):
+                    projected.append(_project(doc, spec))
+                    continue
+                result = {"_id": doc.get("_id")} if spec.get("_id", 1) else {}
+                for field, expr in spec.items():
+                    if field == "_id" and expr in (0, False):
+                        continue
+                    result[field] = _get(doc, field) if expr in (1, True) else evaluate(doc, expr)
+                projected.append(result)
+            docs = projected
+        elif name == "$count":
+            docs = [{spec: len(docs)}]
+        else:
+            raise OperationFailure(f"Unsupported pipeline stage in memory backend: {name}")
+    return docs
+
+class InsertOneResult:
+    def __init__(self, inserted_id):
+        self.inserted_id = inserted_id
+
+class InsertManyResult:
+    def __init__(self, inserted_ids):
+        self.inserted_ids = inserted_ids
+
+class UpdateResult:
+    def __init__(self, matched_count: int, modified_count: int, upserted_id=None):
+        self.matched_count = matched_count
+        self.modified_count = modified_count
+        self.upserted_id = upserted_id
+
+class DeleteResult:
+    def __init__(self, deleted_count: int):
+        self.deleted_count = deleted_count
+
+class BulkWriteResult:
+    def __init__(self):
+        self.inserted_count = 0
+        self.matched_count = 0
+        self.modified_count = 0
+        self.deleted_count = 0
+        self.upserted_count = 0
+
+class MemoryCursor:
+    def __init__(self, loader, projection=None):
+        self._loader = loader
+        self._projection = projection
+        self._sort = None
+        self._skip = 0
+        self._limit = 0
+
+    def sort(self, key_or_list, direction=None):
+        self._sort = [(key_or_list, direction or 1)] if isinstance(key_or_list, str) else list(key_or_list)
+        return self
+
+    def skip(self, n: int):
+        self._skip = n
+        return self
+
+    def limit(self, n: int):
+        self._limit = n
+        return self
+
+    def max_time_ms(self, ms):
+        return self
+
+    def _results(self) -> list:
+        docs = self._loader()
+        if self._sort:
+            docs = sort_documents(docs, self._sort)
+        if self._skip:
+            docs = docs[self._skip:]
+        if self._limit:
+            docs = docs[:self._limit]
+        return [_project(d, self._projection) for d in docs]
+
+    async def to_list(self, length: Optional[int] = None) -> list:
+        results = self._results()
+        return results[:length] if length else results
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for doc in self._results():
+            yield doc
+
+class MemoryCollection:
+    def __init__(self, name: str, database=None):
+        self.name = name
+        self.database = database
+        self._docs = {}
+        self._by_user = defaultdict(dict)
+        self._indexes = {}
+        self._unique = {}  # index name -> {key tuple: _id}
+
+    # -- storage helpers -------------------------------------------------
+
+    def _candidates(self, query: Optional[dict]) -> list:
+        query = query or {}
+        doc_id = query.get("_id")
+        if doc_id is not None and not isinstance(doc_id, dict):
+            doc = self._docs.get(doc_id)
+            return [doc] if doc is not None and matches(doc, query) else []
+        user_id = query.get("user_id")
+        if isinstance(user_id, str):
+            pool = self._by_user.get(user_id, {}).values()
+        elif isinstance(user_id, dict) and set(user_id) == {"$in"}:
+            pool = [d for u in user_id["$in"] for d in self._by_user.get(u, {}).values()]
+        else:
+            pool = self._docs.values()
+        return [d for d in pool if matches(d, query)]
+
+    def _unique_key(self, fields: list, doc: dict):
+        values = tuple(_get(doc, f) for f in fields)
+        return tuple(None if v is _MISSING else v for v in values)
+
+    def _check_unique(self, doc: dict, exclude_id=None):
+        for name, (fields, entries) in self._unique.items():
+            owner = entries.get(self._unique_key(fields, doc))
+            if owner is not None and owner != exclude_id:
+                raise DuplicateKeyError(f"E11000 duplicate key error collection: {self.name} index: {name}")
+
+    def _store(self, doc: dict):
+        self._docs[doc["_id"]] = doc
+        if isinstance(doc.get("user_id"), str):
+            self._by_user[doc["user_id"]][doc["_id"]] = doc
+        for fields, entries in self._unique.values():
+            entries[self._unique_key(fields, doc)] = doc["_id"]
+
+    def _remove(self, doc: dict):
+        self._docs.pop(doc["_id"], None)
+        user_id = doc.get("user_id")
+        if isinstance(user_id, str):
+            bucket = self._by_user.get(user_id)
+            if bucket is not None:
+                bucket.pop(doc["_id"], None)
+                if not bucket:
+                    del self._by_user[user_id]
+        for fields, entries in self._unique.values():
+            key = self._unique_key(fields, doc)
+            if entries.get(key) == doc["_id"]:
+                del entries[key]
+
+    def _apply_update(self, doc: dict, update, inserting: bool) -> dict:
+        updated = copy.deepcopy(doc)
+        if isinstance(update, list):
+            # Update with an aggregation pipeline; stages see the document as
+            # left by the previous stage
+            for stage in update:
+                (name, spec), = stage.items()
+                if name in ("$set", "$addFields"):
+                    values = {path: evaluate(updated, expr) for path, expr in spec.items()}
+                    for path, value in values.items():
+                        _set(updated, path, value)
+                elif name == "$unset":
+                    for path in ([spec] if isinstance(spec, str) else spec):
+                        _unset(updated, path)
+                else:
+                    raise OperationFailure(f"Unsupported update pipeline stage in memory backend: {name}")
+            return updated
+        for op, fields in update.items():
+            fields = _normalize(fields)
+            if op == "$set":
+                for path, value in fields.items():
+                    _set(updated, path, value)
+            elif op == "$setOnInsert":
+                if inserting:
+                    for path, value in fields.items():
+                        _set(updated, path, value)
+            elif op == "$inc":
+                for path, amount in fields.items():
+                    current = _get(updated, path)
+                    _set(updated, path, (0 if current is _MISSING else current) + amount)
+            elif op == "$unset":
+                for path in fields:
+                    _unset(updated, path)
+            elif op == "$push":
+                for path, value in fields.items():
+                    current = _get(updated, path)
+                    _set(updated, path, ([] if current is _MISSING else list(current)) + [value])
+            elif op == "$min" or op == "$max":
+                for path, value in fields.items():
+                    current = _get(updated, path)
+                    if current is _MISSING or (value < current if op == "$min" else value > current):
+                        _set(updated, path, value)
+            else:
+                raise OperationFailure(f"Unsupported update operator in memory backend: {op}")
+        return updated
+
+    def _upsert_seed(self, query: dict) -> dict:
+        seed = {}
+        for key, cond in query.items():
+            if key.startswith("$"):
+                continue
+            if isinstance(cond, dict) and any(k.startswith("$") for k in cond):
+                if "$eq" in cond:
+                    _set(seed, key, cond["$eq"])
+                continue
+            _set(seed, key, _normalize(cond))
+        return seed
+
+    def _upsert(self, query: dict, update: dict) -> dict:
+        new = self._apply_update(self._upsert_seed(query), update, inserting=True)
+        new.setdefault("_id", ObjectId())
+        # A filter that missed an existing _id (e.g. on another field) upserts a duplicate
+        if new["_id"] in self._docs:
+            raise DuplicateKeyError(f"E11000 duplicate key error collection: {self.name} index: _id_")
+        self._check_unique(new)
+        self._store(new)
+        return new
+
+    def _replace(self, old: dict, new: dict):
+        self._check_unique(new, exclude_id=old["_id"])
+        self._remove(old)
+        self._store(new)
+
+    # -- Motor-compatible API --------------------------------------------
+
+    def find(self, filter: Optional[dict] = None, projection=None, **kwargs) -> MemoryCursor:
+        return MemoryCursor(lambda: self._candidates(filter), projection)
+
+    async def find_one(self, filter: Optional[dict] = None, projection=None, **kwargs):
+        if filter is not None and not isinstance(filter, dict):
+            filter = {"_id": filter}
+        docs = self._candidates(filter)
+        return _project(docs[0], projection) if docs else None
+
+    async def count_documents(self, filter: dict, **kwargs) -> int:
+        return len(self._candidates(filter))
+
+    async def insert_one(self, document: dict, **kwargs) -> InsertOneResult:
+        if "_id" not in document:
+            document["_id"] = ObjectId()
+        doc = _normalize(document)
+        if doc["_id"] in self._docs:
+            raise DuplicateKeyError(f"E11000 duplicate key error collection: {self.name} index: _id_")
+        self._check_unique(doc)
+        self._store(doc)
+        return InsertOneResult(document["_id"])
+
+    async def insert_many(self, documents: list, **kwargs) -> InsertManyResult:
+        ids = []
+        for document in documents:
+            ids.append((await self.insert_one(document)).inserted_id)
+        return InsertManyResult(ids)
+
+    async def update_one(self, filter: dict, update: dict, upsert: bool = False, **kwargs) -> UpdateResult:
+        docs = self._candidates(filter)
+        if docs:
+            new = self._apply_update(docs[0], update, inserting=False)
+            modified = int(new != docs[0])
+            if modified:
+                self._replace(docs[0], new)
+            return UpdateResult(1, modified)
+        if not upsert:
+            return UpdateResult(0, 0)
+        new = self._upsert(filter, update)
+        return UpdateResult(0, 0, upserted_id=new["_id"])
+
+    async def update_many(self, filter: dict, update: dict, upsert: bool = False, **kwargs) -> UpdateResult:
+        docs = self._candidates(filter)
+        if not docs:
+            return await self.update_one(filter, update, upsert=upsert)
+        modified = 0
+        for doc in docs:
+            new = self._apply_update(doc, update, inserting=False)
+            if new != doc:
+                self._replace(doc, new)
+                modified += 1
+        return UpdateResult(len(docs), modified)
+
+    async def find_one_and_update(self, filter: dict, update: dict, projection=None, sort=None,
+                                  upsert: bool = False, return_document=ReturnDocument.BEFORE, **kwargs):
+        docs = self._candidates(filter)
+        if sort:
+            docs = sort_documents(docs, sort)
+        if docs:
+            old = docs[0]
+            new = self._apply_update(old, update, inserting=False)
+            self._replace(old, new)
+            return _project(new if return_document == ReturnDocument.AFTER else old, projection)
+        if not upsert:
+            return None
+        new = self._upsert(filter, update)
+        return _project(new, projection) if return_document == ReturnDocument.AFTER else None
+
+    async def delete_one(self, filter: dict, **kwargs) -> DeleteResult:
+        docs = self._candidates(filter)
+        if not docs:
+            return DeleteResult(0)
+        self._remove(docs[0])
+        return DeleteResult(1)
+
+    async def delete_many(self, filter: dict, **kwargs) -> DeleteResult:
+        docs = self._candidates(filter)
+        for doc in docs:
+            self._remove(doc)
+        return DeleteResult(len(docs))
+
+    async def bulk_write(self, requests: list, ordered: bool = True, **kwargs) -> BulkWriteResult:
+        result = BulkWriteResult()
+        for request in requests:
+            if isinstance(request, InsertOne):
+                await self.insert_one(request._doc)
+                result.inserted_count += 1
+            elif isinstance(request, (UpdateOne, UpdateMany)):
+                update = self.update_one if isinstance(request, UpdateOne) else self.update_many
+                outcome = await update(request._filter, request._doc, upsert=request._upsert)
+                result.matched_count += outcome.matched_count
+                result.modified_count += outcome.modified_count
+                result.upserted_count += int(outcome.upserted_id is not None)
+            elif isinstance(request, (DeleteOne, DeleteMany)):
+                delete = self.delete_one if isinstance(request, DeleteOne) else self.delete_many
+                result.deleted_count += (await delete(request._filter)).deleted_count
+            else:
+                raise OperationFailure(f"Unsupported bulk operation in memory backend: {type(request).__name__}")
+        return result
+
+    def with_options(self, **kwargs) -> "MemoryCollection":
+        # Write concern and read preference do not apply to a single in-process store
+        return self
+
+    def aggregate(self, pipeline: list, **kwargs) -> MemoryCursor:
+        def load():
+            first = pipeline[0] if pipeline else {}
+            # Use the user_id bucket when the pipeline starts with a $match
+            docs = self._candidates(first["$match"]) if "$match" in first else list(self._docs.values())
+            return run_pipeline(docs, pipeline[1:] if "$match" in first else pipeline)
+        return MemoryCursor(load)
+
+    async def create_indexes(self, indexes: list, **kwargs) -> list:
+        names = []
+        for index in indexes:
+            document = index.document
+            name = document["name"]
+            self._indexes[name] = {k: v for k, v in document.items()}
+            if document.get("unique") and name not in self._unique:
+                fields = list(document["key"].keys())
+                entries = {}
+                for doc in self._docs.values():
+                    key = self._unique_key(fields, doc)
+                    if key in entries:
+                        raise DuplicateKeyError(f"E11000 duplicate key error collection: {self.name} index: {name}")
+                    entries[key] = doc["_id"]
+                self._unique[name] = (fields, entries)
+            names.append(name)
+        return names
+
+    def list_indexes(self) -> MemoryCursor:
+        return MemoryCursor(lambda: [{"name": "_id_", "key": {"_id": 1}}] + list(self._indexes.values()))
+
+class MemoryDatabase:
+    def __init__(self, name: str):
+        self.name = name
+        self._collections = {}
+
+    def __getitem__(self, name: str) -> MemoryCollection:
+        collection = self._collections.get(name)
+        if collection is None:
+            collection = self._collections[name] = MemoryCollection(name, self)
+        return collection
+
+    def __getattr__(self, name: str) -> MemoryCollection:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self[name]
+
+    async def list_collection_names(self) -> list:
+        return list(self._collections)
+
+    async def drop_collection(self, name: str):
+        self._collections.pop(name, None)
+
+class MemoryClient:
+    """Drop-in for ``AsyncIOMotorClient`` when DATABASE_BACKEND=memory."""
+
+    def __init__(self):
+        self._databases = {}
+
+    def __getitem__(self, name: str) -> MemoryDatabase:
+        return self.get_database(name)
+
+    def get_database(self, name: str, **kwargs) -> MemoryDatabase:
+        # Read preferences and other options are meaningless for a single in-process store
+        database = self._databases.get(name)
+        if database is None:
+            database = self._databases[name] = MemoryDatabase(name)
+        return database
+
+    def close(self):
+        pass
@@ -0,0 +1,188 @@
+import bisect
+import threading
+import time
+from pymongo import monitoring
+
+# Minimal Prometheus instrumentation. Recording is a bisect plus a few list
+# updates under a lock (events arrive from Motor's executor threads as well as
+# the event loop); all formatting happens when /metrics is scraped.
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+SLOW_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10, 20, 30, 60)
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _labels(names: tuple, values: tuple, extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+class Histogram:
+    def __init__(self, name: str, help: str, labels: tuple = (), buckets: tuple = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.label_names = labels
+        self.buckets = buckets
+        self._series = {}  # label values -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * (len(self.buckets) + 2)
+            if index < len(self.buckets):
+                series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = {labels: list(values) for labels, values in self._series.items()}
+        for labels, values in sorted(series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, values):
+                cumulative += count
+                le = _labels(self.label_names, labels, f'le="{bound}"')
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            le = _labels(self.label_names, labels, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{le} {values[-1]}")
+            lines.append(f"{self.name}_sum{_labels(self.label_names, labels)} {values[-2]}")
+            lines.append(f"{self.name}_count{_labels(self.label_names, labels)} {values[-1]}")
+        return lines
+
+class Counter:
+    def __init__(self, name: str, help: str, labels: tuple = ()):
+        self.name = name
+        self.help = help
+        self.label_names = labels
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount: float = 1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            values = dict(self._values)
+        for labels, value in sorted(values.items()):
+            lines.append(f"{self.name}{_labels(self.label_names, labels)} {value}")
+        return lines
+
+class Callback:
+    """Values read from elsewhere at scrape time (pool state, cache counters)."""
+
+    def __init__(self, name: str, help: str, kind: str, labels: tuple, collect):
+        self.name = name
+        self.help = help
+        self.kind = kind
+        self.label_names = labels
+        self.collect = collect  # () -> {label values tuple: value}
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for labels, value in sorted(self.collect().items()):
+            lines.append(f"{self.name}{_labels(self.label_names, labels)} {value}")
+        return lines
+
+http_request_duration = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template, method and status",
+    ("route", "method", "status"),
+)
+mongo_command_duration = Histogram(
+    "mongo_command_duration_seconds", "MongoDB command latency by collection and command",
+    ("collection", "command"),
+)
+mongo_command_failures = Counter(
+    "mongo_command_failures_total", "MongoDB commands that returned an error", ("collection", "command"),
+)
+bcrypt_duration = Histogram(
+    "bcrypt_duration_seconds", "Password hashing time on the bcrypt executor", ("operation",),
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+)
+llm_request_duration = Histogram(
+    "llm_request_duration_seconds", "LLM provider call time by provider, mode and outcome",
+    ("provider", "mode", "outcome"), buckets=SLOW_BUCKETS,
+)
+advice_cache_requests = Counter(
+    "advice_cache_requests_total", "Lookups of pre-generated advice", ("result",),
+)
+
+REGISTRY = [http_request_duration, mongo_command_duration, mongo_command_failures, bcrypt_duration,
+            llm_request_duration, advice_cache_requests]
+
+def register(metric):
+    REGISTRY.append(metric)
+    return metric
+
+def render() -> str:
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+class CommandMetrics(monitoring.CommandListener):
+    """Feed ``mongo_command_duration`` from pymongo command events.
+
+    pymongo reports the duration itself; the collection is taken from the
+    started event (the command's first value) and matched up by request id.
+    """
+
+    def __init__(self):
+        self._collections = {}
+
+    def started(self, event):
+        collection = event.command.get(event.command_name)
+        self._collections[event.request_id] = collection if isinstance(collection, str) else ""
+
+    def succeeded(self, event):
+        collection = self._collections.pop(event.request_id, "")
+        mongo_command_duration.observe(event.duration_micros / 1e6, collection, event.command_name)
+
+    def failed(self, event):
+        collection = self._collections.pop(event.request_id, "")
+        mongo_command_duration.observe(event.duration_micros / 1e6, collection, event.command_name)
+        mongo_command_failures.inc(collection, event.command_name)
+
+class MetricsMiddleware:
+    """Time every HTTP request into ``http_request_duration``.
+
+    The route label is the path template of the matched endpoint (e.g.
+    ``/api/goals/{goal_id}/contribute``), so ids do not explode the series
+    count; requests that match no route are labelled ``unmatched``.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._templates = None
+
+    def _template(self, scope) -> str:
+        if self._templates is None:
+            self._templates = {
+                route.endpoint: route.path for route in scope["app"].routes if hasattr(route, "endpoint")
+            }
+        return self._templates.get(scope.get("endpoint"), "unmatched")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            http_request_duration.observe(time.perf_counter() - started, self._template(scope), scope["method"], status)
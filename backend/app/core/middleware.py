@@ -0,0 +1,70 @@
+import asyncio
+from .deadline import route_budget_ms, start_deadline, reset_deadline
+
+# Safe methods only; cancelling a write half-way would leave partial updates
+CANCELLABLE_METHODS = ("GET", "HEAD")
+
+class RequestDeadlineMiddleware:
+    """Give each HTTP request a database time budget and cancel it on disconnect.
+
+    The budget is exposed through ``deadline.time_limit_ms`` and sent as
+    ``maxTimeMS`` on every query, so the server stops work the client can no
+    longer use. For GET and HEAD the middleware also listens for
+    ``http.disconnect`` for the whole request; if the client goes away the
+    handler task is cancelled, which abandons any awaited database call.
+    Writes always run to completion: a handler made of several steps (e.g.
+    create a transaction, then update the budget) must not stop half-way.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        if scope["method"] not in CANCELLABLE_METHODS:
+            token = start_deadline(route_budget_ms(scope["path"]))
+            try:
+                await self.app(scope, receive, send)
+            finally:
+                reset_deadline(token)
+            return
+
+        # Pump the receive channel ourselves so a disconnect is noticed even
+        # while the handler is awaiting something else (e.g. a query); the
+        # queue is bounded, so a body is pumped no faster than it is read
+        messages = asyncio.Queue(maxsize=16)
+        disconnect = None
+
+        async def wrapped_receive():
+            if disconnect is not None and messages.empty():
+                return disconnect
+            return await messages.get()
+
+        async def watch():
+            nonlocal disconnect
+            while True:
+                message = await receive()
+                if message["type"] == "http.disconnect":
+                    disconnect = message
+                    handler.cancel()
+                    return
+                await messages.put(message)
+
+        token = start_deadline(route_budget_ms(scope["path"]))
+        try:
+            handler = asyncio.create_task(self.app(scope, wrapped_receive, send))
+        finally:
+            reset_deadline(token)
+        watcher = asyncio.create_task(watch())
+        try:
+            await handler
+        except asyncio.CancelledError:
+            # Client went away: nothing left to send; re-raise only if we ourselves were cancelled
+            if disconnect is None:
+                raise
+        finally:
+            watcher.cancel()
+            if not handler.done():
+                handler.cancel()
@@ -0,0 +1,52 @@
+from decimal import Decimal, ROUND_HALF_EVEN
+from typing import Annotated
+from bson import Int64
+from pydantic import Field
+
+# Money is stored as an integer number of cents (int64) next to an ISO 4217
+# ``currency`` code, so sums and $inc are exact. Floats only exist at the API
+# edge: request models call ``to_minor`` and response models ``from_minor``.
+# Only currencies with two decimal places are supported, and requests only
+# accept DEFAULT_CURRENCY: budgets and stats do not separate currencies.
+#
+# Documents written before the switch still hold float amounts in euros; the
+# helpers below accept both until the 0003 migration has converted them.
+
+CENTS = 100
+# Largest amount a request may carry: floats hold exact cents well past it
+# (up to ~9e13) and int64 sums of cents have room for millions of them
+MAX_AMOUNT = 1_000_000_000_000
+
+# A positive request amount in major units; infinities, NaN and larger values are a 422
+Amount = Annotated[float, Field(gt=0, le=MAX_AMOUNT, allow_inf_nan=False)]
+
+def to_minor(amount) -> Int64:
+    """Major units (e.g. 12.34 EUR as float or Decimal) to int64 cents, half-even."""
+    cents = (Decimal(str(amount)) * CENTS).quantize(Decimal(1), rounding=ROUND_HALF_EVEN)
+    return Int64(cents)
+
+def minor(value) -> int:
+    """A stored amount in cents, whether already migrated (int) or legacy (float)."""
+    if isinstance(value, float):
+        return int(to_minor(value))
+    return int(value or 0)
+
+def from_minor(value) -> float:
+    return minor(value) / CENTS
+
+def minor_expr(field: str) -> dict:
+    """Aggregation expression for ``field`` in cents, converting legacy doubles."""
+    return {"$cond": [
+        {"$eq": [{"$type": f"${field}"}, "double"]},
+        {"$toLong": {"$round": [{"$multiply": [f"${field}", CENTS]}, 0]}},
+        {"$ifNull": [f"${field}", 0]},
+    ]}
+
+def api_fields(doc: dict, money_fields: tuple) -> dict:
+    """Fields of a stored document for its response model, amounts in major units."""
+    fields = {k: v for k, v in doc.items() if k != "_id"}
+    fields["id"] = str(doc["_id"])
+    for field in money_fields:
+        if field in fields:
+            fields[field] = from_minor(fields[field])
+    return fields
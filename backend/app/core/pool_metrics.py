@@ -0,0 +1,89 @@
+import bisect
+import threading
+import time
+from collections import defaultdict
+from pymongo import monitoring
+
+# Upper bounds (ms) of the checkout-wait histogram buckets
+WAIT_BUCKETS_MS = (0.1, 0.5, 1, 5, 10, 50, 100, 500, 1000, 5000, float("inf"))
+
+class PoolMetrics(monitoring.ConnectionPoolListener):
+    """Connection pool statistics collected from pymongo pool events.
+
+    Pymongo emits these events from whichever thread does the checkout
+    (Motor runs them on its executor), so the start time of a pending checkout
+    is kept per thread and the counters are guarded by a lock.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.in_use = defaultdict(int)
+        self.open = defaultdict(int)
+        self.checkouts = 0
+        self.checkout_failures = defaultdict(int)
+        self.wait_buckets = [0] * len(WAIT_BUCKETS_MS)
+        self.wait_sum_ms = 0.0
+        self.pool_clears = 0
+
+    def _address(self, event) -> str:
+        host, port = event.address
+        return f"{host}:{port}"
+
+    def connection_check_out_started(self, event):
+        self._local.started = time.perf_counter()
+
+    def connection_checked_out(self, event):
+        started = getattr(self._local, "started", None)
+        wait_ms = (time.perf_counter() - started) * 1000 if started is not None else 0.0
+        self._local.started = None
+        with self._lock:
+            self.checkouts += 1
+            self.in_use[self._address(event)] += 1
+            self.wait_sum_ms += wait_ms
+            self.wait_buckets[bisect.bisect_left(WAIT_BUCKETS_MS, wait_ms)] += 1
+
+    def connection_check_out_failed(self, event):
+        self._local.started = None
+        with self._lock:
+            self.checkout_failures[event.reason] += 1
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            self.in_use[self._address(event)] -= 1
+
+    def connection_created(self, event):
+        with self._lock:
+            self.open[self._address(event)] += 1
+
+    def connection_closed(self, event):
+        with self._lock:
+            self.open[self._address(event)] -= 1
+
+    def connection_ready(self, event):
+        pass
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        with self._lock:
+            self.pool_clears += 1
+
+    def pool_closed(self, event):
+        pass
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "in_use": dict(self.in_use),
+                "open": dict(self.open),
+                "checkouts": self.checkouts,
+                "checkout_failures": dict(self.checkout_failures),
+                "wait_ms_buckets": dict(zip(WAIT_BUCKETS_MS, self.wait_buckets)),
+                "wait_ms_sum": self.wait_sum_ms,
+                "pool_clears": self.pool_clears,
+            }
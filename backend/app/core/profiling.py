@@ -0,0 +1,177 @@
+import asyncio
+import logging
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from .config import settings
+from .database import db
+from .security import is_admin_token
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = b"x-profile"
+_EVENTS_FILE = asyncio.events.__file__
+
+def _label(frame) -> str:
+    code = frame.f_code
+    path = "/".join(code.co_filename.split(os.sep)[-2:])
+    return f"{code.co_name} ({path}:{code.co_firstlineno})"
+
+def _labels(frames: list) -> list:
+    return [_label(frame) for frame in frames]
+
+def _running_frames(frame) -> list:
+    """Frames of the running task, outermost first, without the event loop's own frames."""
+    frames = []
+    while frame is not None:
+        frames.append(frame)
+        frame = frame.f_back
+    frames.reverse()
+    # Everything up to the loop's callback dispatch (Handle._run) is the loop itself
+    for index in range(len(frames) - 1, -1, -1):
+        code = frames[index].f_code
+        if code.co_name == "_run" and code.co_filename == _EVENTS_FILE:
+            return frames[index + 1:]
+    return frames
+
+def _coroutine_frames(coro) -> list:
+    """Frames of a suspended coroutine chain, outermost first."""
+    frames = []
+    while coro is not None:
+        frame = getattr(coro, "cr_frame", None) or getattr(coro, "gi_frame", None)
+        if frame is not None:
+            frames.append(frame)
+        coro = getattr(coro, "cr_await", None) or getattr(coro, "gi_yieldfrom", None)
+    return frames
+
+class RequestProfiler:
+    """Sampling profiler for one request's task.
+
+    A background thread samples every PROFILE_SAMPLE_INTERVAL_MS, walking
+    down from the request's task through whatever each task awaits (child
+    tasks, ``asyncio.gather``). If the task the event loop is running is on
+    that path, the sample is its live Python stack (handler code, Pydantic
+    validation, serialization); otherwise the sample is where the request is
+    suspended (e.g. a Mongo call), ending in an ``[await]`` frame. Branches of
+    a gather are each counted in full. Time spent on other requests is never
+    attributed to this one. The result is in folded-stack format: one
+    ``frame;frame;frame count`` line per distinct stack.
+    """
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.loop = task.get_loop()
+        self.thread_id = threading.get_ident()
+        self.samples = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        interval = settings.PROFILE_SAMPLE_INTERVAL_MS / 1000
+        while not self._stop.wait(interval):
+            try:
+                self._sample()
+            except Exception:
+                # Frames can finish under us; drop the sample
+                pass
+
+    def _sample(self):
+        if not self.task.done():
+            self._walk(self.task, [], asyncio.tasks._current_tasks.get(self.loop))
+
+    def _walk(self, task: asyncio.Task, prefix: list, running: asyncio.Task):
+        # Stacks are folded root first, as flamegraph.pl and speedscope expect
+        if task is running:
+            frames = _running_frames(sys._current_frames().get(self.thread_id))
+            self.samples[";".join(prefix + _labels(frames))] += 1
+            return
+        stack = prefix + _labels(_coroutine_frames(task.get_coro()))
+        waiter = task._fut_waiter
+        if isinstance(waiter, asyncio.Task):
+            self._walk(waiter, stack, running)
+        elif hasattr(waiter, "_children"):  # asyncio.gather
+            for child in waiter._children:
+                if isinstance(child, asyncio.Task) and not child.done():
+                    self._walk(child, stack, running)
+        else:
+            self.samples[";".join(stack + ["[await]"])] += 1
+
+    def folded(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.samples.most_common())
+
+class ProfilingMiddleware:
+    """Profile selected requests end to end and store the result.
+
+    A request is profiled when it carries ``X-Profile: <ADMIN_TOKEN>`` or,
+    with probability PROFILE_SAMPLE_RATE, at random; at most one request is
+    profiled at a time. Profiles go to ``request_profiles`` (kept for
+    PROFILE_RETENTION_HOURS) and are served by ``/api/admin/profiles``.
+    Only installed when PROFILING_ENABLED is set.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._busy = False
+
+    def _triggered(self, scope) -> str:
+        for name, value in scope["headers"]:
+            if name == PROFILE_HEADER:
+                return "header" if is_admin_token(value.decode("latin-1")) else ""
+        if settings.PROFILE_SAMPLE_RATE > 0 and random.random() < settings.PROFILE_SAMPLE_RATE:
+            return "sampled"
+        return ""
+
+    async def __call__(self, scope, receive, send):
+        trigger = self._triggered(scope) if scope["type"] == "http" and not self._busy else ""
+        if not trigger:
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        self._busy = True
+        started_at = datetime.now(timezone.utc)
+        started = time.perf_counter()
+        task = asyncio.create_task(self.app(scope, receive, send_with_status))
+        profiler = RequestProfiler(task)
+        profiler.start()
+        try:
+            await task
+        finally:
+            duration_ms = (time.perf_counter() - started) * 1000
+            profiler.stop()
+            self._busy = False
+            await self._store(scope, status, trigger, started_at, duration_ms, profiler)
+
+    async def _store(self, scope, status, trigger, started_at, duration_ms, profiler):
+        try:
+            await db.db.request_profiles.insert_one({
+                "method": scope["method"],
+                "path": scope["path"],
+                "status": status,
+                "trigger": trigger,
+                "started_at": started_at,
+                "duration_ms": round(duration_ms, 2),
+                "samples": sum(profiler.samples.values()),
+                "sample_interval_ms": settings.PROFILE_SAMPLE_INTERVAL_MS,
+                "folded": profiler.folded(),
+                "expires_at": started_at + timedelta(hours=settings.PROFILE_RETENTION_HOURS),
+            })
+        except Exception as e:
+            logger.error(f"Error storing request profile: {str(e)}")
@@ -0,0 +1,22 @@
+from functools import lru_cache
+from typing import List, Type
+from fastapi.responses import Response
+from pydantic import BaseModel, TypeAdapter
+
+@lru_cache(maxsize=None)
+def list_adapter(model: Type[BaseModel]) -> TypeAdapter:
+    """Cached ``TypeAdapter(List[model])``; building one compiles a schema."""
+    return TypeAdapter(List[model])
+
+class ModelListResponse(Response):
+    """A list of already validated ``model`` instances, serialized as JSON.
+
+    Returning a Response skips FastAPI's response_model pass, which would
+    validate the list again and then encode it a second time; the route's
+    ``response_model`` still documents the schema. pydantic-core writes the
+    bytes directly, with the same output as the response_model path.
+    """
+    media_type = "application/json"
+
+    def __init__(self, model: Type[BaseModel], items: list, **kwargs):
+        super().__init__(list_adapter(model).dump_json(items), **kwargs)
@@ -0,0 +1,94 @@
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from .config import settings
+from .database import db
+from .indexes import query_pattern
+
+logger = logging.getLogger(__name__)
+
+class RevocationSet:
+    """In-memory view of the ``revoked_tokens`` collection.
+
+    Lookups never touch the database: a ``jti -> exp`` dict answers them in
+    O(1). Access tokens are short-lived, so the map only holds revocations
+    from the last ACCESS_TOKEN_EXPIRATION_MINUTES. A background task pulls new
+    revocations every REVOCATION_SYNC_SECONDS and rebuilds from scratch every
+    REVOCATION_FULL_SYNC_SECONDS to drop entries whose tokens have expired.
+    """
+
+    def __init__(self):
+        self._revoked = {}
+        self._last_sync: Optional[datetime] = None
+        self._last_full_sync: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def is_revoked(self, jti: str) -> bool:
+        expires_at = self._revoked.get(jti)
+        return expires_at is not None and expires_at > time.time()
+
+    def add(self, jti: str, expires_at: float):
+        self._revoked[jti] = expires_at
+
+    def __len__(self):
+        return len(self._revoked)
+
+    @query_pattern("revoked_tokens", equality=["jti"])
+    async def revoke(self, jti: str, expires_at: datetime):
+        """Record a revocation in Mongo and apply it locally straight away."""
+        now = datetime.now(timezone.utc)
+        await db.db.revoked_tokens.update_one(
+            {"jti": jti},
+            {"$set": {"jti": jti, "expires_at": expires_at, "revoked_at": now}},
+            upsert=True
+        )
+        self.add(jti, expires_at.timestamp())
+
+    @query_pattern("revoked_tokens", sort=["revoked_at"])
+    @query_pattern("revoked_tokens", sort=["expires_at"])
+    async def sync(self, full: bool = False):
+        now = datetime.now(timezone.utc)
+        query = {"expires_at": {"$gt": now}}
+        if not full and self._last_sync is not None:
+            # Small overlap so revocations written by other nodes around the
+            # previous sync are not missed
+            query["revoked_at"] = {"$gte": self._last_sync - timedelta(seconds=5)}
+        entries = {}
+        async for doc in db.db.revoked_tokens.find(query, {"jti": 1, "expires_at": 1}):
+            expires_at = doc["expires_at"]
+            if expires_at.tzinfo is None:
+                expires_at = expires_at.replace(tzinfo=timezone.utc)
+            entries[doc["jti"]] = expires_at.timestamp()
+
+        if full:
+            self._revoked = entries
+            self._last_full_sync = time.monotonic()
+        else:
+            for jti, expires_at in entries.items():
+                self.add(jti, expires_at)
+        self._last_sync = now
+
+    async def _run(self):
+        while True:
+            try:
+                full = (self._last_full_sync is None
+                        or time.monotonic() - self._last_full_sync >= settings.REVOCATION_FULL_SYNC_SECONDS)
+                await self.sync(full=full)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Revocation sync failed: {str(e)}")
+            await asyncio.sleep(settings.REVOCATION_SYNC_SECONDS)
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+revocation_set = RevocationSet()
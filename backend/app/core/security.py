@@ -1,34 +1,200 @@
+import asyncio
 import bcrypt
+import hashlib
 import jwt
+import secrets
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-from fastapi import HTTPException, Security
+from typing import Optional, Tuple
+from fastapi import Depends, Header, HTTPException, Request, Security
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from ..core.config import settings
+from ..core.database import db
+from .deadline import time_limit_ms
+from .indexes import query_pattern
+from .keys import key_set
+from .metrics import bcrypt_duration
+from .revocation import revocation_set
+from .token_cache import VerifiedTokenCache
 
 security = HTTPBearer()
 
-def hash_password(password: str) -> str:
-    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+# bcrypt releases the GIL, so a small dedicated pool keeps hashing off the event
+# loop without letting a login burst take over every thread in the process
+_hash_executor = ThreadPoolExecutor(max_workers=settings.BCRYPT_MAX_WORKERS, thread_name_prefix="bcrypt")
 
-def verify_password(password: str, hashed: str) -> bool:
-    return bcrypt.checkpw(password.encode('utf-8'), hashed.encode('utf-8'))
+def _hash_password_sync(password: str) -> str:
+    started = time.perf_counter()
+    hashed = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds=settings.BCRYPT_ROUNDS)).decode('utf-8')
+    bcrypt_duration.observe(time.perf_counter() - started, "hash")
+    return hashed
+
+def _verify_password_sync(password: str, hashed: str) -> bool:
+    started = time.perf_counter()
+    valid = bcrypt.checkpw(password.encode('utf-8'), hashed.encode('utf-8'))
+    bcrypt_duration.observe(time.perf_counter() - started, "verify")
+    return valid
+
+async def hash_password(password: str) -> str:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_hash_executor, _hash_password_sync, password)
+
+async def verify_password(password: str, hashed: str) -> bool:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_hash_executor, _verify_password_sync, password, hashed)
+
+def needs_rehash(hashed: str) -> bool:
+    # Modular crypt format: $2b$<cost>$<salt+hash>
+    try:
+        return int(hashed.split('$')[2]) != settings.BCRYPT_ROUNDS
+    except (IndexError, ValueError):
+        return True
+
+def shutdown_hash_executor():
+    _hash_executor.shutdown(wait=False, cancel_futures=True)
 
 def create_token(user_id: str) -> str:
     payload = {
         'user_id': user_id,
-        'exp': datetime.now(timezone.utc) + timedelta(hours=settings.JWT_EXPIRATION_HOURS)
+        'jti': uuid.uuid4().hex,
+        'exp': datetime.now(timezone.utc) + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRATION_MINUTES)
     }
-    return jwt.encode(payload, settings.JWT_SECRET, algorithm=settings.JWT_ALGORITHM)
+    if not key_set.enabled:
+        return jwt.encode(payload, settings.JWT_SECRET, algorithm=settings.JWT_ALGORITHM)
+    if key_set.signing_key is None:
+        raise RuntimeError("This node has no JWT signing key (JWT_PRIVATE_KEYS_DIR)")
+    return jwt.encode(
+        payload, key_set.signing_key, algorithm=settings.JWT_ALGORITHM, headers={'kid': key_set.signing_kid}
+    )
+
+def _hash_refresh_token(token: str) -> str:
+    return hashlib.sha256(token.encode('utf-8')).hexdigest()
+
+async def create_refresh_token(user_id: str, family_id: Optional[str] = None) -> str:
+    """Issue an opaque refresh token; only its SHA-256 is stored."""
+    token = secrets.token_urlsafe(32)
+    now = datetime.now(timezone.utc)
+    await db.db.refresh_tokens.insert_one({
+        "token_hash": _hash_refresh_token(token),
+        "user_id": user_id,
+        "family_id": family_id or uuid.uuid4().hex,
+        "revoked": False,
+        "expires_at": now + timedelta(days=settings.REFRESH_TOKEN_EXPIRATION_DAYS),
+        "created_at": now,
+    })
+    return token
+
+@query_pattern("refresh_tokens", equality=["token_hash", "revoked"])
+async def rotate_refresh_token(token: str) -> Tuple[str, str]:
+    """Consume ``token`` and return ``(user_id, new_refresh_token)``.
+
+    Each refresh token is single use. Presenting one that was already rotated
+    means it leaked, so the whole family is revoked and the caller must log in
+    again.
+    """
+    now = datetime.now(timezone.utc)
+    token_hash = _hash_refresh_token(token)
+    stored = await db.db.refresh_tokens.find_one_and_update(
+        {"token_hash": token_hash, "revoked": False, "expires_at": {"$gt": now}},
+        {"$set": {"revoked": True, "rotated_at": now}},
+        maxTimeMS=time_limit_ms()
+    )
+    if stored is None:
+        reused = await db.db.refresh_tokens.find_one(
+            {"token_hash": token_hash, "revoked": True}, max_time_ms=time_limit_ms()
+        )
+        if reused:
+            await revoke_refresh_family(reused["family_id"])
+        raise HTTPException(status_code=401, detail="Invalid refresh token")
+    new_token = await create_refresh_token(stored["user_id"], stored["family_id"])
+    return stored["user_id"], new_token
+
+@query_pattern("refresh_tokens", equality=["token_hash"])
+async def revoke_refresh_token(token: str):
+    stored = await db.db.refresh_tokens.find_one(
+        {"token_hash": _hash_refresh_token(token)}, max_time_ms=time_limit_ms()
+    )
+    if stored:
+        await revoke_refresh_family(stored["family_id"])
 
-async def get_current_user(credentials: HTTPAuthorizationCredentials = Security(security)) -> str:
+@query_pattern("refresh_tokens", equality=["family_id"])
+async def revoke_refresh_family(family_id: str):
+    await db.db.refresh_tokens.update_many({"family_id": family_id}, {"$set": {"revoked": True}})
+
+# Tokens without a jti were issued before short-lived access tokens (30-day
+# expiry). They stay valid until they expire so a deploy logs nobody out,
+# but they cannot be revoked.
+def _is_revoked(claims: dict) -> bool:
+    jti = claims.get('jti')
+    return jti is not None and revocation_set.is_revoked(jti)
+
+async def revoke_access_token(claims: dict):
+    if claims.get('jti'):
+        await revocation_set.revoke(claims['jti'], datetime.fromtimestamp(claims['exp'], timezone.utc))
+
+token_cache = VerifiedTokenCache(settings.TOKEN_CACHE_SIZE)
+
+class UnknownKeyId(jwt.InvalidTokenError):
+    pass
+
+def _verification_key(token: str):
+    if not key_set.enabled:
+        return settings.JWT_SECRET
+    kid = jwt.get_unverified_header(token).get('kid')
+    key = key_set.get_public_key(kid)
+    if key is None:
+        raise UnknownKeyId(kid)
+    return key
+
+def decode_token(token: str) -> dict:
+    """Verify ``token`` and return its claims, skipping the signature check for cached tokens."""
+    claims = token_cache.get(token)
+    if claims is None:
+        claims = jwt.decode(token, _verification_key(token), algorithms=[settings.JWT_ALGORITHM])
+        token_cache.put(token, claims)
+    return claims
+
+async def get_current_claims(request: Request, credentials: HTTPAuthorizationCredentials = Security(security)) -> dict:
+    # Sub-request of POST /batch: the batch request was already authenticated.
+    # Only server code can put keys in the ASGI scope, clients cannot. The
+    # token may have been revoked since, so that in-memory check runs again.
+    claims = request.scope.get("batch_claims")
+    if claims is not None:
+        if _is_revoked(claims):
+            raise HTTPException(status_code=401, detail="Token revoked")
+        return claims
     try:
         token = credentials.credentials
-        payload = jwt.decode(token, settings.JWT_SECRET, algorithms=[settings.JWT_ALGORITHM])
-        user_id = payload.get('user_id')
-        if not user_id:
+        try:
+            payload = decode_token(token)
+        except UnknownKeyId:
+            # Possibly signed with a key rotated in on another node since our last refresh
+            if not key_set.should_reload_for_unknown_kid():
+                raise
+            await key_set.reload()
+            payload = decode_token(token)
+        if not payload.get('user_id'):
             raise HTTPException(status_code=401, detail="Invalid token")
-        return user_id
+        # In-memory check, never served from the verified-token cache
+        if _is_revoked(payload):
+            raise HTTPException(status_code=401, detail="Token revoked")
+        return payload
     except jwt.ExpiredSignatureError:
         raise HTTPException(status_code=401, detail="Token expired")
     except jwt.InvalidTokenError:
         raise HTTPException(status_code=401, detail="Invalid token")
+
+async def get_current_user(claims: dict = Depends(get_current_claims)) -> str:
+    return claims['user_id']
+
+def is_admin_token(value: Optional[str]) -> bool:
+    return bool(settings.ADMIN_TOKEN) and value is not None and secrets.compare_digest(value, settings.ADMIN_TOKEN)
+
+async def require_admin(x_admin_token: Optional[str] = Header(None)):
+    """Guard for operational endpoints; they do not exist unless ADMIN_TOKEN is set."""
+    if not settings.ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not is_admin_token(x_admin_token):
+        raise HTTPException(status_code=403, detail="Forbidden")
@@ -0,0 +1,202 @@
+import asyncio
+import hashlib
+import json
+import logging
+import random
+import threading
+from datetime import datetime, timezone
+from typing import Optional
+from pymongo import monitoring
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+COLLECTION = "slow_queries"
+
+# Commands worth recording, and where each keeps its query
+_QUERY_FIELDS = {
+    "find": ("filter", "sort", "projection"),
+    "aggregate": ("pipeline",),
+    "count": ("query",),
+    "distinct": ("key", "query"),
+    "findAndModify": ("query", "sort", "update"),
+    "update": ("updates",),
+    "delete": ("deletes",),
+}
+# Commands that can be re-run under explain to see docs examined
+_EXPLAINABLE = {"find", "aggregate", "count", "distinct", "findAndModify"}
+# Started commands awaiting their succeeded/failed event; one that never gets
+# it (e.g. its connection died mid-command) must not stay forever
+MAX_PENDING_COMMANDS = 10000
+# Plan fields kept: the stage tree without parsedQuery, indexBounds or
+# filters, which carry the literal values normalize() strips
+_PLAN_KEYS = ("stage", "indexName", "keyPattern", "direction")
+_EXPLAIN_KEYS = {"filter", "sort", "projection", "limit", "skip", "hint", "pipeline", "query", "key", "update", "collation"}
+
+def normalize(value):
+    """Query shape: keys and operators kept, values replaced by ``?``.
+
+    Arrays of values collapse to ``["?"]`` so ``$in`` lists of any length
+    share one shape; arrays of documents (pipelines, $or) keep their shape
+    element by element. Field paths (``"$amount"``) are structure, not
+    values, and are kept.
+    """
+    if isinstance(value, dict):
+        return {k: normalize(v) for k, v in value.items()}
+    if isinstance(value, list):
+        if value and all(isinstance(v, dict) for v in value):
+            return [normalize(v) for v in value]
+        return ["?"]
+    if isinstance(value, str) and value.startswith("$"):
+        return value
+    return "?"
+
+def query_shape(command_name: str, command: dict) -> dict:
+    shape = {}
+    for field in _QUERY_FIELDS[command_name]:
+        if field not in command:
+            continue
+        value = command[field]
+        if field in ("updates", "deletes"):
+            # Bulk write: the shape of the statements' filters
+            value = [{"q": statement.get("q", {})} for statement in value]
+        if field == "key":
+            shape[field] = value  # distinct's field name is part of the shape
+        elif field in ("sort", "projection"):
+            shape[field] = {k: v for k, v in value.items()}
+        else:
+            shape[field] = normalize(value)
+    return shape
+
+def plan_tree(plan: dict) -> dict:
+    """The stages and indexes of a winning plan, without any query values."""
+    if "queryPlan" in plan:
+        plan = plan["queryPlan"]  # slot-based engine
+    tree = {k: plan[k] for k in _PLAN_KEYS if k in plan}
+    if "inputStage" in plan:
+        tree["inputStage"] = plan_tree(plan["inputStage"])
+    if "inputStages" in plan:
+        tree["inputStages"] = [plan_tree(stage) for stage in plan["inputStages"]]
+    return tree
+
+def docs_returned(command_name: str, reply: dict) -> Optional[int]:
+    if "cursor" in reply:
+        return len(reply["cursor"].get("firstBatch", []))  # first batch only
+    if command_name == "findAndModify":
+        return int(reply.get("value") is not None)
+    if command_name == "distinct":
+        return len(reply.get("values", []))
+    return reply.get("n")
+
+def _execution_stats(explain: dict) -> dict:
+    stats = explain.get("executionStats")
+    if stats is None:
+        # aggregate: the $cursor stage carries the query's stats
+        for stage in explain.get("stages", []):
+            if "$cursor" in stage:
+                stats = stage["$cursor"].get("executionStats")
+                break
+    stats = stats or {}
+    return {
+        "docs_examined": stats.get("totalDocsExamined"),
+        "keys_examined": stats.get("totalKeysExamined"),
+        "execution_ms": stats.get("executionTimeMillis"),
+    }
+
+class SlowQueryLog(monitoring.CommandListener):
+    """Record MongoDB commands slower than SLOW_QUERY_THRESHOLD_MS.
+
+    The listener only decides and enqueues: pymongo calls it on whichever
+    thread ran the command, so records are handed to the event loop and
+    written by ``writer`` into the capped ``slow_queries`` collection. When
+    the queue is full records are dropped rather than slowing queries down.
+    A share of slow commands (SLOW_QUERY_EXPLAIN_SAMPLE_RATE) is re-run
+    under ``explain`` to capture documents and keys examined and the plan.
+    """
+
+    def __init__(self):
+        self._commands = {}
+        self._lock = threading.Lock()
+        self._queue: Optional[asyncio.Queue] = None
+        self._loop = None
+        self._task = None
+        self.dropped = 0
+
+    # -- listener (any thread) -------------------------------------------
+
+    def started(self, event):
+        if event.command_name in _QUERY_FIELDS and event.database_name == settings.DB_NAME:
+            with self._lock:
+                if len(self._commands) >= MAX_PENDING_COMMANDS:
+                    # Oldest first: a command this old is not coming back
+                    del self._commands[next(iter(self._commands))]
+                self._commands[event.request_id] = event.command
+
+    def succeeded(self, event):
+        with self._lock:
+            command = self._commands.pop(event.request_id, None)
+        if command is None or event.duration_micros < settings.SLOW_QUERY_THRESHOLD_MS * 1000:
+            return
+        collection = command.get(event.command_name)
+        if collection == COLLECTION or self._loop is None:
+            return
+        record = {
+            "collection": collection,
+            "command": event.command_name,
+            "duration_ms": event.duration_micros / 1000,
+            "docs_returned": docs_returned(event.command_name, event.reply),
+            "at": datetime.now(timezone.utc),
+        }
+        self._loop.call_soon_threadsafe(self._enqueue, record, command)
+
+    def failed(self, event):
+        with self._lock:
+            self._commands.pop(event.request_id, None)
+
+    # -- writer (event loop) ----------------------------------------------
+
+    def _enqueue(self, record: dict, command: dict):
+        try:
+            self._queue.put_nowait((record, command))
+        except asyncio.QueueFull:
+            self.dropped += 1
+
+    async def start(self):
+        from .database import db
+        if COLLECTION not in await db.db.list_collection_names():
+            await db.db.create_collection(COLLECTION, capped=True, size=settings.SLOW_QUERY_LOG_BYTES)
+        self._queue = asyncio.Queue(maxsize=1000)
+        self._loop = asyncio.get_running_loop()
+        self._task = asyncio.create_task(self.writer())
+
+    async def stop(self):
+        self._loop = None
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def writer(self):
+        from .database import db
+        while True:
+            record, command = await self._queue.get()
+            try:
+                shape = query_shape(record["command"], command)
+                record["shape"] = json.dumps(shape, sort_keys=True, default=str)
+                record["shape_id"] = hashlib.sha1(f"{record['collection']}:{record['command']}:{record['shape']}".encode()).hexdigest()[:16]
+                if record["command"] in _EXPLAINABLE and random.random() < settings.SLOW_QUERY_EXPLAIN_SAMPLE_RATE:
+                    record.update(await self.explain(db, record["command"], command))
+                await db.db[COLLECTION].insert_one(record)
+            except Exception as e:
+                logger.error(f"Error writing slow query record: {str(e)}")
+
+    async def explain(self, db, command_name: str, command: dict) -> dict:
+        query = {command_name: command[command_name]}
+        query.update({k: v for k, v in command.items() if k in _EXPLAIN_KEYS})
+        if command_name == "aggregate":
+            query["cursor"] = {}
+        explain = await db.db.command({"explain": query, "verbosity": "executionStats"})
+        plan = explain.get("queryPlanner", {}).get("winningPlan", {})
+        return {**_execution_stats(explain), "plan": json.dumps(plan_tree(plan), default=str)[:4000]}
+
+slow_query_log = SlowQueryLog()
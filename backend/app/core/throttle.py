@@ -0,0 +1,199 @@
+import ipaddress
+import math
+import time
+from datetime import datetime, timedelta, timezone
+from fastapi import HTTPException, Request
+from pymongo.errors import DuplicateKeyError
+from .config import settings
+from .database import db
+from .deadline import time_limit_ms
+from .indexes import query_pattern
+
+class SlidingWindowCounter:
+    """Approximate sliding-window counter kept in process memory.
+
+    Each key holds the counts of the current and previous fixed windows; the
+    previous one is weighted by how much of it still overlaps the sliding
+    window. Memory is O(1) per key; keys are only created by ``add``, dropped
+    again when refunded to zero, and capped at ``max_keys``.
+    """
+
+    def __init__(self, window: float, max_keys: int = 100000):
+        self.window = window
+        self.max_keys = max_keys
+        self._counts = {}  # key -> [window_index, current, previous]
+
+    def _roll(self, slot: list, index: int):
+        if slot[0] != index:
+            # Roll forward: the old current becomes previous only if adjacent
+            slot[2] = slot[1] if slot[0] == index - 1 else 0
+            slot[1] = 0
+            slot[0] = index
+
+    def _prune(self, index: int):
+        self._counts = {k: v for k, v in self._counts.items() if v[0] >= index - 1}
+        if len(self._counts) >= self.max_keys:
+            # Still full of live keys (e.g. email spraying): forget the oldest
+            # tenth; the per-IP key keeps limiting the sprayer itself
+            keep = list(self._counts.items())[self.max_keys // 10:]
+            self._counts = dict(keep)
+
+    def count(self, key: str, now: float = None) -> float:
+        now = time.time() if now is None else now
+        slot = self._counts.get(key)
+        if slot is None:
+            return 0
+        self._roll(slot, int(now // self.window))
+        elapsed = (now % self.window) / self.window
+        return slot[1] + slot[2] * (1 - elapsed)
+
+    def add(self, key: str, now: float = None):
+        now = time.time() if now is None else now
+        index = int(now // self.window)
+        slot = self._counts.get(key)
+        if slot is None:
+            if len(self._counts) >= self.max_keys:
+                self._prune(index)
+            slot = self._counts[key] = [index, 0, 0]
+        self._roll(slot, index)
+        slot[1] += 1
+
+    def remove(self, key: str, now: float = None):
+        """Take back one ``add``; the key disappears once nothing is left."""
+        now = time.time() if now is None else now
+        slot = self._counts.get(key)
+        if slot is None:
+            return
+        self._roll(slot, int(now // self.window))
+        if slot[1] > 0:
+            slot[1] -= 1
+        elif slot[2] > 0:
+            slot[2] -= 1
+        if slot[1] == 0 and slot[2] == 0:
+            del self._counts[key]
+
+class MongoWindowCounter:
+    """The same approximation backed by ``login_attempts``, shared by all nodes."""
+
+    def __init__(self, window: float):
+        self.window = window
+
+    @query_pattern("login_attempts", equality=["key", "window"])
+    async def try_add(self, key: str, limit: int) -> bool:
+        """Count one attempt unless that would reach ``limit``, in one atomic write.
+
+        The closed previous window no longer changes, so it is read first and
+        turned into a condition on the current window's count. When the
+        condition fails the upsert collides with the existing window document
+        on key_window_unique and nothing is counted.
+        """
+        now = time.time()
+        index = int(now // self.window)
+        previous = await db.db.login_attempts.find_one(
+            {"key": key, "window": index - 1}, max_time_ms=time_limit_ms()
+        )
+        elapsed = (now % self.window) / self.window
+        room = limit - (previous["count"] if previous else 0) * (1 - elapsed)
+        if room <= 0:
+            return False
+        try:
+            await db.db.login_attempts.update_one(
+                {"key": key, "window": index, "count": {"$lt": room}},
+                {
+                    "$inc": {"count": 1},
+                    # TTL index on expires_at removes windows once they can no longer count
+                    "$setOnInsert": {"expires_at": datetime.now(timezone.utc) + timedelta(seconds=2 * self.window)},
+                },
+                upsert=True
+            )
+        except DuplicateKeyError:
+            return False
+        return True
+
+    @query_pattern("login_attempts", equality=["key", "window"])
+    async def remove(self, key: str):
+        index = int(time.time() // self.window)
+        await db.db.login_attempts.update_one({"key": key, "window": index, "count": {"$gt": 0}}, {"$inc": {"count": -1}})
+
+def _trusted(address: str, networks: list) -> bool:
+    try:
+        ip = ipaddress.ip_address(address.strip())
+    except ValueError:
+        return False
+    return any(ip in network for network in networks)
+
+def client_ip(request: Request) -> str:
+    """The address of the client, looking past any TRUSTED_PROXIES.
+
+    X-Forwarded-For is read from the right, one hop at a time, and only while
+    the hop that appended the entry is trusted; entries further left were
+    written by the client and could be anything.
+    """
+    peer = request.client.host if request.client else "unknown"
+    networks = [ipaddress.ip_network(proxy, strict=False) for proxy in settings.TRUSTED_PROXIES]
+    if not networks or not _trusted(peer, networks):
+        return peer
+    hops = [hop.strip() for hop in request.headers.get("x-forwarded-for", "").split(",") if hop.strip()]
+    address = peer
+    while hops and _trusted(address, networks):
+        address = hops.pop()
+    return address
+
+class LoginThrottle:
+    """Per-email and per-IP limits on login attempts.
+
+    ``acquire`` runs before the user lookup and password verification and
+    counts the attempt in the same step as the check, so attempts still
+    waiting for bcrypt count too and a burst of parallel requests cannot
+    get past the limit. A successful login gives its attempt back with
+    ``refund``, so only failures stay counted. The in-memory tier always
+    runs; with LOGIN_THROTTLE_BACKEND=mongo the shared tier is counted too.
+    """
+
+    def __init__(self):
+        self.window = settings.LOGIN_THROTTLE_WINDOW_SECONDS
+        self.memory = SlidingWindowCounter(self.window)
+        self.shared = MongoWindowCounter(self.window) if settings.LOGIN_THROTTLE_BACKEND == "mongo" else None
+
+    def _keys(self, email: str, ip: str):
+        return [
+            (f"email:{email.lower()}", settings.LOGIN_MAX_ATTEMPTS_PER_EMAIL),
+            (f"ip:{ip}", settings.LOGIN_MAX_ATTEMPTS_PER_IP),
+        ]
+
+    def _reject(self):
+        raise HTTPException(
+            status_code=429,
+            detail="Too many login attempts",
+            headers={"Retry-After": str(math.ceil(self.window))}
+        )
+
+    async def acquire(self, email: str, ip: str):
+        if not settings.LOGIN_THROTTLE_ENABLED:
+            return
+        keys = self._keys(email, ip)
+        # Local counters first, checked and added with no await in between
+        if any(self.memory.count(key) >= limit for key, limit in keys):
+            self._reject()
+        for key, _ in keys:
+            self.memory.add(key)
+        if self.shared is not None:
+            acquired = []
+            for key, limit in keys:
+                if not await self.shared.try_add(key, limit):
+                    for done in acquired:
+                        await self.shared.remove(done)
+                    for key, _ in keys:
+                        self.memory.remove(key)
+                    self._reject()
+                acquired.append(key)
+
+    async def refund(self, email: str, ip: str):
+        if not settings.LOGIN_THROTTLE_ENABLED:
+            return
+        for key, _ in self._keys(email, ip):
+            self.memory.remove(key)
+            if self.shared is not None:
+                await self.shared.remove(key)
+
+login_throttle = LoginThrottle()
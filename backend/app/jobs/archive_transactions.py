@@ -0,0 +1,68 @@
+"""Move old transactions to the archive.
+
+Meant to run periodically (cron, scheduled task), off-peak:
+
+    cd backend && python -m app.jobs.archive_transactions
+
+Transactions dated more than ARCHIVE_AFTER_DAYS ago are copied to
+``transactions_archive``, the monthly summaries of the affected users are
+rebuilt in ``transaction_summaries``, and only then are the originals
+deleted. Every step is idempotent, so an interrupted run is completed by the
+next one; in between, a batch may briefly be counted in both places.
+"""
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+from pymongo.write_concern import WriteConcern
+from ..core.config import settings
+from ..core.database import db
+from ..core.indexes import query_pattern
+from ..repositories.archive import month_bounds, transaction_archive_repo
+
+logger = logging.getLogger(__name__)
+
+# Stats read the last 30 days from the hot collection only
+MIN_ARCHIVE_AFTER_DAYS = 31
+
+@query_pattern("transactions", sort=["date"])
+async def archive_batch(cutoff: datetime) -> int:
+    transactions = db.db.transactions.with_options(write_concern=WriteConcern("majority"))
+    batch = await transactions.find({"date": {"$lt": cutoff}}).limit(settings.ARCHIVE_BATCH_SIZE).to_list(None)
+    if not batch:
+        return 0
+    await transaction_archive_repo.store(batch)
+    for user_id, month in {(t["user_id"], month_bounds(t["date"])[0]) for t in batch}:
+        await transaction_archive_repo.refresh_summary(user_id, month)
+    await transactions.delete_many({"_id": {"$in": [t["_id"] for t in batch]}})
+    return len(batch)
+
+async def run():
+    days = max(settings.ARCHIVE_AFTER_DAYS, MIN_ARCHIVE_AFTER_DAYS)
+    cutoff = datetime.now(timezone.utc) - timedelta(days=days)
+    start = time.perf_counter()
+    archived = 0
+    while True:
+        started = time.monotonic()
+        moved = await archive_batch(cutoff)
+        if not moved:
+            break
+        archived += moved
+        # Throttle: work at most ARCHIVE_DUTY_CYCLE of the time
+        elapsed = time.monotonic() - started
+        await asyncio.sleep(elapsed * (1 - settings.ARCHIVE_DUTY_CYCLE) / settings.ARCHIVE_DUTY_CYCLE)
+    logger.info(f"Archived {archived} transactions dated before {cutoff:%Y-%m-%d} in {time.perf_counter() - start:.1f}s")
+
+async def main():
+    db.connect()
+    try:
+        await run()
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    asyncio.run(main())
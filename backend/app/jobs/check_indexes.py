@@ -0,0 +1,64 @@
+"""Check the index registry.
+
+By default this is an offline check for CI: it imports every module of the
+app and fails when a query pattern declared with ``query_pattern`` has no
+supporting index in ``INDEXES``.
+
+    cd backend && python -m app.jobs.check_indexes
+
+``--live`` also compares the registry with the connected database and fails
+on missing indexes; ``--apply`` creates them first.
+"""
+import argparse
+import asyncio
+import importlib
+import pkgutil
+import sys
+import app
+from ..core.database import db
+from ..core.indexes import ensure_indexes, uncovered_query_patterns, verify_indexes
+
+def import_app_modules():
+    # Patterns are registered at import time, next to the code issuing them
+    for module in pkgutil.walk_packages(app.__path__, "app."):
+        importlib.import_module(module.name)
+
+async def check_live(apply: bool) -> bool:
+    db.connect()
+    try:
+        if apply:
+            await ensure_indexes()
+        report = await verify_indexes()
+    finally:
+        db.close()
+    ok = True
+    for collection, diff in report.items():
+        for name in diff["missing"]:
+            print(f"MISSING  {collection}.{name}")
+            ok = False
+        for name in diff["extra"]:
+            print(f"EXTRA    {collection}.{name}")
+    return ok
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--live", action="store_true", help="compare with the database in MONGO_URL")
+    parser.add_argument("--apply", action="store_true", help="create missing indexes before comparing")
+    args = parser.parse_args()
+
+    import_app_modules()
+    ok = True
+    for pattern in uncovered_query_patterns():
+        fields = pattern.get("equality", []) + pattern.get("sort", [])
+        print(f"UNINDEXED {pattern['collection']} {fields} ({pattern['source']})")
+        ok = False
+
+    if args.live or args.apply:
+        ok = asyncio.run(check_live(args.apply)) and ok
+
+    if ok:
+        print("Index registry OK")
+    sys.exit(0 if ok else 1)
+
+if __name__ == "__main__":
+    main()
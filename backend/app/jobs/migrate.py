@@ -0,0 +1,47 @@
+"""Apply pending schema migrations.
+
+    cd backend && python -m app.jobs.migrate            # run what is pending
+    cd backend && python -m app.jobs.migrate --status   # show progress only
+
+Migrations live in ``app/migrations`` and run in the order of
+``MIGRATIONS``. The API can stay online meanwhile: each migration works in
+batches of MIGRATION_BATCH_SIZE, throttled to MIGRATION_DUTY_CYCLE, and
+checkpoints in ``schema_migrations``; an interrupted run resumes from its
+last batch when started again.
+"""
+import argparse
+import asyncio
+import logging
+import sys
+from ..core.database import db
+from ..migrations import MIGRATIONS
+from ..migrations.runner import MigrationRunner, MigrationLocked
+
+async def main(args) -> bool:
+    runner = MigrationRunner(MIGRATIONS, batch_size=args.batch_size, duty_cycle=args.duty_cycle)
+    db.connect()
+    try:
+        if not args.status:
+            try:
+                await runner.run()
+            except MigrationLocked as e:
+                print(f"LOCKED   {e}")
+                return False
+        for migration, state in await runner.status():
+            status = state["status"] if state else "pending"
+            processed = state.get("processed", 0) if state else 0
+            print(f"{status.upper():8} {migration.id} ({processed} examined) - {migration.description}")
+    finally:
+        db.close()
+    return True
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--status", action="store_true", help="only report progress")
+    parser.add_argument("--batch-size", type=int, help="override MIGRATION_BATCH_SIZE")
+    parser.add_argument("--duty-cycle", type=float, help="override MIGRATION_DUTY_CYCLE (0-1]")
+    sys.exit(0 if asyncio.run(main(parser.parse_args())) else 1)
@@ -0,0 +1,125 @@
+"""Pre-generate advice for recently active users.
+
+Meant to run nightly (cron, scheduled task) before the morning read peak:
+
+    cd backend && python -m app.jobs.pregenerate_advice
+
+Results go to ``advice_cache``, which ``POST /api/advice`` serves while they
+are younger than ADVICE_PRECOMPUTED_MAX_AGE_HOURS. A summary of each run
+(users, throughput, token usage, estimated cost) is logged and stored in
+``advice_pregen_runs``.
+"""
+import asyncio
+import logging
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from ..core.config import settings
+from ..core.database import db
+from ..core.indexes import query_pattern
+from ..repositories.transactions import transaction_repo
+from ..services.advice import render_context, build_messages, count_tokens, load_encoding
+from ..services.llm import get_llm, close_llm
+
+logger = logging.getLogger(__name__)
+
+@query_pattern("transactions", sort=["created_at"])
+async def active_user_ids(since: datetime) -> list:
+    pipeline = [
+        {"$match": {"created_at": {"$gte": since}}},
+        {"$group": {"_id": "$user_id"}},
+    ]
+    return [doc["_id"] async for doc in db.reader("advice").transactions.aggregate(pipeline)]
+
+@query_pattern("budgets", equality=["user_id"])
+@query_pattern("goals", equality=["user_id"])
+async def load_batch(user_ids: list) -> dict:
+    """Fetch the advice inputs for many users.
+
+    Budgets and goals take one query per collection. Transactions take a
+    limited query per user on the (user_id, date) index: grouping every
+    user's full history and slicing it afterwards would read all of it and
+    can hit the 100MB $group limit ($topN would avoid that, but DocumentDB
+    lacks it).
+    """
+    reader = db.reader("advice")
+    budgets, goals, *transactions = await asyncio.gather(
+        reader.budgets.find({"user_id": {"$in": user_ids}}).to_list(None),
+        reader.goals.find({"user_id": {"$in": user_ids}}).to_list(None),
+        *(transaction_repo.list_for_user(user_id, limit=50, route="advice", projection={"_id": 0, "type": 1, "amount": 1})
+          for user_id in user_ids),
+    )
+    data = defaultdict(lambda: {"transactions": [], "budgets": [], "goals": []})
+    for user_id, docs in zip(user_ids, transactions):
+        data[user_id]["transactions"] = docs
+    for doc in budgets:
+        data[doc["user_id"]]["budgets"].append(doc)
+    for doc in goals:
+        data[doc["user_id"]]["goals"].append(doc)
+    return {user_id: data[user_id] for user_id in user_ids}
+
+async def run():
+    started_at = datetime.now(timezone.utc)
+    start = time.perf_counter()
+    llm = get_llm()
+    semaphore = asyncio.Semaphore(settings.ADVICE_PREGEN_CONCURRENCY)
+    stats = {"users": 0, "generated": 0, "failed": 0, "input_tokens": 0, "output_tokens": 0}
+
+    async def generate(user_id: str, inputs: dict):
+        context = render_context(inputs["transactions"], inputs["budgets"][:100], inputs["goals"][:100])
+        messages = build_messages(context)
+        async with semaphore:
+            try:
+                advice_text = await llm.complete(messages, max_tokens=500, temperature=0.7)
+            except Exception as e:
+                stats["failed"] += 1
+                logger.warning(f"Advice pre-generation failed for user {user_id}: {str(e)}")
+                return
+        stats["generated"] += 1
+        stats["input_tokens"] += sum(count_tokens(m["content"]) for m in messages)
+        stats["output_tokens"] += count_tokens(advice_text)
+        await db.db.advice_cache.update_one(
+            {"user_id": user_id},
+            {"$set": {"advice": advice_text, "generated_at": datetime.now(timezone.utc)}},
+            upsert=True
+        )
+
+    user_ids = await active_user_ids(started_at - timedelta(days=settings.ADVICE_PREGEN_ACTIVE_DAYS))
+    for i in range(0, len(user_ids), settings.ADVICE_PREGEN_BATCH_SIZE):
+        batch = await load_batch(user_ids[i:i + settings.ADVICE_PREGEN_BATCH_SIZE])
+        stats["users"] += len(batch)
+        await asyncio.gather(*(generate(user_id, inputs) for user_id, inputs in batch.items()))
+
+    elapsed = time.perf_counter() - start
+    cost = (stats["input_tokens"] * settings.LLM_INPUT_COST_PER_MTOK
+            + stats["output_tokens"] * settings.LLM_OUTPUT_COST_PER_MTOK) / 1_000_000
+    report = {
+        **stats,
+        "started_at": started_at,
+        "duration_seconds": round(elapsed, 3),
+        "users_per_second": round(stats["users"] / elapsed, 2) if elapsed else 0,
+        "estimated_cost_usd": round(cost, 4),
+    }
+    await db.db.advice_pregen_runs.insert_one(dict(report))
+    logger.info(
+        f"Advice pre-generation: {stats['generated']}/{stats['users']} users in {elapsed:.1f}s "
+        f"({report['users_per_second']} users/s), {stats['failed']} failed, "
+        f"{stats['input_tokens']} input / {stats['output_tokens']} output tokens, ~${cost:.4f}"
+    )
+    return report
+
+async def main():
+    db.connect()
+    await load_encoding()
+    try:
+        await run()
+    finally:
+        await close_llm()
+        db.close()
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    asyncio.run(main())
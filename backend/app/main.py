@@ -1,11 +1,29 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, ORJSONResponse
+from pymongo.errors import ExecutionTimeout, NetworkTimeout, WaitQueueTimeoutError, ServerSelectionTimeoutError
 from contextlib import asynccontextmanager
+import asyncio
 import logging
 
 from .core.config import settings
 from .core.database import db
-from .routers import auth, transactions, budgets, goals, stats, advice
+from .core.deadline import DeadlineExceeded
+from .core.encoding import CompressionMiddleware, MessagePackMiddleware
+from .core.indexes import ensure_indexes, verify_indexes
+from .core.keys import key_set
+from .core.metrics import MetricsMiddleware
+from .core.middleware import RequestDeadlineMiddleware
+from .core.profiling import ProfilingMiddleware
+from .core.revocation import revocation_set
+from .core.security import shutdown_hash_executor
+from .core.slow_queries import slow_query_log
+from .routers import auth, transactions, budgets, goals, stats, dashboard, batch, advice, metrics, admin
+from .services.advice import load_encoding
+from .services.advice_jobs import advice_jobs
+from .services.llm import close_llm
 
 # Logging
 logging.basicConfig(
@@ -19,12 +37,47 @@ async def lifespan(app: FastAPI):
     # Startup
     logger.info("Starting up...")
     db.connect()
+    if settings.INDEX_BOOTSTRAP_ON_STARTUP:
+        # Not a hard dependency: without the indexes queries are slower, not
+        # wrong, and check_indexes --live reports what is missing
+        try:
+            await ensure_indexes()
+            for collection, diff in (await verify_indexes()).items():
+                if diff["missing"]:
+                    logger.warning(f"Missing indexes on {collection}: {', '.join(diff['missing'])}")
+                if diff["extra"]:
+                    logger.info(f"Undeclared indexes on {collection}: {', '.join(diff['extra'])}")
+        except Exception as e:
+            logger.error(f"Index bootstrap failed: {str(e)}")
+    try:
+        # Bounded: a stalled download keeps going in its thread, meanwhile
+        # token counts are estimated
+        await asyncio.wait_for(load_encoding(), timeout=10)
+    except asyncio.TimeoutError:
+        logger.warning("tiktoken encoding still loading, estimating token counts until it is ready")
+    await key_set.load()
+    key_set.start()
+    revocation_set.start()
+    advice_jobs.start()
+    if settings.SLOW_QUERY_THRESHOLD_MS > 0 and settings.DATABASE_BACKEND != "memory":
+        await slow_query_log.start()
+    pool_log_task = None
+    if settings.MONGO_POOL_METRICS_LOG_SECONDS > 0:
+        pool_log_task = asyncio.create_task(db.log_pool_metrics())
     yield
     # Shutdown
     logger.info("Shutting down...")
+    if pool_log_task:
+        pool_log_task.cancel()
+    await advice_jobs.stop()
+    await slow_query_log.stop()
+    await revocation_set.stop()
+    await key_set.stop()
+    await close_llm()
+    shutdown_hash_executor()
     db.close()
 
-app = FastAPI(lifespan=lifespan)
+app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
 
 # CORS structure - allow all for now as per original, but cleaner
 app.add_middleware(
@@ -34,6 +87,40 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(RequestDeadlineMiddleware)
+app.add_middleware(MessagePackMiddleware)
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.COMPRESSION_MIN_SIZE,
+        gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+        brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
+    )
+if settings.PROFILING_ENABLED:
+    app.add_middleware(ProfilingMiddleware)
+if settings.METRICS_ENABLED:
+    # Added last, so outermost: the latency includes every other middleware
+    app.add_middleware(MetricsMiddleware)
+
+# Database timeouts: the query ran out of its time budget or no connection
+# was available in time. Report them as a temporary outage, not a 500.
+async def database_timeout_handler(request: Request, exc: Exception):
+    logger.warning(f"Database timeout on {request.url.path}: {type(exc).__name__}")
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Servizio temporaneamente non disponibile, riprova tra poco"},
+        headers={"Retry-After": "1"}
+    )
+
+# FastAPI's own 422 handler echoes the rejected input with the stdlib encoder,
+# which fails on Infinity/NaN amounts; orjson writes them as null instead
+async def validation_error_handler(request: Request, exc: RequestValidationError):
+    return ORJSONResponse(status_code=422, content={"detail": jsonable_encoder(exc.errors())})
+
+app.add_exception_handler(RequestValidationError, validation_error_handler)
+
+for exc_class in (DeadlineExceeded, ExecutionTimeout, NetworkTimeout, WaitQueueTimeoutError, ServerSelectionTimeoutError):
+    app.add_exception_handler(exc_class, database_timeout_handler)
 
 # API Router
 app.include_router(auth.router, prefix="/api")
@@ -41,7 +128,12 @@ app.include_router(transactions.router, prefix="/api")
 app.include_router(budgets.router, prefix="/api")
 app.include_router(goals.router, prefix="/api")
 app.include_router(stats.router, prefix="/api")
+app.include_router(dashboard.router, prefix="/api")
+app.include_router(batch.router, prefix="/api")
 app.include_router(advice.router, prefix="/api")
+app.include_router(admin.router, prefix="/api")
+if settings.METRICS_ENABLED:
+    app.include_router(metrics.router)
 
 @app.get("/")
 async def root():
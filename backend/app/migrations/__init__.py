@@ -0,0 +1,15 @@
+from .m0001_user_names import UserNames
+from .m0002_bson_dates import BsonDates
+from .m0003_minor_units import MinorUnits
+
+# Applied in this order; never reorder or renumber a migration once it has shipped
+MIGRATIONS = [
+    UserNames(),
+    BsonDates("users", ("created_at",)),
+    BsonDates("transactions", ("date", "created_at")),
+    BsonDates("budgets", ("created_at",)),
+    BsonDates("goals", ("deadline", "created_at")),
+    MinorUnits("transactions", ("amount",)),
+    MinorUnits("budgets", ("limit", "spent")),
+    MinorUnits("goals", ("target_amount", "current_amount")),
+]
@@ -0,0 +1,27 @@
+from typing import Optional
+
+class Migration:
+    """One schema change, applied document by document.
+
+    ``selector`` matches the documents that still need the change, so a
+    migration is idempotent and a rerun only touches what is left.
+    ``transform`` returns the update for one document, or None to leave it
+    alone. Each write is guarded by the old values of ``fields`` so a
+    concurrent edit from the API is never overwritten with stale data; the
+    runner simply skips that document.
+    """
+
+    id: str
+    description: str
+    collection: str
+    selector: dict
+    fields: tuple = ()
+
+    def transform(self, doc: dict) -> Optional[dict]:
+        raise NotImplementedError
+
+    def guard(self, doc: dict) -> dict:
+        query = {"_id": doc["_id"]}
+        for field in self.fields:
+            query[field] = doc[field] if field in doc else {"$exists": False}
+        return query
@@ -0,0 +1,15 @@
+from typing import Optional
+from .base import Migration
+
+class UserNames(Migration):
+    """Users created by the demo scripts were inserted without ``name``."""
+
+    id = "0001_user_names"
+    description = "Imposta name per gli utenti che non lo hanno"
+    collection = "users"
+    selector = {"name": {"$in": [None, ""]}}
+    fields = ("name", "email")
+
+    def transform(self, doc: dict) -> Optional[dict]:
+        name = (doc.get("email") or "").split("@")[0] or "Utente"
+        return {"$set": {"name": name}}
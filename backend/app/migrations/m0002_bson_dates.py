@@ -0,0 +1,35 @@
+import logging
+from datetime import datetime, timezone
+from typing import Optional
+from .base import Migration
+
+logger = logging.getLogger(__name__)
+
+def parse_date(value: str) -> datetime:
+    """Parse an ISO 8601 string into a UTC datetime; naive values are taken as UTC."""
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if parsed.tzinfo is None:
+        return parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc)
+
+class BsonDates(Migration):
+    """Dates written as ISO strings (naive or with an offset) become BSON dates."""
+
+    def __init__(self, collection: str, fields: tuple):
+        self.id = f"0002_{collection}_bson_dates"
+        self.description = f"Converte in date BSON i campi {', '.join(fields)} salvati come stringhe"
+        self.collection = collection
+        self.fields = fields
+        self.selector = {"$or": [{field: {"$type": "string"}} for field in fields]}
+
+    def transform(self, doc: dict) -> Optional[dict]:
+        updates = {}
+        for field in self.fields:
+            value = doc.get(field)
+            if not isinstance(value, str):
+                continue
+            try:
+                updates[field] = parse_date(value)
+            except ValueError:
+                logger.warning(f"Unparseable {self.collection}.{field} on {doc['_id']}: {value!r}")
+        return {"$set": updates} if updates else None
@@ -0,0 +1,21 @@
+from typing import Optional
+from ..core.config import settings
+from ..core.money import to_minor
+from .base import Migration
+
+class MinorUnits(Migration):
+    """Float amounts in major units become int64 cents, with a currency code."""
+
+    def __init__(self, collection: str, money_fields: tuple):
+        self.id = f"0003_{collection}_minor_units"
+        self.description = f"Converte {', '.join(money_fields)} in centesimi interi e aggiunge currency"
+        self.collection = collection
+        self.money_fields = money_fields
+        self.fields = money_fields + ("currency",)
+        self.selector = {"$or": [{field: {"$type": "double"}} for field in money_fields] + [{"currency": {"$exists": False}}]}
+
+    def transform(self, doc: dict) -> Optional[dict]:
+        updates = {field: to_minor(doc[field]) for field in self.money_fields if isinstance(doc.get(field), float)}
+        if "currency" not in doc:
+            updates["currency"] = settings.DEFAULT_CURRENCY
+        return {"$set": updates} if updates else None
@@ -0,0 +1,156 @@
+import asyncio
+import logging
+import socket
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import DuplicateKeyError
+from pymongo.write_concern import WriteConcern
+from ..core.config import settings
+from ..core.database import db
+from ..core.indexes import query_pattern
+from . import MIGRATIONS
+from .base import Migration
+
+logger = logging.getLogger(__name__)
+
+RUNNING = "running"
+DONE = "done"
+
+# Extra passes from the start for documents skipped because the API changed
+# them between our read and our write
+MAX_PASSES = 3
+
+class MigrationLocked(Exception):
+    """Another runner holds the lease on this migration."""
+
+class MigrationRunner:
+    """Apply ``Migration`` objects in order, resumably and gently.
+
+    Progress lives in the ``schema_migrations`` collection, one document per
+    migration: status, the last ``_id`` written and counters. Documents are
+    read in ``_id`` order in batches of ``batch_size``; after each batch the
+    checkpoint is saved, so an interrupted run resumes where it stopped.
+
+    Two things keep a run over millions of documents from hurting live
+    traffic: writes use majority write concern, so the runner can never get
+    ahead of the secondaries, and after each batch it sleeps long enough to
+    spend at most ``duty_cycle`` of wall time working. A lease stops two
+    runners from working on the same migration.
+    """
+
+    def __init__(self, migrations: list, batch_size: Optional[int] = None,
+                 duty_cycle: Optional[float] = None):
+        self.migrations = migrations
+        self.batch_size = batch_size or settings.MIGRATION_BATCH_SIZE
+        self.duty_cycle = settings.MIGRATION_DUTY_CYCLE if duty_cycle is None else duty_cycle
+        if not 0 < self.duty_cycle <= 1:
+            raise ValueError(f"duty_cycle must be in (0, 1], got {self.duty_cycle}")
+        self.owner = f"{socket.gethostname()}:{uuid.uuid4().hex[:8]}"
+
+    @property
+    def state(self):
+        return db.db.schema_migrations
+
+    @query_pattern("schema_migrations", scan="one document per migration")
+    async def status(self) -> list:
+        states = {doc["_id"]: doc async for doc in self.state.find({})}
+        return [(migration, states.get(migration.id)) for migration in self.migrations]
+
+    async def run(self):
+        for migration in self.migrations:
+            await self.apply(migration)
+
+    @query_pattern(lambda: {migration.collection for migration in MIGRATIONS}, sort=["_id"])
+    async def apply(self, migration: Migration):
+        state = await self._claim(migration)
+        if state is None:
+            return
+        collection = db.db[migration.collection].with_options(write_concern=WriteConcern("majority"))
+        last_id = state.get("last_id")
+        processed = state.get("processed", 0)
+        modified = state.get("modified", 0)
+        logger.info(f"Migration {migration.id}: {'resuming after ' + str(last_id) if last_id else 'starting'}")
+
+        passes, skipped = 1, 0
+        while True:
+            started = time.monotonic()
+            query = migration.selector
+            if last_id is not None:
+                query = {"$and": [migration.selector, {"_id": {"$gt": last_id}}]}
+            docs = await collection.find(query).sort("_id", 1).limit(self.batch_size).to_list(self.batch_size)
+            if not docs:
+                if skipped and passes < MAX_PASSES:
+                    logger.info(f"Migration {migration.id}: {skipped} documents changed concurrently, another pass")
+                    passes, skipped, last_id = passes + 1, 0, None
+                    continue
+                break
+
+            requests = []
+            for doc in docs:
+                update = migration.transform(doc)
+                if update:
+                    requests.append(UpdateOne(migration.guard(doc), update))
+            if requests:
+                result = await collection.bulk_write(requests, ordered=False)
+                modified += result.modified_count
+                skipped += len(requests) - result.matched_count
+            processed += len(docs)
+            last_id = docs[-1]["_id"]
+            await self._checkpoint(migration, last_id, processed, modified)
+
+            # Throttle: work at most duty_cycle of the time
+            elapsed = time.monotonic() - started
+            await asyncio.sleep(elapsed * (1 - self.duty_cycle) / self.duty_cycle)
+
+        await self.state.update_one(
+            {"_id": migration.id, "owner": self.owner},
+            {"$set": {"status": DONE, "finished_at": datetime.now(timezone.utc), "owner": None}}
+        )
+        logger.info(f"Migration {migration.id} done: {processed} examined, {modified} modified")
+
+    async def _claim(self, migration: Migration) -> Optional[dict]:
+        """Take the lease on ``migration``; None if it is already done."""
+        existing = await self.state.find_one({"_id": migration.id})
+        if existing and existing["status"] == DONE:
+            return None
+        now = datetime.now(timezone.utc)
+        try:
+            return await self.state.find_one_and_update(
+                {"_id": migration.id, "status": RUNNING, "$or": [
+                    {"owner": None},
+                    {"lease_expires_at": {"$lt": now}},
+                ]},
+                {
+                    "$set": {
+                        "owner": self.owner,
+                        "lease_expires_at": now + timedelta(seconds=settings.MIGRATION_LEASE_SECONDS),
+                    },
+                    "$setOnInsert": {
+                        "description": migration.description,
+                        "collection": migration.collection,
+                        "started_at": now,
+                        "processed": 0,
+                        "modified": 0,
+                    },
+                },
+                upsert=True,
+                return_document=ReturnDocument.AFTER
+            )
+        except DuplicateKeyError:
+            raise MigrationLocked(f"Migration {migration.id} is being run by {existing.get('owner') if existing else 'another runner'}")
+
+    async def _checkpoint(self, migration: Migration, last_id, processed: int, modified: int):
+        result = await self.state.update_one(
+            {"_id": migration.id, "owner": self.owner},
+            {"$set": {
+                "last_id": last_id,
+                "processed": processed,
+                "modified": modified,
+                "lease_expires_at": datetime.now(timezone.utc) + timedelta(seconds=settings.MIGRATION_LEASE_SECONDS),
+            }}
+        )
+        if result.matched_count == 0:
+            raise MigrationLocked(f"Lost the lease on migration {migration.id}")
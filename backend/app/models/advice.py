@@ -1,5 +1,19 @@
 from pydantic import BaseModel
 from typing import Optional
+from datetime import datetime
 
 class AdviceRequest(BaseModel):
     context: Optional[str] = None
+    background: bool = False  # enqueue a job and poll /advice/jobs/{id} instead of waiting
+
+class AdviceJobCreated(BaseModel):
+    job_id: str
+    status: str
+
+class AdviceJob(BaseModel):
+    id: str
+    status: str  # pending, running, done, failed
+    advice: Optional[str] = None
+    attempts: int = 0
+    created_at: datetime
+    updated_at: datetime
@@ -0,0 +1,17 @@
+from pydantic import BaseModel, Field
+from typing import Any, List, Optional
+
+class BatchItem(BaseModel):
+    id: str
+    method: str = Field(pattern="^(GET|POST|PUT|DELETE)$")
+    path: str = Field(pattern="^/")  # relative to /api, query string allowed
+    body: Optional[Any] = None
+    depends_on: List[str] = []  # ids of earlier items that must succeed first
+
+class BatchRequest(BaseModel):
+    requests: List[BatchItem]
+
+class BatchResult(BaseModel):
+    id: str
+    status: int
+    body: Any = None
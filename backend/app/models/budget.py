@@ -1,6 +1,9 @@
 from pydantic import BaseModel, Field
 from typing import Optional
 from datetime import datetime
+from ..core.config import settings
+from ..core.money import Amount, api_fields, to_minor
+from ..core.responses import list_adapter
 
 class Budget(BaseModel):
     id: Optional[str] = None
@@ -8,10 +11,25 @@ class Budget(BaseModel):
     category: str
     limit: float
     spent: float = 0
+    currency: str = settings.DEFAULT_CURRENCY
     period: str  # monthly, weekly
     created_at: datetime = Field(default_factory=lambda: datetime.now().astimezone())
 
+    @classmethod
+    def from_document(cls, doc: dict) -> "Budget":
+        return cls(**api_fields(doc, ("limit", "spent")))
+
+    @classmethod
+    def from_documents(cls, docs: list) -> list:
+        return list_adapter(cls).validate_python([api_fields(doc, ("limit", "spent")) for doc in docs])
+
 class BudgetCreate(BaseModel):
     category: str
-    limit: float
+    limit: Amount
+    currency: str = Field(default=settings.DEFAULT_CURRENCY, pattern=f"^{settings.DEFAULT_CURRENCY}$")
     period: str
+
+    def to_document(self) -> dict:
+        doc = self.model_dump()
+        doc["limit"] = to_minor(self.limit)
+        return doc
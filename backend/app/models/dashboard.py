@@ -0,0 +1,53 @@
+from pydantic import BaseModel
+from typing import Any, ClassVar, Dict, List, Optional
+from datetime import datetime
+from ..core.config import settings
+from ..core.money import api_fields
+
+class DashboardItem(BaseModel):
+    """Home-screen subset of a stored document.
+
+    Only the declared fields are fetched (``projection``), so the dashboard
+    neither reads nor sends user_id, created_at and the like.
+    """
+    id: str
+    money_fields: ClassVar[tuple] = ()
+
+    @classmethod
+    def projection(cls) -> dict:
+        return {field: 1 for field in cls.model_fields if field != "id"}
+
+    @classmethod
+    def from_document(cls, doc: dict) -> "DashboardItem":
+        return cls(**api_fields(doc, cls.money_fields))
+
+class DashboardTransaction(DashboardItem):
+    type: str
+    amount: float
+    currency: str = settings.DEFAULT_CURRENCY
+    category: str
+    description: Optional[str] = None
+    date: datetime
+    money_fields: ClassVar[tuple] = ("amount",)
+
+class DashboardBudget(DashboardItem):
+    category: str
+    limit: float
+    spent: float = 0
+    currency: str = settings.DEFAULT_CURRENCY
+    period: str
+    money_fields: ClassVar[tuple] = ("limit", "spent")
+
+class DashboardGoal(DashboardItem):
+    name: str
+    target_amount: float
+    current_amount: float = 0
+    currency: str = settings.DEFAULT_CURRENCY
+    deadline: datetime
+    money_fields: ClassVar[tuple] = ("target_amount", "current_amount")
+
+class Dashboard(BaseModel):
+    stats: Dict[str, Any]
+    budgets: List[DashboardBudget]
+    goals: List[DashboardGoal]
+    recent_transactions: List[DashboardTransaction]
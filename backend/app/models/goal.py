@@ -1,6 +1,9 @@
 from pydantic import BaseModel, Field
 from typing import Optional
 from datetime import datetime
+from ..core.config import settings
+from ..core.money import Amount, api_fields, to_minor
+from ..core.responses import list_adapter
 
 class Goal(BaseModel):
     id: Optional[str] = None
@@ -8,10 +11,25 @@ class Goal(BaseModel):
     name: str
     target_amount: float
     current_amount: float = 0
+    currency: str = settings.DEFAULT_CURRENCY
     deadline: datetime
     created_at: datetime = Field(default_factory=lambda: datetime.now().astimezone())
 
+    @classmethod
+    def from_document(cls, doc: dict) -> "Goal":
+        return cls(**api_fields(doc, ("target_amount", "current_amount")))
+
+    @classmethod
+    def from_documents(cls, docs: list) -> list:
+        return list_adapter(cls).validate_python([api_fields(doc, ("target_amount", "current_amount")) for doc in docs])
+
 class GoalCreate(BaseModel):
     name: str
-    target_amount: float
+    target_amount: Amount
+    currency: str = Field(default=settings.DEFAULT_CURRENCY, pattern=f"^{settings.DEFAULT_CURRENCY}$")
     deadline: datetime
+
+    def to_document(self) -> dict:
+        doc = self.model_dump()
+        doc["target_amount"] = to_minor(self.target_amount)
+        return doc
@@ -1,20 +1,41 @@
 from pydantic import BaseModel, Field
 from typing import Optional
 from datetime import datetime
+from ..core.config import settings
+from ..core.money import Amount, api_fields, to_minor
+from ..core.responses import list_adapter
 
 class Transaction(BaseModel):
     id: Optional[str] = None
     user_id: str
     type: str  # income or expense
     amount: float
+    currency: str = settings.DEFAULT_CURRENCY
     category: str
     description: Optional[str] = None
     date: datetime
     created_at: datetime = Field(default_factory=lambda: datetime.now().astimezone())
 
+    @classmethod
+    def from_document(cls, doc: dict) -> "Transaction":
+        return cls(**api_fields(doc, ("amount",)))
+
+    @classmethod
+    def from_documents(cls, docs: list) -> list:
+        # One validation call for the whole list, for ModelListResponse
+        return list_adapter(cls).validate_python([api_fields(doc, ("amount",)) for doc in docs])
+
 class TransactionCreate(BaseModel):
     type: str
-    amount: float
+    amount: Amount
+    # Single configured currency: amounts of different currencies are never
+    # matched or grouped apart, so mixing them would corrupt sums
+    currency: str = Field(default=settings.DEFAULT_CURRENCY, pattern=f"^{settings.DEFAULT_CURRENCY}$")
     category: str
     description: Optional[str] = None
     date: datetime
+
+    def to_document(self) -> dict:
+        doc = self.model_dump()
+        doc["amount"] = to_minor(self.amount)
+        return doc
@@ -0,0 +1,85 @@
+from datetime import datetime, timezone
+from typing import Optional
+from bson import ObjectId
+from pymongo import UpdateOne
+from ..core.database import db
+from ..core.deadline import time_limit_ms
+from ..core.indexes import query_pattern
+from .transactions import TransactionRepository, totals_pipeline
+
+def month_bounds(date: datetime) -> tuple:
+    """First instant of ``date``'s month and of the following one (UTC)."""
+    if date.tzinfo is not None:
+        date = date.astimezone(timezone.utc).replace(tzinfo=None)
+    start = datetime(date.year, date.month, 1)
+    end = datetime(date.year + date.month // 12, date.month % 12 + 1, 1)
+    return start, end
+
+class TransactionArchiveRepository(TransactionRepository):
+    """Cold transactions, moved out of ``transactions`` by the archive job.
+
+    Documents keep their ``_id`` and fields. For every user and month with
+    archived transactions, ``transaction_summaries`` holds the per
+    ``(type, category)`` totals, so stats never have to read the archive.
+    """
+
+    collection_name = "transactions_archive"
+
+    @property
+    def summaries(self):
+        return self.database.db.transaction_summaries
+
+    async def store(self, transactions: list):
+        """Copy ``transactions`` into the archive; safe to repeat."""
+        await self.collection.bulk_write([
+            UpdateOne(
+                {"_id": t["_id"]},
+                {"$setOnInsert": {k: v for k, v in t.items() if k != "_id"}},
+                upsert=True
+            )
+            for t in transactions
+        ], ordered=False)
+
+    @query_pattern(equality=["user_id"], sort=["date"])
+    @query_pattern("transaction_summaries", equality=["user_id", "month"])
+    async def refresh_summary(self, user_id: str, month: datetime):
+        """Recompute the summary of one user and month from the archive."""
+        start, end = month_bounds(month)
+        match = {"user_id": user_id, "date": {"$gte": start, "$lt": end}}
+        cursor = self.collection.aggregate(totals_pipeline(match, end), maxTimeMS=time_limit_ms())
+        rows = await cursor.to_list(None)
+        if not rows:
+            await self.summaries.delete_one({"user_id": user_id, "month": start})
+            return
+        await self.summaries.update_one(
+            {"user_id": user_id, "month": start},
+            {"$set": {
+                "rows": [{**row["_id"], "total": row["total"], "count": row["count"]} for row in rows],
+                "updated_at": datetime.now(timezone.utc),
+            }},
+            upsert=True
+        )
+
+    @query_pattern("transaction_summaries", equality=["user_id"])
+    async def summary_totals(self, user_id: str, route: Optional[str] = None) -> list:
+        """Archived totals in the shape of ``TransactionRepository.totals`` (``recent`` is 0)."""
+        handle = self.database.reader(route) if route else self.database.db
+        totals = {}
+        async for summary in handle.transaction_summaries.find({"user_id": user_id}).max_time_ms(time_limit_ms()):
+            for row in summary["rows"]:
+                key = (row["type"], row["category"])
+                entry = totals.setdefault(key, {"_id": {"type": row["type"], "category": row["category"]}, "total": 0, "recent": 0, "count": 0})
+                entry["total"] += row["total"]
+                entry["count"] += row["count"]
+        return list(totals.values())
+
+    async def delete(self, user_id: str, transaction_id: ObjectId) -> bool:
+        transaction = await self.collection.find_one(
+            {"_id": transaction_id, "user_id": user_id}, max_time_ms=time_limit_ms()
+        )
+        if transaction is None or not await super().delete(user_id, transaction_id):
+            return False
+        await self.refresh_summary(user_id, transaction["date"])
+        return True
+
+transaction_archive_repo = TransactionArchiveRepository(db)
@@ -0,0 +1,25 @@
+from typing import Optional
+from ..core.database import Database
+
+class Repository:
+    """Data access for one collection.
+
+    Repositories talk to whichever engine ``Database.connect`` set up: Motor
+    against MongoDB, or the in-memory engine (DATABASE_BACKEND=memory) with
+    the same query semantics. ``route`` selects the read preference of
+    staleness-tolerant reads (see ``Database.reader``); writes always go to
+    the primary.
+    """
+
+    collection_name: str
+
+    def __init__(self, database: Database):
+        self.database = database
+
+    @property
+    def collection(self):
+        return self.database.db[self.collection_name]
+
+    def reader(self, route: Optional[str] = None):
+        handle = self.database.reader(route) if route else self.database.db
+        return handle[self.collection_name]
@@ -0,0 +1,53 @@
+from typing import Optional
+from bson import Int64, ObjectId
+from pymongo import ReturnDocument
+from ..core.database import db
+from ..core.deadline import time_limit_ms
+from ..core.indexes import query_pattern
+from ..core.money import minor_expr
+from .base import Repository
+
+class BudgetRepository(Repository):
+    collection_name = "budgets"
+
+    @query_pattern(equality=["user_id", "category"])
+    async def find_by_category(self, user_id: str, category: str) -> Optional[dict]:
+        return await self.collection.find_one(
+            {"user_id": user_id, "category": category}, max_time_ms=time_limit_ms()
+        )
+
+    async def create(self, budget: dict) -> str:
+        result = await self.collection.insert_one(budget)
+        return str(result.inserted_id)
+
+    @query_pattern(equality=["user_id"])
+    async def list_for_user(self, user_id: str, limit: int = 1000, route: Optional[str] = None,
+                            projection: Optional[dict] = None) -> list:
+        return await self.reader(route).find({"user_id": user_id}, projection).max_time_ms(time_limit_ms()).to_list(limit)
+
+    async def update(self, user_id: str, budget_id: ObjectId, fields: dict) -> Optional[dict]:
+        """Apply ``fields`` and return the updated budget, or None if not found."""
+        return await self.collection.find_one_and_update(
+            {"_id": budget_id, "user_id": user_id},
+            {"$set": fields},
+            return_document=ReturnDocument.AFTER,
+            maxTimeMS=time_limit_ms()
+        )
+
+    @query_pattern(equality=["user_id", "category"])
+    async def add_spent(self, user_id: str, category: str, amount: int):
+        """Add ``amount`` cents to ``spent``.
+
+        A pipeline update rather than $inc, so a budget still holding a legacy
+        float is converted to cents in the same atomic write.
+        """
+        await self.collection.update_one(
+            {"user_id": user_id, "category": category},
+            [{"$set": {"spent": {"$add": [minor_expr("spent"), Int64(amount)]}}}]
+        )
+
+    async def delete(self, user_id: str, budget_id: ObjectId) -> bool:
+        result = await self.collection.delete_one({"_id": budget_id, "user_id": user_id})
+        return result.deleted_count > 0
+
+budget_repo = BudgetRepository(db)
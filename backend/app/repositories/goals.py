@@ -0,0 +1,35 @@
+from typing import Optional
+from bson import Int64, ObjectId
+from pymongo import ReturnDocument
+from ..core.database import db
+from ..core.deadline import time_limit_ms
+from ..core.indexes import query_pattern
+from ..core.money import minor_expr
+from .base import Repository
+
+class GoalRepository(Repository):
+    collection_name = "goals"
+
+    async def create(self, goal: dict) -> str:
+        result = await self.collection.insert_one(goal)
+        return str(result.inserted_id)
+
+    @query_pattern(equality=["user_id"])
+    async def list_for_user(self, user_id: str, limit: int = 1000, route: Optional[str] = None,
+                            projection: Optional[dict] = None) -> list:
+        return await self.reader(route).find({"user_id": user_id}, projection).max_time_ms(time_limit_ms()).to_list(limit)
+
+    async def contribute(self, user_id: str, goal_id: ObjectId, amount: int) -> Optional[dict]:
+        """Add ``amount`` cents and return the updated goal, or None if not found."""
+        return await self.collection.find_one_and_update(
+            {"_id": goal_id, "user_id": user_id},
+            [{"$set": {"current_amount": {"$add": [minor_expr("current_amount"), Int64(amount)]}}}],
+            return_document=ReturnDocument.AFTER,
+            maxTimeMS=time_limit_ms()
+        )
+
+    async def delete(self, user_id: str, goal_id: ObjectId) -> bool:
+        result = await self.collection.delete_one({"_id": goal_id, "user_id": user_id})
+        return result.deleted_count > 0
+
+goal_repo = GoalRepository(db)
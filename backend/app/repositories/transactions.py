@@ -0,0 +1,55 @@
+from datetime import datetime
+from typing import Optional
+from bson import ObjectId
+from ..core.database import db
+from ..core.deadline import time_limit_ms
+from ..core.indexes import query_pattern
+from ..core.money import minor_expr
+from .base import Repository
+
+def totals_pipeline(match: dict, since: datetime) -> list:
+    return [
+        {"$match": match},
+        {"$project": {
+            "type": 1,
+            "category": 1,
+            "amount": minor_expr("amount"),
+            "recent": {"$gte": ["$date", since]},
+        }},
+        {"$group": {
+            "_id": {"type": "$type", "category": "$category"},
+            "total": {"$sum": "$amount"},
+            "recent": {"$sum": {"$cond": ["$recent", "$amount", 0]}},
+            "count": {"$sum": 1},
+        }},
+    ]
+
+class TransactionRepository(Repository):
+    collection_name = "transactions"
+
+    async def create(self, transaction: dict) -> str:
+        result = await self.collection.insert_one(transaction)
+        return str(result.inserted_id)
+
+    @query_pattern(equality=["user_id"], sort=["date"])
+    async def list_for_user(self, user_id: str, limit: int = 1000, route: Optional[str] = None,
+                            projection: Optional[dict] = None) -> list:
+        """The user's transactions, newest first; ``projection`` trims the fields fetched."""
+        cursor = self.reader(route).find({"user_id": user_id}, projection).sort("date", -1).limit(limit)
+        return await cursor.max_time_ms(time_limit_ms()).to_list(limit)
+
+    @query_pattern(equality=["user_id"])
+    async def totals(self, user_id: str, since: datetime, route: Optional[str] = None) -> list:
+        """Exact integer sums in cents per ``(type, category)``.
+
+        Each row has ``_id: {type, category}``, ``total``, ``recent`` (only
+        transactions dated ``since`` or later) and ``count``.
+        """
+        cursor = self.reader(route).aggregate(totals_pipeline({"user_id": user_id}, since), maxTimeMS=time_limit_ms())
+        return await cursor.to_list(None)
+
+    async def delete(self, user_id: str, transaction_id: ObjectId) -> bool:
+        result = await self.collection.delete_one({"_id": transaction_id, "user_id": user_id})
+        return result.deleted_count > 0
+
+transaction_repo = TransactionRepository(db)
@@ -0,0 +1,21 @@
+from typing import Optional
+from ..core.database import db
+from ..core.deadline import time_limit_ms
+from ..core.indexes import query_pattern
+from .base import Repository
+
+class UserRepository(Repository):
+    collection_name = "users"
+
+    @query_pattern(equality=["email"])
+    async def find_by_email(self, email: str) -> Optional[dict]:
+        return await self.collection.find_one({"email": email}, max_time_ms=time_limit_ms())
+
+    async def create(self, user: dict) -> str:
+        result = await self.collection.insert_one(user)
+        return str(result.inserted_id)
+
+    async def update_password(self, user_id, hashed: str):
+        await self.collection.update_one({"_id": user_id}, {"$set": {"password": hashed}})
+
+user_repo = UserRepository(db)
@@ -0,0 +1,62 @@
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import PlainTextResponse
+from bson import ObjectId
+from datetime import datetime, timedelta, timezone
+from ..core.database import db
+from ..core.indexes import query_pattern
+from ..core.security import require_admin
+
+router = APIRouter(prefix="/admin", tags=["admin"], dependencies=[Depends(require_admin)])
+
+@router.get("/profiles")
+@query_pattern("request_profiles", sort=["started_at"])
+async def list_profiles(limit: int = 50):
+    """Most recent request profiles, without their stacks."""
+    cursor = db.db.request_profiles.find({}, {"folded": 0}).sort("started_at", -1).limit(min(limit, 500))
+    profiles = await cursor.to_list(None)
+    return [{"id": str(p.pop("_id")), **p} for p in profiles]
+
+@router.get("/profiles/{profile_id}", response_class=PlainTextResponse)
+async def get_profile(profile_id: str):
+    """Folded stacks, ready for flamegraph.pl or speedscope."""
+    try:
+        obj_id = ObjectId(profile_id)
+    except:
+        raise HTTPException(status_code=400, detail="Invalid ID format")
+
+    profile = await db.db.request_profiles.find_one({"_id": obj_id})
+    if not profile:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return PlainTextResponse(profile["folded"])
+
+@router.get("/slow-queries")
+@query_pattern("slow_queries", sort=["at"], scan="capped collection of SLOW_QUERY_LOG_BYTES")
+async def slow_queries(hours: int = 24, limit: int = 20):
+    """Slowest query shapes of the last ``hours``, ranked by total time spent.
+
+    docs_examined is only known for records sampled through explain
+    (SLOW_QUERY_EXPLAIN_SAMPLE_RATE); docs_returned counts the first batch.
+    """
+    since = datetime.now(timezone.utc) - timedelta(hours=hours)
+    pipeline = [
+        {"$match": {"at": {"$gte": since}}},
+        {"$group": {
+            "_id": "$shape_id",
+            "collection": {"$first": "$collection"},
+            "command": {"$first": "$command"},
+            "shape": {"$first": "$shape"},
+            "count": {"$sum": 1},
+            "total_ms": {"$sum": "$duration_ms"},
+            "avg_ms": {"$avg": "$duration_ms"},
+            "max_ms": {"$max": "$duration_ms"},
+            "avg_docs_returned": {"$avg": "$docs_returned"},
+            "max_docs_examined": {"$max": "$docs_examined"},
+            "max_keys_examined": {"$max": "$keys_examined"},
+            "plan": {"$max": "$plan"},  # any sampled plan; unsampled records have none
+            "last_seen": {"$max": "$at"},
+        }},
+        {"$sort": {"total_ms": -1}},
+        {"$limit": min(limit, 200)},
+    ]
+    shapes = await db.db.slow_queries.aggregate(pipeline).to_list(None)
+    return [{"shape_id": s.pop("_id"), **s} for s in shapes]
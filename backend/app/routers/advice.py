@@ -1,77 +1,85 @@
-from fastapi import APIRouter, Depends
-from openai import OpenAI
+from fastapi import APIRouter, Depends, HTTPException, Response
+from fastapi.responses import StreamingResponse
+from bson import ObjectId
+import json
 import logging
-from ..models.advice import AdviceRequest
-from ..core.database import db
-from ..core.config import settings
+from ..models.advice import AdviceRequest, AdviceJob, AdviceJobCreated
 from ..core.security import get_current_user
+from ..services.advice import (
+    build_context, generate_advice, get_precomputed_advice, stream_advice as stream_advice_tokens,
+    NOT_CONFIGURED_MESSAGE, ERROR_MESSAGE,
+)
+from ..services.advice_jobs import advice_jobs
+from ..services.llm import LLMNotConfigured
 
 router = APIRouter(prefix="/advice", tags=["advice"])
 logger = logging.getLogger(__name__)
 
+def sse_event(data: dict, event: str = None) -> str:
+    # One server-sent event; JSON keeps newlines inside tokens on a single data line
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(data, ensure_ascii=False)}\n\n"
+
 @router.post("")
-async def get_advice(request: AdviceRequest, user_id: str = Depends(get_current_user)):
-    # Get user's financial data
-    transactions = await db.db.transactions.find({"user_id": user_id}).sort("date", -1).limit(50).to_list(50)
-    budgets = await db.db.budgets.find({"user_id": user_id}).to_list(100)
-    goals = await db.db.goals.find({"user_id": user_id}).to_list(100)
-    
-    # Calculate statistics
-    total_income = sum(t["amount"] for t in transactions if t["type"] == "income")
-    total_expenses = sum(t["amount"] for t in transactions if t["type"] == "expense")
-    
-    # Build context for AI
-    context = f"""Analizza la situazione finanziaria dell'utente e fornisci 3-5 consigli pratici in italiano.
+async def get_advice(request: AdviceRequest, response: Response, user_id: str = Depends(get_current_user)):
+    if request.background:
+        job_id = await advice_jobs.enqueue(user_id, request)
+        response.status_code = 202
+        return AdviceJobCreated(job_id=job_id, status="pending")
 
-Dati finanziari:
-- Entrate totali: €{total_income:.2f}
-- Spese totali: €{total_expenses:.2f}
-- Bilancio: €{total_income - total_expenses:.2f}
-- Numero di transazioni: {len(transactions)}
-- Budget attivi: {len(budgets)}
-- Obiettivi di risparmio: {len(goals)}
-"""
-    
-    if budgets:
-        context += "\nBudget:\n"
-        for b in budgets:
-            percentage = (b["spent"] / b["limit"] * 100) if b["limit"] > 0 else 0
-            context += f"- {b['category']}: {b['spent']:.2f}€ / {b['limit']:.2f}€ ({percentage:.1f}%)\n"
-    
-    if goals:
-        context += "\nObiettivi:\n"
-        for g in goals:
-            percentage = (g["current_amount"] / g["target_amount"] * 100) if g["target_amount"] > 0 else 0
-            context += f"- {g['name']}: {g['current_amount']:.2f}€ / {g['target_amount']:.2f}€ ({percentage:.1f}%)\n"
-    
-    if request.context:
-        context += f"\nRichiesta specifica: {request.context}\n"
-    
-    context += "\nFornisci consigli pratici e personalizzati per migliorare la gestione finanziaria."
+    # Generic advice is usually pre-generated overnight; specific questions always go to the LLM
+    if not request.context:
+        precomputed = await get_precomputed_advice(user_id)
+        if precomputed:
+            return {"advice": precomputed}
+
+    context = await build_context(user_id, request)
     
     try:
-        # Use OpenAI directly
-        openai_key = settings.OPENAI_API_KEY or settings.EMERGENT_LLM_KEY
-        if not openai_key:
-            return {
-                "advice": "Servizio di consigli AI non configurato. Contatta l'amministratore."
-            }
-        
-        client = OpenAI(api_key=openai_key)
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": "Sei un consulente finanziario esperto. Fornisci consigli pratici e personalizzati in italiano."},
-                {"role": "user", "content": context}
-            ],
-            max_tokens=500,
-            temperature=0.7
-        )
-        
-        advice_text = response.choices[0].message.content
+        advice_text = await generate_advice(context)
         return {"advice": advice_text}
+    except LLMNotConfigured:
+        return {
+            "advice": NOT_CONFIGURED_MESSAGE
+        }
     except Exception as e:
         logger.error(f"Error getting AI advice: {str(e)}")
         return {
-            "advice": "Mi dispiace, non sono riuscito a generare consigli personalizzati. Riprova più tardi."
+            "advice": ERROR_MESSAGE
+        }
+
+@router.get("/jobs/{job_id}", response_model=AdviceJob)
+async def get_advice_job(job_id: str, user_id: str = Depends(get_current_user)):
+    if not ObjectId.is_valid(job_id):
+        raise HTTPException(status_code=400, detail="Invalid ID format")
+
+    job = await advice_jobs.get(job_id, user_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return AdviceJob(id=str(job["_id"]), **{k: v for k, v in job.items() if k != "_id"})
+
+@router.post("/stream")
+async def stream_advice(request: AdviceRequest, user_id: str = Depends(get_current_user)):
+    context = await build_context(user_id, request)
+
+    async def event_stream():
+        # Flush headers right away so the client sees the stream open before the first token
+        yield ": stream-open\n\n"
+        try:
+            async for token in stream_advice_tokens(context):
+                yield sse_event({"token": token})
+            yield sse_event({}, event="done")
+        except LLMNotConfigured:
+            yield sse_event({"advice": NOT_CONFIGURED_MESSAGE}, event="error")
+        except Exception as e:
+            logger.error(f"Error streaming AI advice: {str(e)}")
+            yield sse_event({"advice": ERROR_MESSAGE}, event="error")
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",  # disable nginx proxy buffering
         }
+    )
@@ -1,48 +1,76 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Request
 from datetime import datetime, timezone
-from ..models.user import UserCreate, UserLogin, UserResponse
-from ..core.database import get_db
-from ..core.security import hash_password, verify_password, create_token
+from ..models.user import UserCreate, UserLogin, UserResponse, RefreshRequest, TokenResponse, LogoutRequest
+from ..repositories.users import user_repo
+from ..core.throttle import client_ip, login_throttle
+from ..core.security import (
+    hash_password, verify_password, needs_rehash, create_token, create_refresh_token,
+    rotate_refresh_token, revoke_refresh_token, revoke_access_token, get_current_claims,
+)
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
 @router.post("/register", response_model=UserResponse)
-async def register(user: UserCreate, db=Depends(get_db)):
+async def register(user: UserCreate):
     # Check if user exists
-    existing_user = await db.users.find_one({"email": user.email})
+    existing_user = await user_repo.find_by_email(user.email)
     if existing_user:
         raise HTTPException(status_code=400, detail="Email already registered")
     
     # Create user
     user_dict = {
         "email": user.email,
-        "password": hash_password(user.password),
+        "password": await hash_password(user.password),
         "name": user.name,
         "created_at": datetime.now(timezone.utc)
     }
-    result = await db.users.insert_one(user_dict)
-    user_id = str(result.inserted_id)
+    user_id = await user_repo.create(user_dict)
     
     token = create_token(user_id)
+    refresh_token = await create_refresh_token(user_id)
     return UserResponse(
         id=user_id,
         email=user.email,
         name=user.name,
-        token=token
+        token=token,
+        refresh_token=refresh_token
     )
 
 @router.post("/login", response_model=UserResponse)
-async def login(user: UserLogin, db=Depends(get_db)):
+async def login(user: UserLogin, request: Request):
+    ip = client_ip(request)
+    # Count the attempt before any password hash is computed; throttled ones are rejected here
+    await login_throttle.acquire(user.email, ip)
+    
     # Find user
-    db_user = await db.users.find_one({"email": user.email})
-    if not db_user or not verify_password(user.password, db_user["password"]):
+    db_user = await user_repo.find_by_email(user.email)
+    if not db_user or not await verify_password(user.password, db_user["password"]):
         raise HTTPException(status_code=401, detail="Invalid credentials")
+    await login_throttle.refund(user.email, ip)
+    
+    # Transparently upgrade hashes made with a different cost factor
+    if needs_rehash(db_user["password"]):
+        await user_repo.update_password(db_user["_id"], await hash_password(user.password))
     
     user_id = str(db_user["_id"])
     token = create_token(user_id)
+    refresh_token = await create_refresh_token(user_id)
     return UserResponse(
         id=user_id,
         email=db_user["email"],
         name=db_user["name"],
-        token=token
+        token=token,
+        refresh_token=refresh_token
     )
+
+@router.post("/refresh", response_model=TokenResponse)
+async def refresh(request: RefreshRequest):
+    user_id, refresh_token = await rotate_refresh_token(request.refresh_token)
+    return TokenResponse(token=create_token(user_id), refresh_token=refresh_token)
+
+@router.post("/logout")
+async def logout(request: LogoutRequest, claims: dict = Depends(get_current_claims)):
+    await revoke_access_token(claims)
+    if request.refresh_token:
+        await revoke_refresh_token(request.refresh_token)
+    return {"message": "Logged out"}
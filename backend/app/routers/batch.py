@@ -0,0 +1,114 @@
+import asyncio
+import logging
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Request
+from starlette.exceptions import HTTPException as StarletteHTTPException
+from typing import List
+from ..models.batch import BatchItem, BatchRequest, BatchResult
+from ..core.config import settings
+from ..core.security import get_current_claims
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/batch", tags=["batch"])
+
+async def dispatch(request: Request, claims: dict, item: BatchItem) -> BatchResult:
+    """Run ``item`` through the app's router, in-process, as the batch's user.
+
+    The sub-request skips the middlewares (they already ran for the batch)
+    and authentication (see ``get_current_claims``); routing, validation and
+    the exception handlers are the ones a direct call would get.
+    """
+    path, _, query = item.path.partition("?")
+    body = b"" if item.body is None else orjson.dumps(item.body)
+    scope = {
+        "type": "http",
+        "asgi": request.scope.get("asgi", {"version": "3.0"}),
+        "http_version": "1.1",
+        "method": item.method,
+        "scheme": request.url.scheme,
+        "server": request.scope.get("server"),
+        "client": request.scope.get("client"),
+        "root_path": "",
+        "path": "/api" + path,
+        "raw_path": ("/api" + path).encode(),
+        "query_string": query.encode(),
+        "headers": [
+            (b"authorization", request.headers["authorization"].encode()),
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+        ],
+        "app": request.app,
+        "state": {},
+        "batch_claims": claims,
+        "starlette.exception_handlers": request.scope["starlette.exception_handlers"],
+    }
+    messages = [{"type": "http.request", "body": body, "more_body": False}]
+    status = 500
+    content_type = b""
+    chunks = []
+
+    async def receive():
+        if messages:
+            return messages.pop()
+        # A disconnect of the batch request cancels us instead
+        await asyncio.Future()
+
+    async def send(message):
+        nonlocal status, content_type
+        if message["type"] == "http.response.start":
+            status = message["status"]
+            content_type = dict(message.get("headers", [])).get(b"content-type", b"")
+        else:
+            chunks.append(message.get("body", b""))
+
+    try:
+        await request.app.router(scope, receive, send)
+    except StarletteHTTPException as e:
+        # Raised by the router itself (no matching route, wrong method)
+        return BatchResult(id=item.id, status=e.status_code, body={"detail": e.detail})
+    except Exception as e:
+        logger.error(f"Error in batch sub-request {item.method} {item.path}: {str(e)}")
+        return BatchResult(id=item.id, status=500, body={"detail": "Internal Server Error"})
+    content = b"".join(chunks)
+    if content_type.startswith(b"application/json") and content:
+        return BatchResult(id=item.id, status=status, body=orjson.loads(content))
+    return BatchResult(id=item.id, status=status, body=content.decode() or None)
+
+async def run(request: Request, claims: dict, item: BatchItem, dependencies: list) -> BatchResult:
+    for result in await asyncio.gather(*dependencies):
+        if result.status >= 400:
+            return BatchResult(id=item.id, status=424, body={"detail": f"Dependency {result.id} failed"})
+    return await dispatch(request, claims, item)
+
+@router.post("", response_model=List[BatchResult])
+async def batch(batch: BatchRequest, request: Request, claims: dict = Depends(get_current_claims)):
+    """Several API calls in one round trip, authenticated once.
+
+    Items run concurrently unless they list earlier items in ``depends_on``;
+    an item whose dependency did not succeed is answered 424 without running.
+    Results come back in request order.
+    """
+    if len(batch.requests) > settings.BATCH_MAX_REQUESTS:
+        raise HTTPException(status_code=400, detail=f"At most {settings.BATCH_MAX_REQUESTS} requests per batch")
+    seen = set()
+    for item in batch.requests:
+        if item.id in seen:
+            raise HTTPException(status_code=400, detail=f"Duplicate request id: {item.id}")
+        # Only earlier ids, which also rules out cycles
+        unknown = [dep for dep in item.depends_on if dep not in seen]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Request {item.id} depends on unknown or later ids: {', '.join(unknown)}")
+        path = item.path.split("?")[0].rstrip("/")
+        if path == router.prefix:
+            raise HTTPException(status_code=400, detail="Batches cannot be nested")
+        if path.startswith("/auth/"):
+            # Login, refresh and logout change the credentials the batch runs with
+            raise HTTPException(status_code=400, detail="Auth endpoints cannot be batched")
+        seen.add(item.id)
+
+    tasks = {}
+    for item in batch.requests:
+        dependencies = [tasks[dep] for dep in item.depends_on]
+        tasks[item.id] = asyncio.ensure_future(run(request, claims, item, dependencies))
+    return await asyncio.gather(*tasks.values())
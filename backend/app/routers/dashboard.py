@@ -0,0 +1,27 @@
+import asyncio
+from fastapi import APIRouter, Depends
+from ..models.dashboard import Dashboard, DashboardBudget, DashboardGoal, DashboardTransaction
+from ..repositories.budgets import budget_repo
+from ..repositories.goals import goal_repo
+from ..repositories.transactions import transaction_repo
+from ..services.stats import compute_stats
+from ..core.security import get_current_user
+
+router = APIRouter(prefix="/dashboard", tags=["dashboard"])
+
+@router.get("", response_model=Dashboard)
+async def get_dashboard(recent: int = 10, include_archived: bool = True, user_id: str = Depends(get_current_user)):
+    """Everything the home screen shows, in one request and one token check."""
+    # The queries are independent; stats keeps its own read preference
+    stats, budgets, goals, transactions = await asyncio.gather(
+        compute_stats(user_id, include_archived),
+        budget_repo.list_for_user(user_id, projection=DashboardBudget.projection()),
+        goal_repo.list_for_user(user_id, projection=DashboardGoal.projection()),
+        transaction_repo.list_for_user(user_id, limit=max(1, min(recent, 100)), projection=DashboardTransaction.projection()),
+    )
+    return Dashboard(
+        stats=stats,
+        budgets=[DashboardBudget.from_document(b) for b in budgets],
+        goals=[DashboardGoal.from_document(g) for g in goals],
+        recent_transactions=[DashboardTransaction.from_document(t) for t in transactions],
+    )
@@ -0,0 +1,51 @@
+from fastapi import APIRouter, Depends
+from fastapi.responses import PlainTextResponse
+from ..core import metrics
+from ..core.database import db
+from ..core.pool_metrics import WAIT_BUCKETS_MS
+from ..core.security import require_admin, token_cache
+
+# Same X-Admin-Token as /api/admin: the pool, token-cache and latency series
+# are not for the public internet
+router = APIRouter(tags=["metrics"], dependencies=[Depends(require_admin)])
+
+class PoolWaitHistogram:
+    """Connection checkout wait from ``Database.pool_metrics``, in seconds."""
+
+    name = "mongo_pool_checkout_wait_seconds"
+
+    def render(self) -> list:
+        snapshot = db.pool_metrics.snapshot()
+        lines = [f"# HELP {self.name} Time spent waiting for a pooled connection", f"# TYPE {self.name} histogram"]
+        cumulative = 0
+        for bound_ms in WAIT_BUCKETS_MS:
+            cumulative += snapshot["wait_ms_buckets"][bound_ms]
+            le = "+Inf" if bound_ms == float("inf") else bound_ms / 1000
+            lines.append(f'{self.name}_bucket{{le="{le}"}} {cumulative}')
+        lines.append(f"{self.name}_sum {snapshot['wait_ms_sum'] / 1000}")
+        lines.append(f"{self.name}_count {snapshot['checkouts']}")
+        return lines
+
+def _per_address(key: str):
+    return lambda: {(address,): value for address, value in db.pool_metrics.snapshot()[key].items()}
+
+metrics.register(metrics.Callback(
+    "mongo_pool_connections_in_use", "Connections checked out of the pool", "gauge", ("address",), _per_address("in_use"),
+))
+metrics.register(metrics.Callback(
+    "mongo_pool_connections_open", "Open pooled connections", "gauge", ("address",), _per_address("open"),
+))
+metrics.register(metrics.Callback(
+    "mongo_pool_checkout_failures_total", "Failed connection checkouts", "counter", ("reason",),
+    lambda: {(reason,): count for reason, count in db.pool_metrics.snapshot()["checkout_failures"].items()},
+))
+metrics.register(PoolWaitHistogram())
+metrics.register(metrics.Callback(
+    "token_cache_requests_total", "Verified-JWT cache lookups", "counter", ("result",),
+    lambda: {("hit",): token_cache.hits, ("miss",): token_cache.misses},
+))
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    # Prometheus text exposition format 0.0.4
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
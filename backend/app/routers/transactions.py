@@ -3,33 +3,35 @@ from typing import List
 from datetime import datetime, timezone
 from bson import ObjectId
 from ..models.transaction import Transaction, TransactionCreate
-from ..core.database import db
+from ..repositories.archive import transaction_archive_repo
+from ..repositories.budgets import budget_repo
+from ..repositories.transactions import transaction_repo
+from ..core.responses import ModelListResponse
 from ..core.security import get_current_user
 
 router = APIRouter(prefix="/transactions", tags=["transactions"])
 
 @router.post("", response_model=Transaction)
 async def create_transaction(transaction: TransactionCreate, user_id: str = Depends(get_current_user)):
-    trans_dict = transaction.model_dump()
+    trans_dict = transaction.to_document()
     trans_dict["user_id"] = user_id
     trans_dict["created_at"] = datetime.now(timezone.utc)
     
-    result = await db.db.transactions.insert_one(trans_dict)
+    await transaction_repo.create(trans_dict)
     
     # Update budget if expense
     if transaction.type == "expense":
-        await db.db.budgets.update_one(
-            {"user_id": user_id, "category": transaction.category},
-            {"$inc": {"spent": transaction.amount}}
-        )
+        await budget_repo.add_spent(user_id, transaction.category, trans_dict["amount"])
     
-    trans_dict["id"] = str(result.inserted_id)
-    return Transaction(**trans_dict)
+    return Transaction.from_document(trans_dict)
 
 @router.get("", response_model=List[Transaction])
-async def get_transactions(user_id: str = Depends(get_current_user)):
-    transactions = await db.db.transactions.find({"user_id": user_id}).sort("date", -1).to_list(1000)
-    return [Transaction(id=str(t["_id"]), **{k: v for k, v in t.items() if k != "_id"}) for t in transactions]
+async def get_transactions(include_archived: bool = False, user_id: str = Depends(get_current_user)):
+    transactions = await transaction_repo.list_for_user(user_id)
+    if include_archived:
+        archived = await transaction_archive_repo.list_for_user(user_id)
+        transactions = sorted(transactions + archived, key=lambda t: t["date"], reverse=True)[:1000]
+    return ModelListResponse(Transaction, Transaction.from_documents(transactions))
 
 @router.delete("/{transaction_id}")
 async def delete_transaction(transaction_id: str, user_id: str = Depends(get_current_user)):
@@ -38,7 +40,6 @@ async def delete_transaction(transaction_id: str, user_id: str = Depends(get_cur
     except:
         raise HTTPException(status_code=400, detail="Invalid ID format")
 
-    result = await db.db.transactions.delete_one({"_id": obj_id, "user_id": user_id})
-    if result.deleted_count == 0:
+    if not await transaction_repo.delete(user_id, obj_id) and not await transaction_archive_repo.delete(user_id, obj_id):
         raise HTTPException(status_code=404, detail="Transaction not found")
     return {"message": "Transaction deleted"}
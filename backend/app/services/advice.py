@@ -0,0 +1,189 @@
+from datetime import datetime, timedelta, timezone
+import asyncio
+import logging
+import time
+from ..models.advice import AdviceRequest
+from ..core.database import db
+from ..core.deadline import time_limit_ms
+from ..core.indexes import query_pattern
+from ..core.metrics import advice_cache_requests
+from ..core.money import from_minor, minor
+from ..core.config import settings
+from ..repositories.budgets import budget_repo
+from ..repositories.goals import goal_repo
+from ..repositories.transactions import transaction_repo
+from .llm import get_llm
+
+try:
+    import tiktoken
+except ImportError:  # not in requirements-minimal.txt
+    tiktoken = None
+
+logger = logging.getLogger(__name__)
+
+SYSTEM_PROMPT = "Sei un consulente finanziario esperto. Fornisci consigli pratici e personalizzati in italiano."
+NOT_CONFIGURED_MESSAGE = "Servizio di consigli AI non configurato. Contatta l'amministratore."
+ERROR_MESSAGE = "Mi dispiace, non sono riuscito a generare consigli personalizzati. Riprova più tardi."
+
+async def build_context(user_id: str, request: AdviceRequest) -> str:
+    # Get user's financial data; the three queries are independent
+    transactions, budgets, goals = await asyncio.gather(
+        transaction_repo.list_for_user(user_id, limit=50, route="advice"),
+        budget_repo.list_for_user(user_id, limit=100, route="advice"),
+        goal_repo.list_for_user(user_id, limit=100, route="advice"),
+    )
+    return render_context(transactions, budgets, goals, request.context)
+
+def render_context(transactions: list, budgets: list, goals: list, question: str = None) -> str:
+    """Render the advice prompt from already-fetched documents.
+
+    ``transactions`` only needs ``type`` and ``amount`` and should be the
+    user's most recent ones, newest first.
+    """
+    # Calculate statistics
+    total_income = from_minor(sum(minor(t["amount"]) for t in transactions if t["type"] == "income"))
+    total_expenses = from_minor(sum(minor(t["amount"]) for t in transactions if t["type"] == "expense"))
+    
+    # Build context for AI
+    header = f"""Analizza la situazione finanziaria dell'utente e fornisci 3-5 consigli pratici in italiano.
+
+Dati finanziari:
+- Entrate totali: €{total_income:.2f}
+- Spese totali: €{total_expenses:.2f}
+- Bilancio: €{total_income - total_expenses:.2f}
+- Numero di transazioni: {len(transactions)}
+- Budget attivi: {len(budgets)}
+- Obiettivi di risparmio: {len(goals)}
+"""
+    footer = "\nFornisci consigli pratici e personalizzati per migliorare la gestione finanziaria."
+    
+    request_section = ""
+    if question:
+        question = truncate_tokens(question, settings.ADVICE_REQUEST_TOKEN_LIMIT)
+        request_section = f"\nRichiesta specifica: {question}\n"
+    
+    # Most over-spent budgets and least-funded goals are the most useful to the model
+    budget_lines = []
+    for b in sorted(budgets, key=_usage_ratio("spent", "limit"), reverse=True):
+        percentage = _usage_ratio("spent", "limit")(b) * 100
+        budget_lines.append(f"- {b['category']}: {from_minor(b['spent']):.2f}€ / {from_minor(b['limit']):.2f}€ ({percentage:.1f}%)\n")
+    
+    goal_lines = []
+    for g in sorted(goals, key=_usage_ratio("current_amount", "target_amount")):
+        percentage = _usage_ratio("current_amount", "target_amount")(g) * 100
+        goal_lines.append(f"- {g['name']}: {from_minor(g['current_amount']):.2f}€ / {from_minor(g['target_amount']):.2f}€ ({percentage:.1f}%)\n")
+    
+    remaining = settings.ADVICE_CONTEXT_TOKEN_BUDGET - count_tokens(header + request_section + footer)
+    # Each list gets half of what is left; whatever the budgets don't use goes to the goals
+    budget_section, used = fit_section("\nBudget:\n", budget_lines, max(remaining // 2, 0))
+    goal_section, _ = fit_section("\nObiettivi:\n", goal_lines, max(remaining - used, 0))
+    
+    return header + budget_section + goal_section + request_section + footer
+
+def _usage_ratio(current_key: str, target_key: str):
+    def ratio(doc: dict) -> float:
+        target = minor(doc[target_key])
+        return minor(doc[current_key]) / target if target > 0 else 0
+    return ratio
+
+# Token counts are estimated until the tiktoken encoding is loaded. Loading
+# may download the BPE file (unless it is in TIKTOKEN_CACHE_DIR), so it never
+# happens on the event loop; a failed load is retried after a pause.
+ENCODING_RETRY_SECONDS = 300
+_encoding = None
+_encoding_retry_at = 0.0
+
+def _load_encoding():
+    global _encoding, _encoding_retry_at
+    if _encoding is not None or tiktoken is None:
+        return
+    _encoding_retry_at = time.monotonic() + ENCODING_RETRY_SECONDS
+    try:
+        _encoding = tiktoken.encoding_for_model(settings.OPENAI_MODEL)
+    except Exception as e:
+        logger.warning(f"tiktoken encoding unavailable, estimating token counts: {str(e)}")
+
+async def load_encoding():
+    """Load the tiktoken encoding in a worker thread; called at startup."""
+    await asyncio.get_running_loop().run_in_executor(None, _load_encoding)
+
+def _get_encoding():
+    global _encoding_retry_at
+    if _encoding is None and tiktoken is not None and time.monotonic() >= _encoding_retry_at:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            _load_encoding()  # no event loop to block
+        else:
+            _encoding_retry_at = time.monotonic() + ENCODING_RETRY_SECONDS
+            loop.run_in_executor(None, _load_encoding)
+    return _encoding
+
+def count_tokens(text: str) -> int:
+    encoding = _get_encoding()
+    if encoding is None:
+        return len(text) // 4 + 1
+    return len(encoding.encode(text))
+
+def truncate_tokens(text: str, limit: int) -> str:
+    encoding = _get_encoding()
+    if encoding is None:
+        return text[:limit * 4]
+    tokens = encoding.encode(text)
+    if len(tokens) <= limit:
+        return text
+    return encoding.decode(tokens[:limit])
+
+def fit_section(title: str, lines: list, budget: int):
+    """Return ``(text, tokens_used)`` for as many ranked lines as fit in ``budget``."""
+    if not lines:
+        return "", 0
+    used = count_tokens(title)
+    if used >= budget:
+        return "", 0
+    kept = []
+    for line in lines:
+        cost = count_tokens(line)
+        if used + cost > budget:
+            break
+        kept.append(line)
+        used += cost
+    if not kept:
+        return "", 0
+    omitted = len(lines) - len(kept)
+    text = title + "".join(kept)
+    if omitted:
+        # The marker is small; it may overshoot the budget by a few tokens
+        marker = f"- ... e altri {omitted}\n"
+        text += marker
+        used += count_tokens(marker)
+    return text, used
+
+@query_pattern("advice_cache", equality=["user_id"])
+async def get_precomputed_advice(user_id: str):
+    """Return advice pre-generated by the nightly job if it is still fresh."""
+    cutoff = datetime.now(timezone.utc) - timedelta(hours=settings.ADVICE_PRECOMPUTED_MAX_AGE_HOURS)
+    cached = await db.db.advice_cache.find_one(
+        {"user_id": user_id, "generated_at": {"$gte": cutoff}}, max_time_ms=time_limit_ms()
+    )
+    advice_cache_requests.inc("hit" if cached else "miss")
+    return cached["advice"] if cached else None
+
+def build_messages(context: str) -> list:
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": context}
+    ]
+
+async def generate_advice(context: str) -> str:
+    """Run a single completion for an already-built context.
+
+    Raises LLMNotConfigured when no provider is set up and LLMUnavailable when
+    every provider failed, so callers can decide between a fallback message
+    and a retry.
+    """
+    return await get_llm().complete(build_messages(context), max_tokens=500, temperature=0.7)
+
+def stream_advice(context: str):
+    """Yield completion tokens as they arrive from the first healthy provider."""
+    return get_llm().stream(build_messages(context), max_tokens=500, temperature=0.7)
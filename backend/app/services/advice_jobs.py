@@ -0,0 +1,191 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from bson import ObjectId
+from pymongo import ReturnDocument
+from ..models.advice import AdviceRequest
+from ..core.database import db
+from ..core.deadline import time_limit_ms
+from ..core.indexes import query_pattern
+from ..core.config import settings
+from .advice import build_context, generate_advice, NOT_CONFIGURED_MESSAGE, ERROR_MESSAGE
+from .llm import LLMNotConfigured
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+class AdviceJobQueue:
+    """Mongo-backed advice job queue drained by in-process asyncio workers.
+
+    Jobs live in the ``advice_jobs`` collection. A worker claims a job atomically
+    with ``find_one_and_update`` and holds a lease on it; a job whose lease runs
+    out (e.g. the process died mid-call) becomes claimable again.
+    """
+
+    def __init__(self):
+        self._workers = []
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+
+    @property
+    def collection(self):
+        return db.db.advice_jobs
+
+    async def enqueue(self, user_id: str, request: AdviceRequest) -> str:
+        now = datetime.now(timezone.utc)
+        job = {
+            "user_id": user_id,
+            "context": request.context,
+            "status": PENDING,
+            "attempts": 0,
+            "advice": None,
+            "error": None,
+            "available_at": now,
+            "lease_expires_at": None,
+            "created_at": now,
+            "updated_at": now,
+        }
+        result = await self.collection.insert_one(job)
+        self._wakeup.set()
+        return str(result.inserted_id)
+
+    async def get(self, job_id: str, user_id: str) -> Optional[dict]:
+        return await self.collection.find_one(
+            {"_id": ObjectId(job_id), "user_id": user_id}, max_time_ms=time_limit_ms()
+        )
+
+    def start(self):
+        self._stopping = False
+        for n in range(settings.ADVICE_JOB_WORKERS):
+            self._workers.append(asyncio.create_task(self._worker(n)))
+        logger.info(f"Started {len(self._workers)} advice job workers")
+
+    async def stop(self):
+        self._stopping = True
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    @query_pattern("advice_jobs", equality=["status"], sort=["lease_expires_at"])
+    @query_pattern("advice_jobs", equality=["status"], sort=["available_at"])
+    async def _claim(self) -> Optional[dict]:
+        # Abandoned jobs first, then pending ones, oldest first; one query
+        # each, so the sort comes straight from the index
+        now = datetime.now(timezone.utc)
+        claim = {
+            "$set": {
+                "status": RUNNING,
+                "lease_expires_at": now + timedelta(seconds=settings.ADVICE_JOB_LEASE_SECONDS),
+                "updated_at": now,
+            },
+            "$inc": {"attempts": 1},
+        }
+        # An abandoned job that has used up its attempts (e.g. it keeps
+        # crashing the worker) is failed rather than claimed again
+        await self.collection.update_many(
+            {
+                "status": RUNNING,
+                "lease_expires_at": {"$lt": now},
+                "attempts": {"$gte": settings.ADVICE_JOB_MAX_ATTEMPTS},
+            },
+            {"$set": {
+                "status": FAILED,
+                "advice": ERROR_MESSAGE,
+                "error": "lease expired after the last attempt",
+                "lease_expires_at": None,
+                "updated_at": now,
+            }}
+        )
+        job = await self.collection.find_one_and_update(
+            {
+                "status": RUNNING,
+                "lease_expires_at": {"$lt": now},
+                "attempts": {"$lt": settings.ADVICE_JOB_MAX_ATTEMPTS},
+            },
+            claim,
+            sort=[("lease_expires_at", 1)],
+            return_document=ReturnDocument.AFTER,
+        )
+        if job is not None:
+            return job
+        return await self.collection.find_one_and_update(
+            {"status": PENDING, "available_at": {"$lte": now}},
+            claim,
+            sort=[("available_at", 1)],
+            return_document=ReturnDocument.AFTER,
+        )
+
+    async def _finish(self, job_id, status: str, advice: str, error: Optional[str] = None):
+        await self.collection.update_one(
+            {"_id": job_id},
+            {"$set": {
+                "status": status,
+                "advice": advice,
+                "error": error,
+                "lease_expires_at": None,
+                "updated_at": datetime.now(timezone.utc),
+            }}
+        )
+
+    async def _run(self, job: dict):
+        try:
+            context = await build_context(job["user_id"], AdviceRequest(context=job.get("context")))
+            advice_text = await generate_advice(context)
+        except LLMNotConfigured:
+            await self._finish(job["_id"], DONE, NOT_CONFIGURED_MESSAGE)
+        except Exception as e:
+            logger.error(f"Advice job {job['_id']} attempt {job['attempts']} failed: {str(e)}")
+            if job["attempts"] >= settings.ADVICE_JOB_MAX_ATTEMPTS:
+                await self._finish(job["_id"], FAILED, ERROR_MESSAGE, error=str(e))
+                return
+            # Linear backoff before the job becomes claimable again
+            now = datetime.now(timezone.utc)
+            delay = settings.ADVICE_JOB_RETRY_DELAY_SECONDS * job["attempts"]
+            await self.collection.update_one(
+                {"_id": job["_id"]},
+                {"$set": {
+                    "status": PENDING,
+                    "error": str(e),
+                    "available_at": now + timedelta(seconds=delay),
+                    "lease_expires_at": None,
+                    "updated_at": now,
+                }}
+            )
+        else:
+            await self._finish(job["_id"], DONE, advice_text)
+
+    async def _worker(self, n: int):
+        while not self._stopping:
+            try:
+                job = await self._claim()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Advice worker {n} could not claim a job: {str(e)}")
+                job = None
+
+            if job is not None:
+                try:
+                    await self._run(job)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    # e.g. the final update failed; the job's lease expires and it is claimed again
+                    logger.error(f"Advice worker {n} failed on job {job['_id']}: {str(e)}")
+                continue
+
+            # Queue empty: sleep until a new job is enqueued locally or the poll
+            # interval elapses (picks up retries and jobs enqueued by other nodes)
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=settings.ADVICE_JOB_POLL_INTERVAL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+
+advice_jobs = AdviceJobQueue()
@@ -0,0 +1,336 @@
+import asyncio
+import hashlib
+import inspect
+import logging
+import time
+from typing import AsyncIterator, List, Optional
+from openai import AsyncOpenAI
+from ..core.config import settings
+from ..core.metrics import llm_request_duration
+
+logger = logging.getLogger(__name__)
+
+class LLMUnavailable(Exception):
+    """No provider could serve the request (all failed, timed out or tripped)."""
+
+class LLMNotConfigured(LLMUnavailable):
+    """No provider is configured at all."""
+
+class CircuitBreaker:
+    """Consecutive-failure breaker: open after ``failure_threshold`` errors,
+    let one probe through after ``reset_seconds``, close again on success."""
+
+    def __init__(self, failure_threshold: int, reset_seconds: float):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_seconds:
+            return "half-open"
+        return "open"
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half-open" and not self._probing:
+            self._probing = True
+            return True
+        return False
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self._probing = False
+
+    def release_probe(self):
+        """Give up a half-open probe that ended with no outcome (cancelled, abandoned)."""
+        self._probing = False
+
+    def record_failure(self):
+        self.failures += 1
+        self._probing = False
+        if self.opened_at is not None or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+
+class LLMProvider:
+    name = "base"
+
+    def __init__(self, timeout: float):
+        self.timeout = timeout
+        self.breaker = CircuitBreaker(settings.LLM_BREAKER_FAILURE_THRESHOLD, settings.LLM_BREAKER_RESET_SECONDS)
+
+    async def complete(self, messages: list, max_tokens: int, temperature: float) -> str:
+        raise NotImplementedError
+
+    def stream(self, messages: list, max_tokens: int, temperature: float) -> AsyncIterator[str]:
+        raise NotImplementedError
+
+    async def close(self):
+        pass
+
+class OpenAIProvider(LLMProvider):
+    name = "openai"
+
+    def __init__(self, api_key: str, model: str, timeout: float):
+        super().__init__(timeout)
+        self.model = model
+        # One client per process so HTTP connections are pooled across requests
+        self.client = AsyncOpenAI(api_key=api_key, timeout=timeout, max_retries=0)
+
+    async def complete(self, messages, max_tokens, temperature):
+        response = await self.client.chat.completions.create(
+            model=self.model,
+            messages=messages,
+            max_tokens=max_tokens,
+            temperature=temperature
+        )
+        return response.choices[0].message.content
+
+    async def stream(self, messages, max_tokens, temperature):
+        stream = await self.client.chat.completions.create(
+            model=self.model,
+            messages=messages,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            stream=True
+        )
+        try:
+            async for chunk in stream:
+                if not chunk.choices:
+                    continue
+                token = chunk.choices[0].delta.content
+                if token:
+                    yield token
+        finally:
+            # Also runs when the consumer is cancelled (client disconnect)
+            await stream.close()
+
+    async def close(self):
+        await self.client.close()
+
+class LiteLLMProvider(LLMProvider):
+    name = "litellm"
+
+    def __init__(self, model: str, api_key: Optional[str], timeout: float):
+        super().__init__(timeout)
+        import litellm  # heavy import, only paid when the provider is enabled
+        self._litellm = litellm
+        self.model = model
+        self.api_key = api_key
+
+    async def complete(self, messages, max_tokens, temperature):
+        response = await self._litellm.acompletion(
+            model=self.model,
+            messages=messages,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            api_key=self.api_key,
+            timeout=self.timeout
+        )
+        return response.choices[0].message.content
+
+    async def stream(self, messages, max_tokens, temperature):
+        response = await self._litellm.acompletion(
+            model=self.model,
+            messages=messages,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            api_key=self.api_key,
+            timeout=self.timeout,
+            stream=True
+        )
+        try:
+            async for chunk in response:
+                token = chunk.choices[0].delta.content if chunk.choices else None
+                if token:
+                    yield token
+        finally:
+            # Also runs when the consumer is cancelled (client disconnect); the
+            # stream wrapper's close method differs across litellm versions
+            close = getattr(response, "aclose", None) or getattr(response, "close", None)
+            if close is not None:
+                result = close()
+                if inspect.isawaitable(result):
+                    await result
+
+class StubProvider(LLMProvider):
+    """Deterministic offline provider for load tests and benchmarks.
+
+    The answer depends only on the prompt, so repeated runs are comparable.
+    ``latency`` simulates provider time-to-first-token.
+    """
+    name = "stub"
+
+    TIPS = [
+        "Imposta un trasferimento automatico del 10% delle entrate verso il risparmio.",
+        "Rivedi gli abbonamenti mensili e cancella quelli che non usi.",
+        "Costruisci un fondo emergenza pari ad almeno tre mesi di spese.",
+        "Confronta le spese alimentari con il budget ogni settimana.",
+        "Dai priorità all'obiettivo con la scadenza più vicina.",
+        "Riduci le spese di intrattenimento del 15% per i prossimi due mesi.",
+    ]
+
+    def __init__(self, latency: float, timeout: float):
+        super().__init__(timeout)
+        self.latency = latency
+
+    def _answer(self, messages: list) -> str:
+        digest = hashlib.sha256(messages[-1]["content"].encode("utf-8")).digest()
+        picks = [self.TIPS[b % len(self.TIPS)] for b in digest[:3]]
+        return "\n".join(f"{i}. {tip}" for i, tip in enumerate(picks, 1))
+
+    async def complete(self, messages, max_tokens, temperature):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return self._answer(messages)
+
+    async def stream(self, messages, max_tokens, temperature):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        for word in self._answer(messages).split(" "):
+            yield word + " "
+
+def _outcome(error: Exception) -> str:
+    return "timeout" if isinstance(error, asyncio.TimeoutError) else "error"
+
+class ProviderChain:
+    """Try providers in order, skipping any whose breaker is open.
+
+    Each attempt is bounded by the provider's own timeout, so a slow provider
+    costs at most that long before the next one is tried.
+    """
+
+    def __init__(self, providers: List[LLMProvider]):
+        self.providers = providers
+
+    async def complete(self, messages: list, max_tokens: int = 500, temperature: float = 0.7) -> str:
+        if not self.providers:
+            raise LLMNotConfigured()
+        for provider in self.providers:
+            # A half-open breaker lets exactly one call through; it must be
+            # released however that call ends
+            probe = provider.breaker.state == "half-open"
+            if not provider.breaker.allow():
+                continue
+            started = time.perf_counter()
+            settled = False
+            try:
+                try:
+                    result = await asyncio.wait_for(
+                        provider.complete(messages, max_tokens, temperature), timeout=provider.timeout
+                    )
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    llm_request_duration.observe(time.perf_counter() - started, provider.name, "complete", _outcome(e))
+                    provider.breaker.record_failure()
+                    settled = True
+                    logger.warning(f"LLM provider {provider.name} failed: {type(e).__name__}: {str(e)}")
+                    continue
+                llm_request_duration.observe(time.perf_counter() - started, provider.name, "complete", "ok")
+                provider.breaker.record_success()
+                settled = True
+                return result
+            finally:
+                if probe and not settled:
+                    provider.breaker.release_probe()
+        raise LLMUnavailable("All LLM providers failed or are unavailable")
+
+    async def stream(self, messages: list, max_tokens: int = 500, temperature: float = 0.7) -> AsyncIterator[str]:
+        # Fallback is only possible until the first token has been sent; after
+        # that the provider timeout bounds the wait for each further token
+        if not self.providers:
+            raise LLMNotConfigured()
+        for provider in self.providers:
+            probe = provider.breaker.state == "half-open"
+            if not provider.breaker.allow():
+                continue
+            settled = False
+            try:
+                tokens = provider.stream(messages, max_tokens, temperature)
+                started = time.perf_counter()
+                try:
+                    first = await asyncio.wait_for(tokens.__anext__(), timeout=provider.timeout)
+                except StopAsyncIteration:
+                    llm_request_duration.observe(time.perf_counter() - started, provider.name, "stream", "ok")
+                    provider.breaker.record_success()
+                    settled = True
+                    return
+                except asyncio.CancelledError:
+                    await tokens.aclose()
+                    raise
+                except Exception as e:
+                    await tokens.aclose()
+                    llm_request_duration.observe(time.perf_counter() - started, provider.name, "stream", _outcome(e))
+                    provider.breaker.record_failure()
+                    settled = True
+                    logger.warning(f"LLM provider {provider.name} failed: {type(e).__name__}: {str(e)}")
+                    continue
+                try:
+                    yield first
+                    # Idle timeout: a provider that stalls mid-answer must not
+                    # hold the connection open forever
+                    while True:
+                        try:
+                            token = await asyncio.wait_for(tokens.__anext__(), timeout=provider.timeout)
+                        except StopAsyncIteration:
+                            break
+                        yield token
+                except Exception as e:
+                    llm_request_duration.observe(time.perf_counter() - started, provider.name, "stream", _outcome(e))
+                    provider.breaker.record_failure()
+                    settled = True
+                    raise
+                finally:
+                    await tokens.aclose()
+                llm_request_duration.observe(time.perf_counter() - started, provider.name, "stream", "ok")
+                provider.breaker.record_success()
+                settled = True
+                return
+            finally:
+                # Cancelled, or the consumer closed the stream mid-way (GeneratorExit)
+                if probe and not settled:
+                    provider.breaker.release_probe()
+        raise LLMUnavailable("All LLM providers failed or are unavailable")
+
+    async def close(self):
+        for provider in self.providers:
+            await provider.close()
+
+def build_provider(name: str) -> Optional[LLMProvider]:
+    if name == "openai":
+        api_key = settings.OPENAI_API_KEY or settings.EMERGENT_LLM_KEY
+        if not api_key:
+            return None
+        return OpenAIProvider(api_key, settings.OPENAI_MODEL, settings.OPENAI_TIMEOUT_SECONDS)
+    if name == "litellm":
+        return LiteLLMProvider(
+            settings.LITELLM_MODEL,
+            settings.OPENAI_API_KEY or settings.EMERGENT_LLM_KEY,
+            settings.LITELLM_TIMEOUT_SECONDS
+        )
+    if name == "stub":
+        return StubProvider(settings.STUB_LLM_LATENCY_MS / 1000, settings.STUB_LLM_TIMEOUT_SECONDS)
+    raise ValueError(f"Unknown LLM provider: {name}")
+
+_chain: Optional[ProviderChain] = None
+
+def get_llm() -> ProviderChain:
+    global _chain
+    if _chain is None:
+        names = [n.strip() for n in settings.LLM_PROVIDERS.split(",") if n.strip()]
+        _chain = ProviderChain([p for p in map(build_provider, names) if p is not None])
+    return _chain
+
+async def close_llm():
+    global _chain
+    if _chain is not None:
+        await _chain.close()
+        _chain = None
@@ -0,0 +1,44 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from ..repositories.archive import transaction_archive_repo
+from ..repositories.transactions import transaction_repo
+from ..core.money import from_minor
+
+async def compute_stats(user_id: str, include_archived: bool = True) -> dict:
+    """Totals for GET /stats and the dashboard, read with the stats read preference."""
+    # Sums are computed in cents by the database; convert only the results
+    thirty_days_ago = datetime.now(timezone.utc) - timedelta(days=30)
+    if include_archived:
+        # Archived months come from their precomputed summaries, not the archive itself
+        live, archived = await asyncio.gather(
+            transaction_repo.totals(user_id, thirty_days_ago, route="stats"),
+            transaction_archive_repo.summary_totals(user_id, route="stats"),
+        )
+        rows = live + archived
+    else:
+        rows = await transaction_repo.totals(user_id, thirty_days_ago, route="stats")
+    
+    totals = {"income": 0, "expense": 0}
+    recent = {"income": 0, "expense": 0}
+    category_expenses = {}
+    transaction_count = 0
+    for row in rows:
+        kind = row["_id"]["type"]
+        transaction_count += row["count"]
+        if kind not in totals:
+            continue
+        totals[kind] += row["total"]
+        recent[kind] += row["recent"]
+        if kind == "expense":
+            category = row["_id"]["category"]
+            category_expenses[category] = category_expenses.get(category, 0) + row["total"]
+    
+    return {
+        "total_income": from_minor(totals["income"]),
+        "total_expenses": from_minor(totals["expense"]),
+        "balance": from_minor(totals["income"] - totals["expense"]),
+        "category_expenses": {category: from_minor(total) for category, total in category_expenses.items()},
+        "recent_income": from_minor(recent["income"]),
+        "recent_expenses": from_minor(recent["expense"]),
+        "transaction_count": transaction_count
+    }
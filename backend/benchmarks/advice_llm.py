@@ -0,0 +1,66 @@
+"""Offline benchmark of the advice LLM path.
+
+Runs the provider chain against the deterministic stub, once healthy and once
+behind a provider that always times out, to show the cost of fallback before
+and after the circuit breaker opens.
+
+    cd backend && MONGO_URL=mongodb://unused JWT_SECRET=x python -m benchmarks.advice_llm
+"""
+import argparse
+import asyncio
+import logging
+import statistics
+import time
+from app.services.llm import ProviderChain, StubProvider, LLMProvider
+from app.services.advice import build_messages
+
+class HangingProvider(LLMProvider):
+    name = "hanging"
+
+    async def complete(self, messages, max_tokens, temperature):
+        await asyncio.sleep(3600)
+
+async def run(chain: ProviderChain, requests: int, concurrency: int):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    messages = build_messages("Entrate totali: €2500.00\nSpese totali: €1800.00")
+
+    async def one():
+        async with semaphore:
+            start = time.perf_counter()
+            await chain.complete(messages)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(requests)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "rps": requests / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+    }
+
+def report(label, result):
+    print(f"{label:<28} {result['rps']:>10.0f} req/s  p50 {result['p50_ms']:>8.2f} ms  p99 {result['p99_ms']:>8.2f} ms")
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--latency-ms", type=float, default=20)
+    args = parser.parse_args()
+    logging.getLogger("app.services.llm").setLevel(logging.ERROR)
+
+    stub = StubProvider(latency=args.latency_ms / 1000, timeout=5)
+    report("stub", await run(ProviderChain([stub]), args.requests, args.concurrency))
+
+    # Every request pays the primary's timeout until its breaker opens,
+    # after which the primary is skipped without being awaited
+    hanging = HangingProvider(timeout=0.2)
+    chain = ProviderChain([hanging, StubProvider(latency=args.latency_ms / 1000, timeout=5)])
+    report("hanging primary + stub", await run(chain, args.requests, args.concurrency))
+    print(f"primary breaker state: {hanging.breaker.state}")
+
+if __name__ == "__main__":
+    asyncio.run(main())
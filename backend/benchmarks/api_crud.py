@@ -0,0 +1,65 @@
+"""End-to-end request latency of the CRUD routers, with no outside services.
+
+Drives the ASGI app in-process (httpx ASGITransport) on the in-memory
+database engine and the stub LLM provider, so it measures framework,
+validation, auth and serialization cost rather than network or MongoDB.
+
+    cd backend && DATABASE_BACKEND=memory LLM_PROVIDERS=stub JWT_SECRET=x python -m benchmarks.api_crud
+"""
+import argparse
+import asyncio
+import statistics
+import time
+import httpx
+from app.core.config import settings
+from app.main import app
+
+async def timed(client, method, url, repeat, **kwargs):
+    latencies = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        response = await client.request(method, url, **kwargs)
+        latencies.append(time.perf_counter() - start)
+        response.raise_for_status()
+    latencies.sort()
+    return statistics.median(latencies) * 1000, latencies[int(len(latencies) * 0.99) - 1] * 1000
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--transactions", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+    assert settings.DATABASE_BACKEND == "memory", "run with DATABASE_BACKEND=memory"
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench/api") as client:
+            response = await client.post("/auth/register", json={
+                "email": "bench@example.com", "password": "password123", "name": "Bench"
+            })
+            headers = {"Authorization": f"Bearer {response.json()['token']}"}
+            await client.post("/budgets", json={"category": "Alimentari", "limit": 500, "period": "monthly"}, headers=headers)
+            await client.post("/goals", json={"name": "Vacanza", "target_amount": 2000, "deadline": "2030-01-01T00:00:00Z"}, headers=headers)
+            for i in range(args.transactions):
+                await client.post("/transactions", json={
+                    "type": "expense" if i % 3 else "income", "amount": 12.5 + i % 50,
+                    "category": "Alimentari", "date": "2024-01-15T10:30:00Z"
+                }, headers=headers)
+
+            print(f"{args.transactions} transactions, {args.repeat} requests per route")
+            for method, url, kwargs in [
+                ("GET", "/transactions", {}),
+                ("GET", "/budgets", {}),
+                ("GET", "/goals", {}),
+                ("GET", "/stats", {}),
+                ("GET", "/dashboard", {}),
+                ("POST", "/batch", {"json": {"requests": [
+                    {"id": "b", "method": "GET", "path": "/budgets"}, {"id": "g", "method": "GET", "path": "/goals"},
+                ]}}),
+                ("POST", "/advice", {"json": {"context": "Come posso risparmiare?"}}),
+            ]:
+                p50, p99 = await timed(client, method, url, args.repeat, headers=headers, **kwargs)
+                print(f"{method:<5}{url:<16} p50 {p50:>8.2f} ms  p99 {p99:>8.2f} ms")
+
+if __name__ == "__main__":
+    asyncio.run(main())
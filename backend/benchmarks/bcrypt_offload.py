@@ -0,0 +1,54 @@
+"""Event-loop impact of password hashing.
+
+Runs a burst of logins (bcrypt verifications) next to a fast "other route"
+coroutine and reports that coroutine's latency, first with bcrypt inline on
+the loop (the old behaviour) and then through the dedicated executor.
+
+    cd backend && MONGO_URL=mongodb://unused JWT_SECRET=x python -m benchmarks.bcrypt_offload
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from app.core import security
+
+async def other_route(latencies: list, stop: asyncio.Event):
+    # Stand-in for a cheap request: ask for the loop every millisecond
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(0.001)
+        latencies.append(time.perf_counter() - start - 0.001)
+
+async def inline_verify(password, hashed):
+    return security._verify_password_sync(password, hashed)
+
+async def scenario(verify, logins: int, hashed: str):
+    latencies, stop = [], asyncio.Event()
+    probe = asyncio.create_task(other_route(latencies, stop))
+    start = time.perf_counter()
+    await asyncio.gather(*(verify("password123", hashed) for _ in range(logins)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await probe
+    latencies.sort()
+    return elapsed, latencies
+
+def report(label, elapsed, latencies):
+    p99 = latencies[int(len(latencies) * 0.99) - 1] if latencies else 0
+    worst = latencies[-1] if latencies else 0
+    print(f"{label:<10} burst {elapsed * 1000:>8.0f} ms  other-route samples {len(latencies):>5}  "
+          f"p50 {statistics.median(latencies) * 1000 if latencies else 0:>7.2f} ms  "
+          f"p99 {p99 * 1000:>7.2f} ms  max {worst * 1000:>7.2f} ms")
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--logins", type=int, default=32)
+    args = parser.parse_args()
+
+    hashed = security._hash_password_sync("password123")
+    report("inline", *await scenario(inline_verify, args.logins, hashed))
+    report("executor", *await scenario(security.verify_password, args.logins, hashed))
+    security.shutdown_hash_executor()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,42 @@
+"""JWT verification throughput per signing algorithm.
+
+Signs one access-token-shaped payload with HS256, EdDSA and RS256 and times
+``jwt.decode`` on it. This is the cost of a verified-token cache miss.
+
+    cd backend && MONGO_URL=mongodb://unused python -m benchmarks.jwt_algorithms
+"""
+import argparse
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+import jwt
+from cryptography.hazmat.primitives.asymmetric import ed25519, rsa
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=20_000)
+    args = parser.parse_args()
+
+    payload = {
+        "user_id": "507f1f77bcf86cd799439011",
+        "jti": uuid.uuid4().hex,
+        "exp": datetime.now(timezone.utc) + timedelta(minutes=15),
+    }
+    ed_key = ed25519.Ed25519PrivateKey.generate()
+    rsa_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    cases = [
+        ("HS256", "x" * 32, "x" * 32),
+        ("EdDSA", ed_key, ed_key.public_key()),
+        ("RS256", rsa_key, rsa_key.public_key()),
+    ]
+    for algorithm, signing_key, verification_key in cases:
+        token = jwt.encode(payload, signing_key, algorithm=algorithm, headers={"kid": "bench"})
+        start = time.perf_counter()
+        for _ in range(args.iterations):
+            jwt.decode(token, verification_key, algorithms=[algorithm])
+        elapsed = time.perf_counter() - start
+        print(f"{algorithm:<6} {args.iterations / elapsed:>10.0f} verifications/s  "
+              f"{elapsed / args.iterations * 1_000_000:>7.1f} us each  token {len(token)} bytes")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""Serialization cost of a list endpoint, from stored documents to bytes.
+
+Compares the previous path of GET /api/transactions (a model per document,
+then FastAPI's response_model validation and the stdlib JSON encoder)
+with ``Transaction.from_documents`` + ``ModelListResponse``, and checks
+that both produce the same bytes.
+
+    cd backend && JWT_SECRET=x python -m benchmarks.list_serialization
+"""
+import argparse
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+from bson import Int64, ObjectId
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from app.core.responses import ModelListResponse
+from app.main import app
+from app.models.transaction import Transaction
+
+def documents(count: int) -> list:
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    return [{
+        "_id": ObjectId(), "user_id": "6650f1c2a1b2c3d4e5f60718",
+        "type": "expense" if i % 3 else "income", "amount": Int64(1250 + i % 5000),
+        "currency": "EUR", "category": "Alimentari", "description": "Spesa settimanale" if i % 2 else None,
+        "date": start + timedelta(hours=i), "created_at": start + timedelta(hours=i, minutes=5),
+    } for i in range(count)]
+
+async def previous(field, docs: list) -> bytes:
+    content = await serialize_response(field=field, response_content=[Transaction.from_document(d) for d in docs])
+    return JSONResponse(content).body
+
+def current(docs: list) -> bytes:
+    return ModelListResponse(Transaction, Transaction.from_documents(docs)).body
+
+async def timed(call, repeat: int):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        body = await call()
+    return (time.perf_counter() - start) / repeat * 1000, body
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    route = next(r for r in app.routes if getattr(r, "path", None) == "/api/transactions" and "GET" in r.methods)
+    field = route.secure_cloned_response_field
+    for size in args.sizes:
+        docs = documents(size)
+        before_ms, before = await timed(lambda: previous(field, docs), args.repeat)
+        after_ms, after = await timed(lambda: asyncio.sleep(0, current(docs)), args.repeat)
+        assert before == after, "serialized output differs"
+        print(f"{size:>7} items  {len(after) / 1024:>8.0f} KiB  previous {before_ms:>8.1f} ms  "
+              f"current {after_ms:>8.1f} ms  ({before_ms / after_ms:.1f}x)")
+
+if __name__ == "__main__":
+    asyncio.run(main())
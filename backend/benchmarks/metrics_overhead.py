@@ -0,0 +1,57 @@
+"""Per-request cost of the Prometheus instrumentation.
+
+Drives a bare ASGI app directly, with and without ``MetricsMiddleware``,
+and times one ``CommandMetrics`` started/succeeded pair (a Mongo command).
+The target is under 50 us per request in total.
+
+    cd backend && JWT_SECRET=x python -m benchmarks.metrics_overhead
+"""
+import argparse
+import asyncio
+import time
+from types import SimpleNamespace
+from app.core.metrics import CommandMetrics, MetricsMiddleware
+
+async def endpoint(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"{}"})
+
+async def bare_app(scope, receive, send):
+    # Stand-in for the router: sets the matched endpoint like Starlette does
+    scope["endpoint"] = endpoint
+    await endpoint(scope, receive, send)
+
+async def receive():
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+async def send(message):
+    pass
+
+async def per_request_us(app, iterations: int) -> float:
+    router = SimpleNamespace(routes=[SimpleNamespace(endpoint=endpoint, path="/api/goals")])
+    start = time.perf_counter()
+    for _ in range(iterations):
+        await app({"type": "http", "method": "GET", "path": "/api/goals", "app": router}, receive, send)
+    return (time.perf_counter() - start) / iterations * 1_000_000
+
+def per_command_us(iterations: int) -> float:
+    listener = CommandMetrics()
+    started = SimpleNamespace(request_id=1, command_name="find", command={"find": "transactions"})
+    succeeded = SimpleNamespace(request_id=1, command_name="find", duration_micros=850)
+    start = time.perf_counter()
+    for _ in range(iterations):
+        listener.started(started)
+        listener.succeeded(succeeded)
+    return (time.perf_counter() - start) / iterations * 1_000_000
+
+async def main(iterations: int):
+    bare = await per_request_us(bare_app, iterations)
+    instrumented = await per_request_us(MetricsMiddleware(bare_app), iterations)
+    print(f"bare ASGI app                {bare:>8.2f} us/request")
+    print(f"with MetricsMiddleware       {instrumented:>8.2f} us/request  (+{instrumented - bare:.2f})")
+    print(f"CommandMetrics per command   {per_command_us(iterations):>8.2f} us")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=100_000)
+    asyncio.run(main(parser.parse_args().iterations))
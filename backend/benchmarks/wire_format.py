@@ -0,0 +1,51 @@
+"""Payload size and encode time of a transaction page per wire format.
+
+Starts from the JSON a list endpoint produces (ModelListResponse) and adds
+what the response middlewares do on top: MessagePack re-encoding for
+``Accept: application/msgpack`` and gzip/brotli at the configured levels.
+Formats whose package is not installed are skipped.
+
+    cd backend && JWT_SECRET=x python -m benchmarks.wire_format
+"""
+import argparse
+import time
+import orjson
+from app.core.config import settings
+from app.core.encoding import _Brotli, _Gzip, brotli, msgpack
+from app.core.responses import ModelListResponse
+from app.models.transaction import Transaction
+from benchmarks.list_serialization import documents
+
+def timed(call, repeat: int):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = call()
+    return (time.perf_counter() - start) / repeat * 1000, result
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, nargs="+", default=[50, 200, 1000])
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    gzip = lambda body: _Gzip(settings.COMPRESSION_GZIP_LEVEL).last(body)
+    br = lambda body: _Brotli(settings.COMPRESSION_BROTLI_QUALITY).last(body)
+    pack = lambda body: msgpack.packb(orjson.loads(body))
+    formats = [("json", lambda body: body), ("json+gzip", gzip)]
+    if brotli is not None:
+        formats.append(("json+br", br))
+    if msgpack is not None:
+        formats += [("msgpack", pack), ("msgpack+gzip", lambda body: gzip(pack(body)))]
+        if brotli is not None:
+            formats.append(("msgpack+br", lambda body: br(pack(body))))
+
+    for page in args.pages:
+        models = Transaction.from_documents(documents(page))
+        json_ms, body = timed(lambda: ModelListResponse(Transaction, models).body, args.repeat)
+        print(f"{page} transactions (JSON encode {json_ms:.2f} ms)")
+        for name, encode in formats:
+            encode_ms, wire = timed(lambda: encode(body), args.repeat)
+            print(f"  {name:<13}{len(wire):>9} bytes  {len(wire) / len(body):>6.1%}  +{encode_ms:>6.2f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,9 @@
 """
 FinanceTracker Backend API Test Suite
 Tests all backend functionality including auth, transactions, budgets, goals, stats, and AI advice
+
+To run without MongoDB or an LLM key, start the backend on the in-memory engine first:
+    cd backend && DATABASE_BACKEND=memory LLM_PROVIDERS=stub JWT_SECRET=test uvicorn app.main:app
 """
 
 import requests
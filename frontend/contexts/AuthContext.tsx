@@ -42,6 +42,7 @@ export const AuthProvider: React.FC<{ children: React.ReactNode }> = ({ children
       const userData = response.data;
       
       await AsyncStorage.setItem('token', userData.token);
+      await AsyncStorage.setItem('refreshToken', userData.refresh_token);
       await AsyncStorage.setItem('user', JSON.stringify(userData));
       setUser(userData);
     } catch (error: any) {
@@ -55,6 +56,7 @@ export const AuthProvider: React.FC<{ children: React.ReactNode }> = ({ children
       const userData = response.data;
       
       await AsyncStorage.setItem('token', userData.token);
+      await AsyncStorage.setItem('refreshToken', userData.refresh_token);
       await AsyncStorage.setItem('user', JSON.stringify(userData));
       setUser(userData);
     } catch (error: any) {
@@ -63,7 +65,14 @@ export const AuthProvider: React.FC<{ children: React.ReactNode }> = ({ children
   };
 
   const logout = async () => {
+    try {
+      const refreshToken = await AsyncStorage.getItem('refreshToken');
+      await api.post('/auth/logout', { refresh_token: refreshToken });
+    } catch (error) {
+      console.error('Error logging out:', error);
+    }
     await AsyncStorage.removeItem('token');
+    await AsyncStorage.removeItem('refreshToken');
     await AsyncStorage.removeItem('user');
     setUser(null);
   };
@@ -3,6 +3,7 @@ export interface User {
   email: string;
   name: string;
   token: string;
+  refresh_token: string;
 }
 
 export interface Transaction {
@@ -25,4 +25,42 @@ api.interceptors.request.use(
   }
 );
 
-export default api;
\ No newline at end of file
+// Access tokens are short-lived: on a 401, rotate the refresh token once and retry.
+// Concurrent 401s share a single refresh call.
+let refreshPromise: Promise<string | null> | null = null;
+
+const refreshAccessToken = async (): Promise<string | null> => {
+  const refreshToken = await AsyncStorage.getItem('refreshToken');
+  if (!refreshToken) {
+    return null;
+  }
+  try {
+    const response = await axios.post(`${API_URL}/api/auth/refresh`, { refresh_token: refreshToken });
+    await AsyncStorage.setItem('token', response.data.token);
+    await AsyncStorage.setItem('refreshToken', response.data.refresh_token);
+    return response.data.token;
+  } catch (error) {
+    await AsyncStorage.multiRemove(['token', 'refreshToken', 'user']);
+    return null;
+  }
+};
+
+api.interceptors.response.use(
+  (response) => response,
+  async (error) => {
+    const original = error.config;
+    if (error.response?.status !== 401 || !original || original._retried || original.url?.startsWith('/auth/')) {
+      return Promise.reject(error);
+    }
+    original._retried = true;
+    refreshPromise = refreshPromise || refreshAccessToken().finally(() => { refreshPromise = null; });
+    const token = await refreshPromise;
+    if (!token) {
+      return Promise.reject(error);
+    }
+    original.headers.Authorization = `Bearer ${token}`;
+    return api(original);
+  }
+);
+
+export default api;
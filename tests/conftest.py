@@ -0,0 +1,89 @@
+import os
+import sys
+
+# The suite runs the app on the in-memory engine: no MongoDB, no LLM key
+os.environ["DATABASE_BACKEND"] = "memory"
+os.environ["LLM_PROVIDERS"] = "stub"
+os.environ.setdefault("JWT_SECRET", "test-secret")
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend"))
+
+import json
+import pytest
+
+def _sort_fields(spec) -> list:
+    if not spec:
+        return []
+    if isinstance(spec, str):
+        return [spec]
+    return [field for field, _ in (spec.items() if isinstance(spec, dict) else spec)]
+
+@pytest.fixture(scope="session", autouse=True)
+def undeclared_queries():
+    """Fail the run when the app sends a query no ``query_pattern`` declares.
+
+    Every filter and sort the in-memory engine sees on the app's database is
+    recorded while the suite runs and checked against the registry at the end.
+    """
+    from app.core.config import settings
+    from app.core.indexes import is_declared, query_patterns
+    from app.core.memory_db import MemoryCollection, MemoryCursor
+    from app.core.slow_queries import normalize
+    from app.jobs.check_indexes import import_app_modules
+
+    seen = {}
+
+    def record(collection, query, sort=None):
+        if collection.database is None or collection.database.name != settings.DB_NAME:
+            return
+        if query is not None and not isinstance(query, dict):
+            return  # find_one(<_id>)
+        shape = normalize(query or {})
+        fields = _sort_fields(sort)
+        seen[(collection.name, json.dumps(shape, sort_keys=True), tuple(fields))] = (query, fields)
+
+    def observe(method):
+        original = getattr(MemoryCollection, method)
+        def wrapper(self, filter=None, *args, **kwargs):
+            record(self, filter, kwargs.get("sort"))
+            return original(self, filter, *args, **kwargs)
+        return wrapper
+
+    original_find = MemoryCollection.find
+    def find(self, filter=None, *args, **kwargs):
+        cursor = original_find(self, filter, *args, **kwargs)
+        cursor._observed = (self, filter)
+        return cursor
+
+    original_results = MemoryCursor._results
+    def results(self):
+        if hasattr(self, "_observed"):
+            record(*self._observed, self._sort)
+        return original_results(self)
+
+    original_aggregate = MemoryCollection.aggregate
+    def aggregate(self, pipeline, *args, **kwargs):
+        if pipeline and "$match" in pipeline[0]:
+            following = pipeline[1] if len(pipeline) > 1 else {}
+            record(self, pipeline[0]["$match"], following.get("$sort"))
+        return original_aggregate(self, pipeline, *args, **kwargs)
+
+    with pytest.MonkeyPatch.context() as patch:
+        for method in ("find_one", "count_documents", "update_one", "update_many",
+                       "find_one_and_update", "delete_one", "delete_many"):
+            patch.setattr(MemoryCollection, method, observe(method))
+        patch.setattr(MemoryCollection, "find", find)
+        patch.setattr(MemoryCollection, "aggregate", aggregate)
+        patch.setattr(MemoryCursor, "_results", results)
+        yield seen
+
+    import_app_modules()
+    patterns = query_patterns()
+    undeclared = [
+        f"{collection}: {shape} sort={list(fields)}"
+        for (collection, shape, fields), (query, sort) in sorted(seen.items())
+        if not is_declared(collection, query, sort, patterns)
+    ]
+    if undeclared:
+        pytest.fail("Queries without a query_pattern:\n" + "\n".join(undeclared), pytrace=False)
@@ -0,0 +1,25 @@
+import pytest
+from app.services import advice
+
+class FakeEncoding:
+    def encode(self, text):
+        return text.split()
+
+@pytest.fixture
+def fresh_encoding(monkeypatch):
+    if advice.tiktoken is None:
+        pytest.skip("tiktoken is not installed")
+    monkeypatch.setattr(advice, "_encoding", None)
+    monkeypatch.setattr(advice, "_encoding_retry_at", 0.0)
+
+def test_a_failed_load_is_retried_after_the_pause(fresh_encoding, monkeypatch):
+    def offline(model):
+        raise OSError("offline")
+    monkeypatch.setattr(advice.tiktoken, "encoding_for_model", offline)
+    assert advice.count_tokens("one two three") == len("one two three") // 4 + 1
+
+    monkeypatch.setattr(advice.tiktoken, "encoding_for_model", lambda model: FakeEncoding())
+    # Still within the pause: no new attempt
+    assert advice.count_tokens("one two three") == 4
+    monkeypatch.setattr(advice, "_encoding_retry_at", 0.0)
+    assert advice.count_tokens("one two three") == 3
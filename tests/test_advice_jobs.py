@@ -0,0 +1,26 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from app.core.config import settings
+from app.core.database import db
+from app.services.advice_jobs import AdviceJobQueue, FAILED, RUNNING
+
+def test_an_abandoned_job_is_reclaimed_only_while_it_has_attempts_left():
+    async def scenario():
+        db.connect()
+        try:
+            expired = datetime.now(timezone.utc) - timedelta(minutes=5)
+            await db.db.advice_jobs.insert_many([
+                {"_id": "spent", "status": RUNNING, "attempts": settings.ADVICE_JOB_MAX_ATTEMPTS, "lease_expires_at": expired},
+                {"_id": "retry", "status": RUNNING, "attempts": 1, "lease_expires_at": expired + timedelta(seconds=1)},
+            ])
+            queue = AdviceJobQueue()
+            claimed = await queue._claim()
+            again = await queue._claim()
+            return claimed, again, await db.db.advice_jobs.find_one({"_id": "spent"})
+        finally:
+            db.close()
+
+    claimed, again, spent = asyncio.run(scenario())
+    assert claimed["_id"] == "retry" and claimed["attempts"] == 2
+    assert again is None
+    assert spent["status"] == FAILED and spent["lease_expires_at"] is None
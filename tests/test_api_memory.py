@@ -0,0 +1,251 @@
+import uuid
+from datetime import datetime, timedelta
+import pytest
+from fastapi.testclient import TestClient
+from app.core.config import settings
+from app.main import app
+
+@pytest.fixture(scope="module")
+def client():
+    with TestClient(app) as client:
+        yield client
+
+def register(client) -> dict:
+    email = f"{uuid.uuid4().hex}@example.com"
+    response = client.post("/api/auth/register", json={"email": email, "password": "SecurePass123!", "name": "Test"})
+    assert response.status_code == 200
+    return {"Authorization": f"Bearer {response.json()['token']}"}
+
+@pytest.fixture
+def auth(client):
+    return register(client)
+
+def add_transaction(client, auth, type, amount, category, days_ago=0):
+    response = client.post("/api/transactions", headers=auth, json={
+        "type": type, "amount": amount, "category": category,
+        "date": (datetime.now() - timedelta(days=days_ago)).isoformat(),
+    })
+    assert response.status_code == 200
+    return response.json()
+
+def test_login_and_duplicate_registration(client):
+    email = f"{uuid.uuid4().hex}@example.com"
+    body = {"email": email, "password": "SecurePass123!", "name": "Test"}
+    assert client.post("/api/auth/register", json=body).status_code == 200
+    assert client.post("/api/auth/register", json=body).status_code == 400
+    assert client.post("/api/auth/login", json={"email": email, "password": "wrong"}).status_code == 401
+    response = client.post("/api/auth/login", json={"email": email, "password": "SecurePass123!"})
+    assert response.status_code == 200 and response.json()["token"]
+
+def test_transactions_are_listed_newest_first_and_scoped_to_the_user(client, auth):
+    add_transaction(client, auth, "expense", 10.10, "Food", days_ago=2)
+    add_transaction(client, auth, "expense", 20.20, "Food", days_ago=1)
+    transactions = client.get("/api/transactions", headers=auth).json()
+    assert [t["amount"] for t in transactions] == [20.20, 10.10]
+
+    other = register(client)
+    assert client.get("/api/transactions", headers=other).json() == []
+    assert client.delete(f"/api/transactions/{transactions[0]['id']}", headers=other).status_code == 404
+    assert client.delete(f"/api/transactions/{transactions[0]['id']}", headers=auth).status_code == 200
+    assert len(client.get("/api/transactions", headers=auth).json()) == 1
+
+def test_expenses_add_to_the_budget_in_cents(client, auth):
+    budget = client.post("/api/budgets", headers=auth, json={"category": "Food", "limit": 100, "period": "monthly"}).json()
+    for amount in (0.1, 0.2, 12.34):
+        add_transaction(client, auth, "expense", amount, "Food")
+    add_transaction(client, auth, "expense", 50, "Rent")
+    budgets = client.get("/api/budgets", headers=auth).json()
+    assert [(b["id"], b["spent"]) for b in budgets] == [(budget["id"], 12.64)]
+
+    updated = client.put(f"/api/budgets/{budget['id']}", headers=auth, json={"category": "Food", "limit": 150, "period": "monthly"})
+    assert updated.status_code == 200 and updated.json()["limit"] == 150
+
+def test_goal_contributions(client, auth):
+    goal = client.post("/api/goals", headers=auth, json={
+        "name": "Trip", "target_amount": 500, "deadline": (datetime.now() + timedelta(days=90)).isoformat(),
+    }).json()
+    client.put(f"/api/goals/{goal['id']}/contribute", headers=auth, params={"amount": 100.05})
+    response = client.put(f"/api/goals/{goal['id']}/contribute", headers=auth, params={"amount": -0.05})
+    assert response.status_code == 200 and response.json()["current_amount"] == 100.0
+    missing = "0" * 24
+    assert client.put(f"/api/goals/{missing}/contribute", headers=auth, params={"amount": 1}).status_code == 404
+
+def test_stats_and_dashboard(client, auth):
+    add_transaction(client, auth, "income", 2000, "Salary", days_ago=1)
+    add_transaction(client, auth, "expense", 45.5, "Food")
+    add_transaction(client, auth, "expense", 4.5, "Food", days_ago=45)
+    stats = client.get("/api/stats", headers=auth).json()
+    assert stats["total_income"] == 2000
+    assert stats["total_expenses"] == 50
+    assert stats["balance"] == 1950
+    assert stats["recent_expenses"] == 45.5
+    assert stats["category_expenses"] == {"Food": 50}
+    assert stats["transaction_count"] == 3
+
+    dashboard = client.get("/api/dashboard", headers=auth, params={"recent": 2}).json()
+    assert dashboard["stats"] == stats
+    assert [t["amount"] for t in dashboard["recent_transactions"]] == [45.5, 2000]
+    assert "user_id" not in dashboard["recent_transactions"][0]
+
+def test_batch_runs_dependent_requests(client, auth):
+    response = client.post("/api/batch", headers=auth, json={"requests": [
+        {"id": "budget", "method": "POST", "path": "/budgets", "body": {"category": "Fun", "limit": 50, "period": "monthly"}},
+        {"id": "spend", "method": "POST", "path": "/transactions", "depends_on": ["budget"],
+         "body": {"type": "expense", "amount": 7.25, "category": "Fun", "date": datetime.now().isoformat()}},
+        {"id": "list", "method": "GET", "path": "/budgets", "depends_on": ["spend"]},
+        {"id": "missing", "method": "GET", "path": "/nowhere"},
+    ]})
+    assert response.status_code == 200
+    results = {r["id"]: r for r in response.json()}
+    assert results["budget"]["status"] == 200
+    assert results["list"]["body"][0]["spent"] == 7.25
+    assert results["missing"]["status"] == 404
+
+def test_metrics_need_the_admin_token(client, monkeypatch):
+    assert client.get("/metrics").status_code == 404
+    monkeypatch.setattr(settings, "ADMIN_TOKEN", "admin-secret")
+    assert client.get("/metrics").status_code == 403
+    assert client.get("/metrics", headers={"X-Admin-Token": "wrong"}).status_code == 403
+    response = client.get("/metrics", headers={"X-Admin-Token": "admin-secret"})
+    assert response.status_code == 200
+    assert "mongo_pool_checkout_wait_seconds" in response.text
+
+def client_at(address: str) -> TestClient:
+    async def from_address(scope, receive, send):
+        await app({**scope, "client": (address, 50000)}, receive, send)
+    return TestClient(from_address)  # no lifespan: the module's client already started the app
+
+def test_login_throttle_limits_failures_per_email_and_refunds_successes(client, monkeypatch):
+    monkeypatch.setattr(settings, "LOGIN_MAX_ATTEMPTS_PER_EMAIL", 2)
+    email = f"{uuid.uuid4().hex}@example.com"
+    client.post("/api/auth/register", json={"email": email, "password": "SecurePass123!", "name": "Test"})
+    first, second = client_at("192.0.2.1"), client_at("192.0.2.2")
+
+    def login(client, password):
+        return client.post("/api/auth/login", json={"email": email, "password": password}).status_code
+
+    # Successful logins give their attempt back
+    assert [login(first, "SecurePass123!") for _ in range(3)] == [200, 200, 200]
+    assert [login(first, "wrong") for _ in range(3)] == [401, 401, 429]
+    # The email stays locked from any address, even with the right password
+    assert login(second, "SecurePass123!") == 429
+
+def test_login_throttle_limits_failures_per_ip(client, monkeypatch):
+    monkeypatch.setattr(settings, "LOGIN_MAX_ATTEMPTS_PER_IP", 3)
+    attacker = client_at("192.0.2.3")
+
+    def login(client):
+        body = {"email": f"{uuid.uuid4().hex}@example.com", "password": "wrong"}
+        return client.post("/api/auth/login", json=body).status_code
+
+    assert [login(attacker) for _ in range(4)] == [401, 401, 401, 429]
+    assert login(client_at("192.0.2.4")) == 401
+
+def test_login_throttle_uses_the_forwarded_ip_behind_a_trusted_proxy(client, monkeypatch):
+    proxied = client_at("10.0.0.5")
+    monkeypatch.setattr(settings, "TRUSTED_PROXIES", ["10.0.0.0/8"])
+    monkeypatch.setattr(settings, "LOGIN_MAX_ATTEMPTS_PER_IP", 3)
+
+    def login(forwarded_for):
+        body = {"email": f"{uuid.uuid4().hex}@example.com", "password": "wrong"}
+        return proxied.post("/api/auth/login", json=body, headers={"X-Forwarded-For": forwarded_for}).status_code
+
+    assert [login("198.51.100.7, 203.0.113.1") for _ in range(4)] == [401, 401, 401, 429]
+    # Another client behind the same proxy has its own bucket; a spoofed
+    # left-most entry does not change which one is used
+    assert login("203.0.113.2") == 401
+    assert login("203.0.113.2, 203.0.113.1") == 429
+
+    # Without trusted proxies the header is ignored and the proxy is the client
+    monkeypatch.setattr(settings, "TRUSTED_PROXIES", [])
+    assert [login(f"203.0.113.{n}") for n in (10, 11, 12, 13)] == [401, 401, 401, 429]
+
+def test_access_tokens_issued_before_jti_stay_valid_until_they_expire(client, auth):
+    import jwt
+    token = auth["Authorization"].split()[1]
+    user_id = jwt.decode(token, options={"verify_signature": False})["user_id"]
+    def legacy(expires_in):
+        payload = {"user_id": user_id, "exp": datetime.utcnow() + expires_in}
+        return {"Authorization": f"Bearer {jwt.encode(payload, settings.JWT_SECRET, algorithm=settings.JWT_ALGORITHM)}"}
+
+    assert client.get("/api/transactions", headers=legacy(timedelta(days=30))).status_code == 200
+    assert client.get("/api/transactions", headers=legacy(timedelta(seconds=-1))).status_code == 401
+    assert client.post("/api/auth/logout", headers=legacy(timedelta(days=30)), json={}).status_code == 200
+
+def test_refresh_tokens_rotate_and_reuse_revokes_the_family(client):
+    body = {"email": f"{uuid.uuid4().hex}@example.com", "password": "SecurePass123!", "name": "Test"}
+    original = client.post("/api/auth/register", json=body).json()["refresh_token"]
+
+    def refresh(token):
+        return client.post("/api/auth/refresh", json={"refresh_token": token})
+
+    rotated = refresh(original).json()
+    assert rotated["token"] and rotated["refresh_token"] != original
+    # Replaying the consumed token means it leaked: the newer one dies with it
+    assert refresh(original).status_code == 401
+    assert refresh(rotated["refresh_token"]).status_code == 401
+
+def test_logout_revokes_the_access_token_and_the_refresh_family(client):
+    body = {"email": f"{uuid.uuid4().hex}@example.com", "password": "SecurePass123!", "name": "Test"}
+    session = client.post("/api/auth/register", json=body).json()
+    auth = {"Authorization": f"Bearer {session['token']}"}
+    assert client.get("/api/transactions", headers=auth).status_code == 200
+
+    assert client.post("/api/auth/logout", headers=auth, json={"refresh_token": session["refresh_token"]}).status_code == 200
+    assert client.get("/api/transactions", headers=auth).status_code == 401
+    assert client.post("/api/auth/refresh", json={"refresh_token": session["refresh_token"]}).status_code == 401
+
+def test_responses_are_negotiated_as_messagepack_and_compressed(client, auth):
+    msgpack = pytest.importorskip("msgpack")
+    for n in range(20):
+        add_transaction(client, auth, "expense", n + 0.5, "Food", days_ago=n)
+    as_json = client.get("/api/transactions", headers={**auth, "Accept-Encoding": "identity"})
+    assert "content-encoding" not in as_json.headers and len(as_json.content) > settings.COMPRESSION_MIN_SIZE
+
+    packed = client.get("/api/transactions", headers={**auth, "Accept": "application/msgpack"})
+    assert packed.headers["content-type"] == "application/msgpack"
+    assert msgpack.unpackb(packed.content) == as_json.json()
+    # JSON preferred by quality: JSON it is
+    preferred = client.get("/api/transactions", headers={**auth, "Accept": "application/msgpack;q=0.5, application/json"})
+    assert preferred.headers["content-type"] == "application/json"
+
+    gzipped = client.get("/api/transactions", headers={**auth, "Accept-Encoding": "gzip"})
+    assert gzipped.headers["content-encoding"] == "gzip" and "accept-encoding" in gzipped.headers["vary"].lower()
+    assert gzipped.json() == as_json.json()
+    # Small bodies are not worth compressing
+    small = client.get("/api/budgets", headers={**auth, "Accept-Encoding": "gzip"})
+    assert "content-encoding" not in small.headers
+
+def test_archived_transactions_still_count_through_the_monthly_summaries(client, auth):
+    from app.jobs import archive_transactions
+    old = [add_transaction(client, auth, "expense", amount, "Food", days_ago=days) for amount, days in ((30, 800), (20.25, 840))]
+    add_transaction(client, auth, "expense", 10, "Food")
+    before = client.get("/api/stats", headers=auth).json()
+
+    client.portal.call(archive_transactions.run)  # on the app's event loop and database
+    assert [t["amount"] for t in client.get("/api/transactions", headers=auth).json()] == [10]
+    archived = client.get("/api/transactions", headers=auth, params={"include_archived": True}).json()
+    assert [t["amount"] for t in archived] == [10, 30, 20.25]
+    assert client.get("/api/stats", headers=auth).json() == before
+
+    # Deleting an archived transaction rebuilds its month's summary
+    assert client.delete(f"/api/transactions/{old[0]['id']}", headers=auth).status_code == 200
+    assert client.get("/api/stats", headers=auth).json()["total_expenses"] == 30.25
+
+def test_requests_carrying_the_admin_token_are_profiled(client, auth, monkeypatch):
+    from app.core.profiling import ProfilingMiddleware
+    monkeypatch.setattr(settings, "ADMIN_TOKEN", "admin-secret")
+    profiled = TestClient(ProfilingMiddleware(app))  # no lifespan: the module's client already started the app
+    admin = {"X-Admin-Token": "admin-secret"}
+    before = len(client.get("/api/admin/profiles", headers=admin).json())
+
+    assert profiled.get("/api/stats", headers={**auth, "X-Profile": "wrong"}).status_code == 200
+    assert len(client.get("/api/admin/profiles", headers=admin).json()) == before
+    assert profiled.get("/api/stats", headers={**auth, "X-Profile": "admin-secret"}).status_code == 200
+    profiles = client.get("/api/admin/profiles", headers=admin).json()
+    assert len(profiles) == before + 1
+    assert {k: profiles[0][k] for k in ("method", "path", "status", "trigger")} == {
+        "method": "GET", "path": "/api/stats", "status": 200, "trigger": "header",
+    }
+    assert "folded" not in profiles[0]
+    assert client.get(f"/api/admin/profiles/{profiles[0]['id']}", headers=admin).status_code == 200
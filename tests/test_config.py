@@ -0,0 +1,19 @@
+import pytest
+from pydantic import ValidationError
+from app.core.config import Settings
+
+@pytest.mark.parametrize("value", [0, -0.5, 1.5])
+def test_archive_duty_cycle_must_be_a_share_of_wall_time(value):
+    with pytest.raises(ValidationError):
+        Settings(ARCHIVE_DUTY_CYCLE=value)
+
+@pytest.mark.parametrize("value", [0, -0.5, 1.5])
+def test_migration_duty_cycle_must_be_a_share_of_wall_time(value):
+    with pytest.raises(ValidationError):
+        Settings(MIGRATION_DUTY_CYCLE=value)
+
+@pytest.mark.parametrize("value", [0, 1.5])
+def test_migration_runner_rejects_an_explicit_out_of_range_duty_cycle(value):
+    from app.migrations.runner import MigrationRunner
+    with pytest.raises(ValueError):
+        MigrationRunner([], duty_cycle=value)
@@ -0,0 +1,112 @@
+import asyncio
+import time
+from app.services.llm import CircuitBreaker, LiteLLMProvider, LLMProvider, ProviderChain
+
+MESSAGES = [{"role": "user", "content": "ciao"}]
+
+class ScriptedProvider(LLMProvider):
+    def __init__(self, name, failing=False):
+        super().__init__(timeout=1)
+        self.name = name
+        self.failing = failing
+        self.breaker = CircuitBreaker(failure_threshold=2, reset_seconds=0.05)
+        self.calls = 0
+
+    async def complete(self, messages, max_tokens, temperature):
+        self.calls += 1
+        if self.failing:
+            raise RuntimeError("upstream 500")
+        return self.name
+
+class StallingProvider(LLMProvider):
+    name = "stalling"
+
+    async def stream(self, messages, max_tokens, temperature):
+        yield "first "
+        await asyncio.sleep(60)
+        yield "never"
+
+class FakeLiteLLMStream:
+    def __init__(self):
+        self.closed = False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        await asyncio.sleep(60)
+
+    async def aclose(self):
+        self.closed = True
+
+class FakeLiteLLM:
+    def __init__(self, response):
+        self.response = response
+
+    async def acompletion(self, **kwargs):
+        return self.response
+
+def test_stream_times_out_a_provider_that_stalls_after_the_first_token():
+    async def consume():
+        tokens = []
+        try:
+            async for token in ProviderChain([StallingProvider(timeout=0.05)]).stream(MESSAGES):
+                tokens.append(token)
+        except asyncio.TimeoutError:
+            return tokens
+        raise AssertionError("the stall was not timed out")
+
+    assert asyncio.run(consume()) == ["first "]
+
+def test_litellm_stream_closes_the_response_when_cancelled():
+    response = FakeLiteLLMStream()
+    provider = LiteLLMProvider.__new__(LiteLLMProvider)
+    LLMProvider.__init__(provider, timeout=1)
+    provider._litellm = FakeLiteLLM(response)
+    provider.model, provider.api_key = "test", None
+
+    async def cancel_midway():
+        task = asyncio.ensure_future(provider.stream(MESSAGES, 10, 0).__anext__())
+        await asyncio.sleep(0.01)
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    asyncio.run(cancel_midway())
+    assert response.closed
+
+def test_breaker_opens_after_consecutive_failures_and_probes_once_half_open():
+    primary, backup = ScriptedProvider("primary", failing=True), ScriptedProvider("backup")
+    chain = ProviderChain([primary, backup])
+
+    assert [asyncio.run(chain.complete(MESSAGES)) for _ in range(3)] == ["backup"] * 3
+    # Open after two failures: the third call skipped the primary
+    assert primary.calls == 2 and primary.breaker.state == "open"
+
+    time.sleep(0.06)
+    assert primary.breaker.state == "half-open"
+    # A failed probe opens the breaker again straight away
+    assert asyncio.run(chain.complete(MESSAGES)) == "backup"
+    assert primary.calls == 3 and primary.breaker.state == "open"
+
+    time.sleep(0.06)
+    primary.failing = False
+    assert primary.breaker.allow() and not primary.breaker.allow()  # one probe at a time
+    primary.breaker.release_probe()
+    assert asyncio.run(chain.complete(MESSAGES)) == "primary"
+    assert primary.breaker.state == "closed"
+
+def test_an_abandoned_half_open_stream_releases_its_probe():
+    provider = StallingProvider(timeout=1)
+    provider.breaker = CircuitBreaker(failure_threshold=1, reset_seconds=0)
+    provider.breaker.record_failure()
+
+    async def read_first_token():
+        tokens = ProviderChain([provider]).stream(MESSAGES)
+        assert await tokens.__anext__() == "first "
+        await tokens.aclose()
+
+    asyncio.run(read_first_token())
+    assert provider.breaker.allow()
@@ -0,0 +1,236 @@
+import asyncio
+from datetime import datetime, timedelta
+import pytest
+from bson import Int64
+from pymongo import IndexModel, InsertOne, ReturnDocument, UpdateOne, DeleteMany
+from pymongo.errors import DuplicateKeyError, OperationFailure
+from app.core.memory_db import MemoryClient
+from app.core.money import minor_expr
+from app.repositories.transactions import totals_pipeline
+
+def run(coro):
+    return asyncio.run(coro)
+
+def collection(docs=()):
+    c = MemoryClient()["test"]["items"]
+    for doc in docs:
+        run(c.insert_one(dict(doc)))
+    return c
+
+def find(c, query, **kwargs):
+    return run(c.find(query, **kwargs).to_list(None))
+
+def names(docs):
+    return sorted(d["name"] for d in docs)
+
+DOCS = [
+    {"name": "a", "user_id": "u1", "amount": 10, "tags": ["x", "y"], "category": "Food"},
+    {"name": "b", "user_id": "u1", "amount": 25.5, "tags": ["y"], "category": "Rent"},
+    {"name": "c", "user_id": "u2", "amount": 40, "category": None},
+    {"name": "d", "user_id": "u2", "amount": "n/a"},
+]
+
+def test_equality_and_array_membership():
+    c = collection(DOCS)
+    assert names(find(c, {"user_id": "u1"})) == ["a", "b"]
+    assert names(find(c, {"tags": "y"})) == ["a", "b"]
+    # A None equality also matches documents without the field
+    assert names(find(c, {"category": None})) == ["c", "d"]
+
+def test_comparison_operators_never_match_across_types():
+    c = collection(DOCS)
+    assert names(find(c, {"amount": {"$gt": 10}})) == ["b", "c"]
+    assert names(find(c, {"amount": {"$gte": 10, "$lt": 40}})) == ["a", "b"]
+    assert names(find(c, {"amount": {"$lte": 10}})) == ["a"]
+    assert names(find(c, {"amount": {"$ne": 10}})) == ["b", "c", "d"]
+
+def test_set_and_logical_operators():
+    c = collection(DOCS)
+    assert names(find(c, {"name": {"$in": ["a", "c", "z"]}})) == ["a", "c"]
+    assert names(find(c, {"name": {"$nin": ["a", "c"]}})) == ["b", "d"]
+    assert names(find(c, {"$or": [{"name": "a"}, {"amount": 40}]})) == ["a", "c"]
+    assert names(find(c, {"$and": [{"user_id": "u1"}, {"amount": {"$gt": 20}}]})) == ["b"]
+    assert names(find(c, {"$nor": [{"user_id": "u1"}, {"name": "d"}]})) == ["c"]
+    assert names(find(c, {"user_id": {"$in": ["u2"]}, "name": "c"})) == ["c"]
+
+def test_exists_regex_and_type():
+    c = collection(DOCS)
+    assert names(find(c, {"tags": {"$exists": True}})) == ["a", "b"]
+    assert names(find(c, {"category": {"$exists": False}})) == ["d"]
+    assert names(find(c, {"category": {"$regex": "^f", "$options": "i"}})) == ["a"]
+    assert names(find(c, {"amount": {"$type": "double"}})) == ["b"]
+    assert names(find(c, {"amount": {"$type": ["int", "string"]}})) == ["a", "c", "d"]
+
+def test_unsupported_operator_fails_loudly():
+    c = collection(DOCS)
+    with pytest.raises(OperationFailure):
+        find(c, {"amount": {"$mod": [2, 0]}})
+
+def test_cursor_sort_skip_limit_and_projection():
+    c = collection(DOCS[:3])
+    docs = run(c.find({}, {"name": 1, "_id": 0}).sort("amount", -1).skip(1).limit(1).to_list(None))
+    assert docs == [{"name": "b"}]
+    assert run(c.count_documents({"user_id": "u1"})) == 2
+
+def test_dates_come_back_naive_with_millisecond_precision():
+    c = collection()
+    run(c.insert_one({"name": "t", "date": datetime(2024, 5, 1, 12, 0, 0, 123456).astimezone()}))
+    doc = run(c.find_one({"name": "t"}))
+    assert doc["date"].tzinfo is None
+    assert doc["date"].microsecond == 123000
+
+def test_insert_one_sets_id_on_the_callers_document():
+    c = collection()
+    doc = {"name": "a"}
+    result = run(c.insert_one(doc))
+    assert doc["_id"] == result.inserted_id
+    assert run(c.find_one(result.inserted_id))["name"] == "a"
+
+def test_update_operators():
+    c = collection([{"name": "a", "count": 1, "old": True}])
+    result = run(c.update_one({"name": "a"}, {"$inc": {"count": 2}, "$set": {"nested.flag": True}, "$unset": {"old": ""}}))
+    assert (result.matched_count, result.modified_count) == (1, 1)
+    doc = run(c.find_one({"name": "a"}, {"_id": 0}))
+    assert doc == {"name": "a", "count": 3, "nested": {"flag": True}}
+    # $setOnInsert only applies when the update inserts
+    run(c.update_one({"name": "a"}, {"$setOnInsert": {"count": 100}}))
+    assert run(c.find_one({"name": "a"}))["count"] == 3
+
+def test_upsert_seeds_from_the_filter():
+    c = collection()
+    result = run(c.update_one({"key": "k", "window": 7}, {"$inc": {"count": 1}, "$setOnInsert": {"fresh": True}}, upsert=True))
+    assert result.upserted_id is not None
+    doc = run(c.find_one({"key": "k"}, {"_id": 0}))
+    assert doc == {"key": "k", "window": 7, "count": 1, "fresh": True}
+    assert run(c.update_one({"key": "other"}, {"$set": {"x": 1}})).matched_count == 0
+    assert run(c.count_documents({})) == 1
+
+def test_upsert_onto_an_existing_id_is_a_duplicate_key():
+    c = collection([{"_id": "lease", "owner": "a"}])
+    with pytest.raises(DuplicateKeyError):
+        run(c.update_one({"_id": "lease", "owner": None}, {"$set": {"owner": "b"}}, upsert=True))
+    with pytest.raises(DuplicateKeyError):
+        run(c.find_one_and_update({"_id": "lease", "owner": None}, {"$set": {"owner": "b"}}, upsert=True))
+    assert run(c.find_one({"_id": "lease"}))["owner"] == "a"
+
+def test_pipeline_update_converts_legacy_floats():
+    c = collection([
+        {"user_id": "u1", "category": "Food", "spent": 12.34},
+        {"user_id": "u1", "category": "Rent", "spent": Int64(500)},
+        {"user_id": "u1", "category": "Fun"},
+    ])
+    for category in ("Food", "Rent", "Fun"):
+        run(c.update_one(
+            {"user_id": "u1", "category": category},
+            [{"$set": {"spent": {"$add": [minor_expr("spent"), Int64(100)]}}}],
+        ))
+    spent = {d["category"]: d["spent"] for d in find(c, {"user_id": "u1"})}
+    assert spent == {"Food": 1334, "Rent": 600, "Fun": 100}
+
+def test_update_many():
+    c = collection(DOCS)
+    result = run(c.update_many({"user_id": "u1"}, {"$set": {"seen": True}}))
+    assert (result.matched_count, result.modified_count) == (2, 2)
+    assert names(find(c, {"seen": True})) == ["a", "b"]
+
+def test_find_one_and_update_returns_before_or_after():
+    c = collection([{"name": "a", "count": 1}])
+    before = run(c.find_one_and_update({"name": "a"}, {"$inc": {"count": 1}}))
+    assert before["count"] == 1
+    after = run(c.find_one_and_update({"name": "a"}, {"$inc": {"count": 1}}, return_document=ReturnDocument.AFTER))
+    assert after["count"] == 3
+    assert run(c.find_one_and_update({"name": "missing"}, {"$set": {"count": 0}})) is None
+
+def test_find_one_and_update_sort_projection_and_upsert():
+    c = collection([{"state": "queued", "n": 2}, {"state": "queued", "n": 1}])
+    claimed = run(c.find_one_and_update(
+        {"state": "queued"}, {"$set": {"state": "running"}}, projection={"_id": 0},
+        sort=[("n", 1)], return_document=ReturnDocument.AFTER,
+    ))
+    assert claimed == {"state": "running", "n": 1}
+    # An upsert returns None before the insert and the new document after it
+    assert run(c.find_one_and_update({"state": "new"}, {"$set": {"n": 3}}, upsert=True)) is None
+    inserted = run(c.find_one_and_update(
+        {"state": "newer"}, {"$set": {"n": 4}}, upsert=True, return_document=ReturnDocument.AFTER,
+    ))
+    assert (inserted["state"], inserted["n"]) == ("newer", 4)
+
+def test_unique_indexes_are_enforced():
+    c = collection()
+    run(c.create_indexes([IndexModel([("email", 1)], unique=True, name="email_1")]))
+    run(c.insert_one({"email": "a@example.com"}))
+    with pytest.raises(DuplicateKeyError):
+        run(c.insert_one({"email": "a@example.com"}))
+    other = run(c.insert_one({"email": "b@example.com"})).inserted_id
+    with pytest.raises(DuplicateKeyError):
+        run(c.update_one({"_id": other}, {"$set": {"email": "a@example.com"}}))
+    # Deleting frees the key
+    run(c.delete_one({"email": "a@example.com"}))
+    run(c.update_one({"_id": other}, {"$set": {"email": "a@example.com"}}))
+    assert [i["name"] for i in run(c.list_indexes().to_list(None))] == ["_id_", "email_1"]
+
+def test_bulk_write_and_deletes():
+    c = collection(DOCS)
+    result = run(c.bulk_write([
+        InsertOne({"name": "e", "user_id": "u3"}),
+        UpdateOne({"name": "a"}, {"$set": {"amount": 11}}),
+        UpdateOne({"name": "z"}, {"$set": {"amount": 1}}, upsert=True),
+        DeleteMany({"user_id": "u2"}),
+    ]))
+    assert (result.inserted_count, result.modified_count, result.upserted_count, result.deleted_count) == (1, 1, 1, 2)
+    assert names(find(c, {})) == ["a", "b", "e", "z"]
+    assert run(c.delete_many({"user_id": "u1"})).deleted_count == 2
+    assert run(c.delete_one({"user_id": "u1"})).deleted_count == 0
+
+def test_totals_pipeline_groups_in_cents():
+    now = datetime.now()
+    c = collection([
+        {"user_id": "u1", "type": "expense", "category": "Food", "amount": Int64(1250), "date": now},
+        {"user_id": "u1", "type": "expense", "category": "Food", "amount": 7.5, "date": now - timedelta(days=60)},
+        {"user_id": "u1", "type": "income", "category": "Salary", "amount": Int64(200000), "date": now},
+        {"user_id": "u2", "type": "expense", "category": "Food", "amount": Int64(999), "date": now},
+    ])
+    rows = run(c.aggregate(totals_pipeline({"user_id": "u1"}, now - timedelta(days=30))).to_list(None))
+    totals = {(r["_id"]["type"], r["_id"]["category"]): (r["total"], r["recent"], r["count"]) for r in rows}
+    assert totals == {
+        ("expense", "Food"): (2000, 1250, 2),
+        ("income", "Salary"): (200000, 200000, 1),
+    }
+
+def test_aggregation_stages_and_accumulators():
+    c = collection(DOCS[:3])
+    rows = run(c.aggregate([
+        {"$match": {"amount": {"$type": "number"}}},
+        {"$sort": {"amount": -1}},
+        {"$group": {
+            "_id": "$user_id",
+            "total": {"$sum": "$amount"},
+            "avg": {"$avg": "$amount"},
+            "names": {"$push": "$name"},
+            "first": {"$first": "$name"},
+            "max": {"$max": "$amount"},
+            "min": {"$min": "$amount"},
+        }},
+        {"$project": {"total": 1, "avg": 1, "names": 1, "first": 1, "max": 1, "min": 1,
+                      "size": {"$size": "$names"}, "top": {"$slice": ["$names", 1]}}},
+        {"$sort": {"_id": 1}},
+    ]).to_list(None))
+    assert rows[0] == {
+        "_id": "u1", "total": 35.5, "avg": 17.75, "names": ["b", "a"], "first": "b",
+        "max": 25.5, "min": 10, "size": 2, "top": ["b"],
+    }
+    assert rows[1]["_id"] == "u2" and rows[1]["names"] == ["c"]
+    assert run(c.aggregate([{"$skip": 1}, {"$limit": 5}, {"$count": "n"}]).to_list(None)) == [{"n": 2}]
+
+def test_project_expressions():
+    c = collection([{"name": "a", "amount": 12.345, "date": datetime(2024, 3, 9)}])
+    row = run(c.aggregate([{"$project": {
+        "_id": 0,
+        "cents": {"$toLong": {"$round": [{"$multiply": ["$amount", 100]}, 0]}},
+        "month": {"$month": "$date"},
+        "year": {"$year": "$date"},
+        "label": {"$cond": {"if": {"$gt": ["$amount", 10]}, "then": "big", "else": "small"}},
+        "fallback": {"$ifNull": ["$missing", "none"]},
+    }}]).to_list(None))[0]
+    assert row == {"cents": 1234, "month": 3, "year": 2024, "label": "big", "fallback": "none"}
+    assert isinstance(row["cents"], Int64)
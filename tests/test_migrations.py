@@ -0,0 +1,63 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+import pytest
+from app.core.config import settings
+from app.core.database import db
+from app.migrations.m0001_user_names import UserNames
+from app.migrations.runner import DONE, MigrationLocked, MigrationRunner
+
+class CrashingUserNames(UserNames):
+    """Fails on the document with ``_id`` ``crash_at``."""
+
+    def __init__(self, crash_at):
+        self.crash_at = crash_at
+
+    def transform(self, doc):
+        if doc["_id"] == self.crash_at:
+            raise RuntimeError("runner killed")
+        return super().transform(doc)
+
+def run(scenario):
+    async def wrapped():
+        db.connect()
+        try:
+            return await scenario()
+        finally:
+            db.close()
+    return asyncio.run(wrapped())
+
+def test_an_interrupted_migration_resumes_after_its_checkpoint(monkeypatch):
+    # A lease that is already stale lets the second runner take over at once
+    monkeypatch.setattr(settings, "MIGRATION_LEASE_SECONDS", -1)
+
+    async def scenario():
+        await db.db.users.insert_many([{"_id": n, "email": f"user{n}@example.com"} for n in range(1, 6)])
+        crashed = MigrationRunner([], batch_size=2, duty_cycle=1)
+        with pytest.raises(RuntimeError):
+            await crashed.apply(CrashingUserNames(crash_at=3))
+        checkpoint = await db.db.schema_migrations.find_one({"_id": UserNames.id})
+
+        await MigrationRunner([], batch_size=2, duty_cycle=1).apply(UserNames())
+        # The crashed runner lost its lease and can no longer write progress
+        with pytest.raises(MigrationLocked):
+            await crashed._checkpoint(UserNames(), 5, 5, 5)
+        return checkpoint, await db.db.schema_migrations.find_one({"_id": UserNames.id}), [await db.db.users.find_one({"_id": n}) for n in range(1, 6)]
+
+    checkpoint, state, users = run(scenario)
+    assert (checkpoint["last_id"], checkpoint["processed"]) == (2, 2)
+    # Only the three documents after the checkpoint were examined again
+    assert (state["status"], state["processed"], state["modified"]) == (DONE, 5, 5)
+    assert [user["name"] for user in users] == [f"user{n}" for n in range(1, 6)]
+
+def test_a_migration_leased_by_another_runner_is_not_touched():
+    async def scenario():
+        await db.db.users.insert_one({"_id": 1, "email": "user1@example.com"})
+        await db.db.schema_migrations.insert_one({
+            "_id": UserNames.id, "status": "running", "owner": "other-host:1234",
+            "lease_expires_at": datetime.now(timezone.utc) + timedelta(minutes=5),
+        })
+        with pytest.raises(MigrationLocked):
+            await MigrationRunner([], duty_cycle=1).apply(UserNames())
+        return await db.db.users.find_one({"_id": 1})
+
+    assert "name" not in run(scenario)
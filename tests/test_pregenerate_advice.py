@@ -0,0 +1,25 @@
+import asyncio
+from datetime import datetime, timedelta
+from bson import Int64
+from app.core.database import db
+from app.jobs.pregenerate_advice import load_batch
+
+def test_load_batch_keeps_each_users_50_newest_transactions():
+    async def scenario():
+        db.connect()
+        try:
+            now = datetime.now()
+            await db.db.transactions.insert_many([
+                {"user_id": user_id, "type": "expense", "amount": Int64(i), "category": "Food", "date": now - timedelta(days=i)}
+                for user_id in ("u1", "u2") for i in range(60)
+            ])
+            await db.db.budgets.insert_one({"user_id": "u2", "category": "Food", "limit": Int64(100)})
+            return await load_batch(["u1", "u2", "u3"])
+        finally:
+            db.close()
+
+    batch = asyncio.run(scenario())
+    assert [t["amount"] for t in batch["u1"]["transactions"]] == list(range(50))
+    assert batch["u1"]["transactions"][0] == {"type": "expense", "amount": 0}
+    assert len(batch["u2"]["budgets"]) == 1
+    assert batch["u3"] == {"transactions": [], "budgets": [], "goals": []}
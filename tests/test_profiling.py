@@ -0,0 +1,23 @@
+import asyncio
+import time
+from app.core.profiling import RequestProfiler
+
+def test_samples_both_running_and_awaiting_stacks_of_the_request():
+    async def handler():
+        started = time.perf_counter()
+        while time.perf_counter() - started < 0.05:
+            pass
+        await asyncio.sleep(0.05)
+
+    async def profile():
+        task = asyncio.create_task(handler())
+        profiler = RequestProfiler(task)
+        profiler.start()
+        await task
+        profiler.stop()
+        return profiler.folded().splitlines()
+
+    stacks = [line.rsplit(" ", 1)[0].split(";") for line in asyncio.run(profile())]
+    assert all(stack[0].startswith("handler (") for stack in stacks)
+    assert any(stack[-1] == "[await]" for stack in stacks)
+    assert any(stack[-1] != "[await]" for stack in stacks)
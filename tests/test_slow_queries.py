@@ -0,0 +1,35 @@
+from types import SimpleNamespace
+from app.core import slow_queries
+from app.core.config import settings
+from app.core.slow_queries import SlowQueryLog, plan_tree
+
+def test_plan_tree_keeps_stages_and_indexes_but_no_values():
+    plan = {
+        "stage": "FETCH",
+        "filter": {"email": {"$eq": "someone@example.com"}},
+        "inputStage": {
+            "stage": "IXSCAN",
+            "indexName": "user_date",
+            "keyPattern": {"user_id": 1, "date": -1},
+            "direction": "forward",
+            "indexBounds": {"user_id": ['["6650f0c2", "6650f0c2"]']},
+        },
+    }
+    assert plan_tree({"queryPlan": plan}) == {
+        "stage": "FETCH",
+        "inputStage": {"stage": "IXSCAN", "indexName": "user_date", "keyPattern": {"user_id": 1, "date": -1}, "direction": "forward"},
+    }
+    assert plan_tree({"stage": "OR", "inputStages": [{"stage": "IXSCAN", "indexBounds": {}}]}) == {
+        "stage": "OR", "inputStages": [{"stage": "IXSCAN"}],
+    }
+
+def test_commands_without_a_reply_do_not_pile_up(monkeypatch):
+    monkeypatch.setattr(slow_queries, "MAX_PENDING_COMMANDS", 3)
+    log = SlowQueryLog()
+    for request_id in range(10):
+        log.started(SimpleNamespace(
+            command_name="find", database_name=settings.DB_NAME, request_id=request_id, command={"find": "users"},
+        ))
+    assert list(log._commands) == [7, 8, 9]
+    log.failed(SimpleNamespace(request_id=8))
+    assert list(log._commands) == [7, 9]